@@ -0,0 +1,34 @@
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.services import spend_pivot
+
+router = APIRouter()
+
+
+def _dimensions(values: Optional[List[str]]) -> List[str]:
+    # Accept ?rows=campaign&rows=category as well as ?rows=campaign,category
+    return [name.strip() for value in values or [] for name in value.split(",") if name.strip()]
+
+
+@router.get("/pivot")
+def get_spend_pivot(
+    rows: List[str] = Query(..., description=f"Row dimensions: {', '.join(spend_pivot.DIMENSIONS)}"),
+    cols: Optional[List[str]] = Query(None, description="Column dimensions, same choices as rows"),
+    measure: str = Query("amount", description=f"One of {', '.join(spend_pivot.MEASURES)}"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    campaign_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Actual spend pivoted by any dimensions, with row and column subtotals"""
+    try:
+        return spend_pivot.get_spend_pivot(
+            db, rows=_dimensions(rows), cols=_dimensions(cols), measure=measure,
+            start_date=start_date, end_date=end_date, campaign_id=campaign_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,48 +1,39 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.crud.budget import (
     get_budget_item, get_budget_items, get_budget_items_by_campaign,
     get_budget_items_by_cost_center, get_budget_items_by_category,
-    get_budget_items_with_relations, create_budget_item, 
+    budget_items_with_relations_query, create_budget_item, 
     update_budget_item, delete_budget_item, get_budget_summary_by_campaign
 )
 from app.schemas.budget import BudgetItem, BudgetItemCreate, BudgetItemUpdate
+from app.schemas.sync import SyncPage
+from app.services import delta_sync
+from app.services.tabular import tabular_response
 
 router = APIRouter()
 
-@router.get("/", response_model=List[BudgetItem])
-def read_budget_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all budget items"""
+@router.get("/", response_model=Union[List[BudgetItem], SyncPage[BudgetItem]])
+def read_budget_items(
+    skip: int = 0,
+    limit: int = 100,
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Get all budget items, or with updated_since only those changed since (skip/limit don't apply)"""
+    if updated_since is not None:
+        return delta_sync.get_changes(db, "budget_items", updated_since, include_deleted)
     return get_budget_items(db, skip=skip, limit=limit)
 
 @router.get("/with-relations")
-def read_budget_items_with_relations(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get budget items with campaign and cost center names"""
-    results = get_budget_items_with_relations(db, skip=skip, limit=limit)
-    
-    # Transform the query results into proper response format
-    items = []
-    for budget_item, campaign_name, cost_center_name in results:
-        item_dict = {
-            "id": budget_item.id,
-            "campaign_id": budget_item.campaign_id,
-            "cost_center_id": budget_item.cost_center_id,
-            "name": budget_item.name,
-            "description": budget_item.description,
-            "category": budget_item.category,
-            "total_budget": budget_item.total_budget,
-            "monthly_budget": budget_item.monthly_budget,
-            "created_at": budget_item.created_at,
-            "updated_at": budget_item.updated_at,
-            "campaign_name": campaign_name,
-            "cost_center_name": cost_center_name
-        }
-        items.append(item_dict)
-    
-    return items
+def read_budget_items_with_relations(request: Request, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    """Get budget items with campaign and cost center names (Arrow IPC if requested)"""
+    return tabular_response(request, db, budget_items_with_relations_query(skip=skip, limit=limit))
 
 @router.get("/campaign/{campaign_id}", response_model=List[BudgetItem])
 def read_budget_items_by_campaign(campaign_id: int, db: Session = Depends(get_db)):
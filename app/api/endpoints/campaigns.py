@@ -1,4 +1,5 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Union
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
@@ -9,12 +10,22 @@ from app.crud.campaign import (
     get_budget_allocation
 )
 from app.schemas.campaign import Campaign, CampaignCreate, CampaignUpdate
+from app.schemas.sync import SyncPage
+from app.services import delta_sync
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Campaign])
-def read_campaigns(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all campaigns"""
+@router.get("/", response_model=Union[List[Campaign], SyncPage[Campaign]])
+def read_campaigns(
+    skip: int = 0,
+    limit: int = 100,
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Get all campaigns, or with updated_since only those changed since (skip/limit don't apply)"""
+    if updated_since is not None:
+        return delta_sync.get_changes(db, "campaigns", updated_since, include_deleted)
     campaigns = get_campaigns(db, skip=skip, limit=limit)
     return campaigns
 
@@ -1,4 +1,5 @@
-from typing import List
+from datetime import date
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
@@ -6,9 +7,11 @@ from app.database import get_db
 from app.crud.cost_center import (
     get_cost_center, get_cost_center_by_code, get_cost_centers,
     get_active_cost_centers, get_cost_centers_by_department,
-    create_cost_center, update_cost_center, delete_cost_center
+    create_cost_center, update_cost_center, delete_cost_center,
+    get_cost_center_usage
 )
 from app.schemas.cost_center import CostCenter, CostCenterCreate, CostCenterUpdate
+from app.services.spend_ledger import get_cost_center_spend
 
 router = APIRouter()
 
@@ -43,6 +46,27 @@ def read_cost_center(cost_center_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Cost center not found")
     return cost_center
 
+@router.get("/{cost_center_id}/spend")
+def read_cost_center_spend(
+    cost_center_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """Get marketing and R&D spend for a cost center from the unified spend ledger"""
+    cost_center = get_cost_center(db, cost_center_id=cost_center_id)
+    if cost_center is None:
+        raise HTTPException(status_code=404, detail="Cost center not found")
+    return get_cost_center_spend(db, cost_center, start_date=start_date, end_date=end_date)
+
+@router.get("/{cost_center_id}/usage")
+def read_cost_center_usage(cost_center_id: int, db: Session = Depends(get_db)):
+    """Check whether budget items or R&D expenses still reference a cost center"""
+    cost_center = get_cost_center(db, cost_center_id=cost_center_id)
+    if cost_center is None:
+        raise HTTPException(status_code=404, detail="Cost center not found")
+    return get_cost_center_usage(db, cost_center)
+
 @router.post("/", response_model=CostCenter)
 def create_new_cost_center(cost_center: CostCenterCreate, db: Session = Depends(get_db)):
     """Create a new cost center"""
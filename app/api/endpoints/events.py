@@ -0,0 +1,55 @@
+import json
+from typing import Optional
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.services.events import event_hub
+
+router = APIRouter()
+
+# Comment lines keep proxies from closing idle SSE connections
+HEARTBEAT_SECONDS = 15
+
+
+def _format_sse(event: dict) -> str:
+    return (
+        f"id: {event['version']}\n"
+        f"event: {event['entity']}\n"
+        f"data: {json.dumps(event, default=str)}\n\n"
+    )
+
+
+@router.get("/")
+async def stream_events(
+    request: Request,
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID")
+):
+    """Server-sent events stream of entity changes"""
+    async def event_stream():
+        subscription = event_hub.subscribe(last_event_id=last_event_id, heartbeat=HEARTBEAT_SECONDS)
+        try:
+            yield f"retry: 5000\n: version {event_hub.version}\n\n"
+            async for event in subscription:
+                if await request.is_disconnected():
+                    break
+                yield ": heartbeat\n\n" if event is None else _format_sse(event)
+        finally:
+            await subscription.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/version")
+def get_events_version():
+    """Get the current change version"""
+    return {"version": event_hub.version}
+
+
+@router.get("/changes")
+def get_changes_since(since: int = Query(0, description="Last version the client has seen")):
+    """Get entity changes published after a version"""
+    return event_hub.changes_since(since)
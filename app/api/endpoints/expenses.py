@@ -1,51 +1,40 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from datetime import date
+from datetime import date, datetime
 
 from app.database import get_db
+from app.services.events import publish_event
+from app.services import delta_sync
+from app.services.tabular import tabular_response
 from app.crud.expense import (
     get_expense, get_expenses, get_expenses_by_budget_item,
     get_expenses_by_date_range, get_expenses_by_month,
-    get_expenses_with_details, create_expense, update_expense,
+    expenses_with_details_query, variance_report_query, create_expense, update_expense,
     delete_expense, get_budget_vs_actual, get_campaign_spending_summary
 )
 from app.schemas.expense import ActualExpense, ActualExpenseCreate, ActualExpenseUpdate
+from app.schemas.sync import SyncPage
 
 router = APIRouter()
 
-@router.get("/", response_model=List[ActualExpense])
-def read_expenses(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all expenses"""
+@router.get("/", response_model=Union[List[ActualExpense], SyncPage[ActualExpense]])
+def read_expenses(
+    skip: int = 0,
+    limit: int = 100,
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Get all expenses, or with updated_since only those changed since (skip/limit don't apply)"""
+    if updated_since is not None:
+        return delta_sync.get_changes(db, "actual_expenses", updated_since, include_deleted)
     return get_expenses(db, skip=skip, limit=limit)
 
 @router.get("/with-details")
-def read_expenses_with_details(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get expenses with budget item and campaign details"""
-    results = get_expenses_with_details(db, skip=skip, limit=limit)
-    
-    expenses = []
-    for expense, budget_item_name, campaign_name, category in results:
-        expense_dict = {
-            "id": expense.id,
-            "budget_item_id": expense.budget_item_id,
-            "amount": expense.amount,
-            "expense_date": expense.expense_date,
-            "description": expense.description,
-            "vendor": expense.vendor,
-            "invoice_number": expense.invoice_number,
-            "payment_method": expense.payment_method,
-            "approved_by": expense.approved_by,
-            "approval_date": expense.approval_date,
-            "created_at": expense.created_at,
-            "updated_at": expense.updated_at,
-            "budget_item_name": budget_item_name,
-            "campaign_name": campaign_name,
-            "category": category
-        }
-        expenses.append(expense_dict)
-    
-    return expenses
+def read_expenses_with_details(request: Request, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    """Get expenses with budget item and campaign details (Arrow IPC if requested)"""
+    return tabular_response(request, db, expenses_with_details_query(skip=skip, limit=limit))
 
 @router.get("/budget-item/{budget_item_id}", response_model=List[ActualExpense])
 def read_expenses_by_budget_item(budget_item_id: int, db: Session = Depends(get_db)):
@@ -68,6 +57,18 @@ def read_expenses_by_month(year: int, month: int, db: Session = Depends(get_db))
         raise HTTPException(status_code=400, detail="Month must be between 1 and 12")
     return get_expenses_by_month(db, year=year, month=month)
 
+@router.get("/variance")
+def get_variance_report(
+    request: Request,
+    year: int = Query(..., description="Year"),
+    month: int = Query(..., description="Month (1-12)"),
+    db: Session = Depends(get_db)
+):
+    """Get budget vs actual variance for every budget item in a month (Arrow IPC if requested)"""
+    if month < 1 or month > 12:
+        raise HTTPException(status_code=400, detail="Month must be between 1 and 12")
+    return tabular_response(request, db, variance_report_query(year=year, month=month))
+
 @router.get("/variance/budget-item/{budget_item_id}")
 def get_variance_analysis(
     budget_item_id: int,
@@ -107,7 +108,9 @@ def create_new_expense(expense: ActualExpenseCreate, db: Session = Depends(get_d
     if not budget_item:
         raise HTTPException(status_code=404, detail="Budget item not found")
     
-    return create_expense(db=db, expense=expense)
+    db_expense = create_expense(db=db, expense=expense)
+    publish_event("expense", "created", db_expense.id, budget_item_id=db_expense.budget_item_id)
+    return db_expense
 
 @router.put("/{expense_id}", response_model=ActualExpense)
 def update_expense_endpoint(expense_id: int, expense_update: ActualExpenseUpdate, db: Session = Depends(get_db)):
@@ -115,6 +118,7 @@ def update_expense_endpoint(expense_id: int, expense_update: ActualExpenseUpdate
     expense = update_expense(db, expense_id=expense_id, expense_update=expense_update)
     if expense is None:
         raise HTTPException(status_code=404, detail="Expense not found")
+    publish_event("expense", "updated", expense.id, budget_item_id=expense.budget_item_id)
     return expense
 
 @router.delete("/{expense_id}")
@@ -123,4 +127,5 @@ def delete_expense_endpoint(expense_id: int, db: Session = Depends(get_db)):
     success = delete_expense(db, expense_id=expense_id)
     if not success:
         raise HTTPException(status_code=404, detail="Expense not found")
+    publish_event("expense", "deleted", expense_id)
     return {"message": "Expense deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,22 @@
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.services.forecast import build_forecast
+
+router = APIRouter()
+
+
+@router.get("/{year}")
+def get_year_end_forecast(
+    year: int,
+    as_of: Optional[date] = Query(None, description="Forecast as of this date (defaults to today)"),
+    include_items: bool = Query(True, description="Include the per budget item breakdown"),
+    db: Session = Depends(get_db)
+):
+    """Get run-rate and seasonality-adjusted year-end projections"""
+    if year < 2000 or year > 2100:
+        raise HTTPException(status_code=400, detail="Year must be between 2000 and 2100")
+    return build_forecast(db, year, as_of=as_of, include_items=include_items)
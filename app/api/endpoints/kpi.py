@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
 from datetime import date, datetime
 from app import crud
 from app.database import get_db
+from app.services.events import publish_event
+from app.services import delta_sync, kpi_timeseries
+from app.services.tabular import tabular_response
 from app.schemas.kpi import (
     KPIMetricCreate, KPIMetricUpdate, KPIMetricResponse,
-    KPISnapshotCreate, KPISnapshotResponse
+    KPISnapshotCreate, KPISnapshotResponse, KPISnapshotBulkResult
 )
+from app.schemas.sync import SyncPage
 
 router = APIRouter()
 
@@ -15,7 +19,9 @@ router = APIRouter()
 
 @router.post("/metrics/", response_model=KPIMetricResponse)
 def create_kpi_metric(metric: KPIMetricCreate, db: Session = Depends(get_db)):
-    return crud.kpi.create_metric(db, metric)
+    db_metric = crud.kpi.create_metric(db, metric)
+    publish_event("kpi_metric", "created", db_metric.id)
+    return db_metric
 
 @router.get("/metrics/", response_model=List[KPIMetricResponse])
 def get_all_metrics(db: Session = Depends(get_db)):
@@ -28,11 +34,31 @@ def get_metric(metric_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Metric not found")
     return metric
 
+@router.get("/metrics/{metric_id}/analytics")
+def get_metric_analytics(
+    metric_id: int,
+    window: int = Query(4, ge=1, le=52, description="Rolling window in periods"),
+    monthly_agg: Optional[str] = Query(None, description="Weekly-to-monthly aggregation: sum, mean or last"),
+    anomaly_threshold: float = Query(2.0, gt=0, description="Absolute z-score that flags an anomaly"),
+    db: Session = Depends(get_db)
+):
+    """Get resampled history, rolling stats, trend and anomalies for a metric"""
+    metric = crud.kpi.get_metric(db, metric_id)
+    if not metric:
+        raise HTTPException(status_code=404, detail="Metric not found")
+    if monthly_agg is not None and monthly_agg not in kpi_timeseries.AGGREGATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"monthly_agg must be one of {', '.join(kpi_timeseries.AGGREGATIONS)}"
+        )
+    return kpi_timeseries.get_metric_analytics(db, metric, window, monthly_agg, anomaly_threshold)
+
 @router.put("/metrics/{metric_id}", response_model=KPIMetricResponse)
 def update_metric(metric_id: int, metric: KPIMetricUpdate, db: Session = Depends(get_db)):
     updated = crud.kpi.update_metric(db, metric_id, metric)
     if not updated:
         raise HTTPException(status_code=404, detail="Metric not found")
+    publish_event("kpi_metric", "updated", metric_id)
     return updated
 
 @router.delete("/metrics/{metric_id}")
@@ -40,22 +66,59 @@ def delete_metric(metric_id: int, db: Session = Depends(get_db)):
     success = crud.kpi.delete_metric(db, metric_id)
     if not success:
         raise HTTPException(status_code=404, detail="Metric not found")
+    publish_event("kpi_metric", "deleted", metric_id)
     return {"success": True}
 
 # ==================== KPI SNAPSHOTS ====================
 
 @router.post("/snapshots/", response_model=KPISnapshotResponse)
 def create_snapshot(snapshot: KPISnapshotCreate, db: Session = Depends(get_db)):
-    return crud.kpi.create_snapshot(db, snapshot)
+    db_snapshot = crud.kpi.create_snapshot(db, snapshot)
+    kpi_timeseries.invalidate_metric(db_snapshot.metric_id)
+    publish_event("kpi_snapshot", "created", db_snapshot.id, metric_id=db_snapshot.metric_id)
+    return db_snapshot
+
+@router.post("/snapshots/bulk", response_model=KPISnapshotBulkResult)
+def bulk_upsert_snapshots(snapshots: List[KPISnapshotCreate], db: Session = Depends(get_db)):
+    """Insert or update many snapshots at once (weekly GA4/HubSpot loads)"""
+    if not snapshots:
+        raise HTTPException(status_code=400, detail="No snapshots provided")
+    
+    # Verify all metrics exist
+    metric_ids = {s.metric_id for s in snapshots}
+    missing = metric_ids - crud.kpi.get_existing_metric_ids(db, list(metric_ids))
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Metrics not found: {sorted(missing)}")
+    
+    result = crud.kpi.bulk_upsert_snapshots(db, snapshots)
+    for metric_id in metric_ids:
+        kpi_timeseries.invalidate_metric(metric_id)
+    publish_event("kpi_snapshot", "bulk_upserted", metric_ids=sorted(metric_ids), **result)
+    return result
+
+@router.get("/snapshots/", response_model=Union[List[KPISnapshotResponse], SyncPage[KPISnapshotResponse]])
+def get_all_snapshots(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Get all snapshots (Arrow IPC if requested), or with updated_since only those changed since"""
+    if updated_since is not None:
+        return delta_sync.get_changes(db, "kpi_snapshots", updated_since, include_deleted)
+    return tabular_response(request, db, crud.kpi.all_snapshots_query(skip, limit))
 
 @router.get("/snapshots/metric/{metric_id}", response_model=List[KPISnapshotResponse])
 def get_snapshots_for_metric(
+    request: Request,
     metric_id: int,
     snapshot_type: str = None,  # "weekly" or "monthly"
     limit: int = 12,
     db: Session = Depends(get_db)
 ):
-    return crud.kpi.get_snapshots_for_metric(db, metric_id, snapshot_type, limit)
+    return tabular_response(request, db, crud.kpi.snapshots_for_metric_query(metric_id, snapshot_type, limit))
 
 @router.get("/snapshots/latest/{metric_id}")
 def get_latest_snapshot(metric_id: int, snapshot_type: str = None, db: Session = Depends(get_db)):
@@ -69,6 +132,7 @@ def delete_snapshot(snapshot_id: int, db: Session = Depends(get_db)):
     success = crud.kpi.delete_snapshot(db, snapshot_id)
     if not success:
         raise HTTPException(status_code=404, detail="Snapshot not found")
+    publish_event("kpi_snapshot", "deleted", snapshot_id)
     return {"success": True}
 
 # ==================== DASHBOARD DATA ====================
@@ -1,6 +1,7 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.database import get_db
 from app.crud.marketing_budget import (
@@ -10,9 +11,12 @@ from app.crud.marketing_budget import (
     get_categories_by_type, create_category, create_multiple_categories,
     update_category, delete_category
 )
+from app.services.budget_risk import DEFAULT_PATHS, SimulationTimeoutError, get_budget_risk
+from app.services.budget_optimizer import OptimizationError, optimize_budget
 from app.schemas.marketing_budget import (
     MarketingBudget, MarketingBudgetCreate, MarketingBudgetUpdate,
-    BudgetCategory, BudgetCategoryCreate, BudgetCategoryUpdate
+    BudgetCategory, BudgetCategoryCreate, BudgetCategoryUpdate,
+    BudgetOptimizeRequest
 )
 
 router = APIRouter()
@@ -66,6 +70,46 @@ def update_budget_endpoint(
         raise HTTPException(status_code=404, detail="Budget not found")
     return budget
 
+@router.get("/budgets/{budget_id}/risk")
+async def read_budget_risk(
+    budget_id: int,
+    paths: int = Query(DEFAULT_PATHS, ge=1000, le=1_000_000, description="Number of simulated paths"),
+    seed: int = Query(0, description="Random seed; the same seed and data give the same (cached) result"),
+    db: Session = Depends(get_db)
+):
+    """Simulate year-end spend and overrun probabilities for a budget"""
+    # Async so the simulation is awaited rather than holding a worker thread; DB work goes to the threadpool
+    budget = await run_in_threadpool(get_budget, db, budget_id=budget_id)
+    if not budget:
+        raise HTTPException(status_code=404, detail="Budget not found")
+    try:
+        return await get_budget_risk(db, budget, paths=paths, seed=seed)
+    except SimulationTimeoutError as e:
+        raise HTTPException(status_code=504, detail=f"{e}; try again or use fewer paths")
+
+@router.post("/budgets/{budget_id}/optimize")
+def optimize_flexible_budget(
+    budget_id: int,
+    request: Optional[BudgetOptimizeRequest] = None,
+    db: Session = Depends(get_db)
+):
+    """Recommend a revenue-maximizing split of the flexible budget from ROI history"""
+    budget = get_budget(db, budget_id=budget_id)
+    if not budget:
+        raise HTTPException(status_code=404, detail="Budget not found")
+    
+    request = request or BudgetOptimizeRequest()
+    try:
+        return optimize_budget(
+            db, budget,
+            min_fraction=request.min_fraction,
+            max_fraction=request.max_fraction,
+            bounds={k: v.model_dump() for k, v in request.bounds.items()},
+            total=request.total
+        )
+    except OptimizationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.delete("/budgets/{budget_id}")
 def delete_budget_endpoint(budget_id: int, db: Session = Depends(get_db)):
     """Delete a budget"""
@@ -1,8 +1,11 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Union
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.database import get_db
+from app.services.events import publish_event
+from app.services import delta_sync
 from app.crud.marketing_calendar import (
     get_calendar, get_calendar_by_month, get_calendars_by_year,
     get_all_calendars, get_calendar_with_activities,
@@ -17,6 +20,7 @@ from app.schemas.marketing_calendar import (
     MarketingActivity, MarketingActivityCreate, MarketingActivityUpdate,
     MarketingCalendarWithActivities
 )
+from app.schemas.sync import SyncPage
 
 router = APIRouter()
 
@@ -60,7 +64,9 @@ def create_new_calendar(calendar: MarketingCalendarCreate, db: Session = Depends
             status_code=400,
             detail=f"Calendar for {calendar.year}-{calendar.month} already exists"
         )
-    return create_calendar(db=db, calendar=calendar)
+    db_calendar = create_calendar(db=db, calendar=calendar)
+    publish_event("marketing_calendar", "created", db_calendar.id)
+    return db_calendar
 
 @router.put("/calendars/{calendar_id}", response_model=MarketingCalendar)
 def update_calendar_endpoint(
@@ -72,6 +78,7 @@ def update_calendar_endpoint(
     calendar = update_calendar(db, calendar_id=calendar_id, calendar_update=calendar_update)
     if not calendar:
         raise HTTPException(status_code=404, detail="Calendar not found")
+    publish_event("marketing_calendar", "updated", calendar.id)
     return calendar
 
 @router.delete("/calendars/{calendar_id}")
@@ -80,6 +87,7 @@ def delete_calendar_endpoint(calendar_id: int, db: Session = Depends(get_db)):
     success = delete_calendar(db, calendar_id=calendar_id)
     if not success:
         raise HTTPException(status_code=404, detail="Calendar not found")
+    publish_event("marketing_calendar", "deleted", calendar_id)
     return {"message": "Calendar deleted successfully"}
 
 @router.get("/calendars/{calendar_id}/stats")
@@ -102,13 +110,25 @@ def read_activity(activity_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Activity not found")
     return activity
 
-@router.get("/activities/calendar/{calendar_id}", response_model=List[MarketingActivity])
-def read_activities_by_calendar(calendar_id: int, db: Session = Depends(get_db)):
-    """Get all activities for a calendar"""
+@router.get(
+    "/activities/calendar/{calendar_id}",
+    response_model=Union[List[MarketingActivity], SyncPage[MarketingActivity]]
+)
+def read_activities_by_calendar(
+    calendar_id: int,
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Get all activities for a calendar, or with updated_since only those changed since"""
     # Verify calendar exists
     calendar = get_calendar(db, calendar_id)
     if not calendar:
         raise HTTPException(status_code=404, detail="Calendar not found")
+    if updated_since is not None:
+        return delta_sync.get_changes(
+            db, "marketing_activities", updated_since, include_deleted, calendar_id=calendar_id
+        )
     return get_activities_by_calendar(db, calendar_id=calendar_id)
 
 @router.get("/activities/calendar/{calendar_id}/week/{week_number}", response_model=List[MarketingActivity])
@@ -123,7 +143,9 @@ def create_new_activity(activity: MarketingActivityCreate, db: Session = Depends
     calendar = get_calendar(db, activity.calendar_id)
     if not calendar:
         raise HTTPException(status_code=404, detail="Calendar not found")
-    return create_activity(db=db, activity=activity)
+    db_activity = create_activity(db=db, activity=activity)
+    publish_event("marketing_activity", "created", db_activity.id, calendar_id=db_activity.calendar_id)
+    return db_activity
 
 @router.post("/activities/bulk", response_model=List[MarketingActivity])
 def create_bulk_activities(activities: List[MarketingActivityCreate], db: Session = Depends(get_db)):
@@ -138,7 +160,10 @@ def create_bulk_activities(activities: List[MarketingActivityCreate], db: Sessio
         if not calendar:
             raise HTTPException(status_code=404, detail=f"Calendar {calendar_id} not found")
     
-    return create_multiple_activities(db=db, activities=activities)
+    db_activities = create_multiple_activities(db=db, activities=activities)
+    for calendar_id in calendar_ids:
+        publish_event("marketing_activity", "created", calendar_id=calendar_id)
+    return db_activities
 
 @router.put("/activities/{activity_id}", response_model=MarketingActivity)
 def update_activity_endpoint(
@@ -150,6 +175,7 @@ def update_activity_endpoint(
     activity = update_activity(db, activity_id=activity_id, activity_update=activity_update)
     if not activity:
         raise HTTPException(status_code=404, detail="Activity not found")
+    publish_event("marketing_activity", "updated", activity.id, calendar_id=activity.calendar_id)
     return activity
 
 @router.patch("/activities/{activity_id}/toggle", response_model=MarketingActivity)
@@ -158,6 +184,10 @@ def toggle_activity_endpoint(activity_id: int, db: Session = Depends(get_db)):
     activity = toggle_activity_completion(db, activity_id=activity_id)
     if not activity:
         raise HTTPException(status_code=404, detail="Activity not found")
+    publish_event(
+        "marketing_activity", "toggled", activity.id,
+        calendar_id=activity.calendar_id, is_completed=activity.is_completed
+    )
     return activity
 
 @router.delete("/activities/{activity_id}")
@@ -166,10 +196,13 @@ def delete_activity_endpoint(activity_id: int, db: Session = Depends(get_db)):
     success = delete_activity(db, activity_id=activity_id)
     if not success:
         raise HTTPException(status_code=404, detail="Activity not found")
+    publish_event("marketing_activity", "deleted", activity_id)
     return {"message": "Activity deleted successfully"}
 
 @router.delete("/activities/calendar/{calendar_id}/week/{week_number}")
 def delete_week_activities(calendar_id: int, week_number: int, db: Session = Depends(get_db)):
     """Delete all activities for a specific week"""
     count = delete_activities_by_week(db, calendar_id=calendar_id, week_number=week_number)
+    if count:
+        publish_event("marketing_activity", "deleted", calendar_id=calendar_id, week_number=week_number)
     return {"message": f"Deleted {count} activities"}
\ No newline at end of file
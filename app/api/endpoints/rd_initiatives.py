@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+import time
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from app.database import get_db
 from app.schemas.rd_initiative import RDInitiative, RDInitiativeCreate, RDInitiativeUpdate, RDInitiativeDetail
@@ -14,6 +16,8 @@ from app.schemas.rd_revenue import RDRevenue, RDRevenueCreate, RDRevenueUpdate
 from app.schemas.rd_note import RDNote, RDNoteCreate, RDNoteUpdate
 from app.schemas.rd_roi import RDROI, RDROICreate, RDROIUpdate
 from app.schemas.rd_team import RDInitiativeTeam, RDInitiativeTeamCreate, RDInitiativeTeamUpdate
+from app.schemas.rd_stage_transition import RDStageTransition
+from app.schemas.sync import SyncPage
 
 from app.crud import (
     rd_initiative,
@@ -28,24 +32,53 @@ from app.crud import (
     rd_roi,
     rd_team
 )
+from app.services import (
+    customer_identity,
+    delta_sync,
+    rd_feed,
+    rd_milestone_analytics,
+    rd_pipeline_forecast,
+    rd_portfolio_rules,
+    rd_queue,
+    rd_sample_cohorts,
+    rd_search,
+    rd_team_workload,
+    rd_velocity
+)
+from app.services.keyset import InvalidCursor
 
 router = APIRouter()
 
 
+def _changes(db: Session, table_name: str, updated_since: datetime, include_deleted: bool, filters: dict, **scope):
+    """Delta of an R&D collection; value filters are refused since rows can change out of them"""
+    applied = [name for name, value in filters.items() if value is not None]
+    if applied:
+        raise HTTPException(status_code=400, detail=f"updated_since can't be combined with {', '.join(applied)}")
+    return delta_sync.get_changes(db, table_name, updated_since, include_deleted, **scope)
+
+
 # ===========================
 # INITIATIVES (Main Projects)
 # ===========================
 
-@router.get("/initiatives", response_model=List[RDInitiative])
+@router.get("/initiatives", response_model=Union[List[RDInitiative], SyncPage[RDInitiative]])
 def get_initiatives(
     skip: int = 0,
     limit: int = 100,
     stage: Optional[str] = None,
     priority: Optional[str] = None,
     is_active: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Get all R&D initiatives with optional filters"""
+    """Get all R&D initiatives with optional filters, or with updated_since only those changed since"""
+    if updated_since is not None:
+        return _changes(
+            db, "rd_initiatives", updated_since, include_deleted,
+            {"stage": stage, "priority": priority, "is_active": is_active}
+        )
     initiatives = rd_initiative.get_initiatives(
         db, skip=skip, limit=limit, stage=stage, priority=priority, is_active=is_active
     )
@@ -88,13 +121,57 @@ def delete_initiative(initiative_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="R&D initiative not found")
     return {"message": "R&D initiative deleted successfully"}
 
+
+@router.get("/initiatives/{initiative_id}/feed")
+def get_initiative_feed(
+    initiative_id: int,
+    kind: Optional[List[str]] = Query(None),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """Merged, newest-first timeline of notes, contacts, milestones, samples, expenses and revenue"""
+    if not rd_initiative.get_initiative(db, initiative_id=initiative_id):
+        raise HTTPException(status_code=404, detail="R&D initiative not found")
+    unknown = set(kind or []) - set(rd_feed.KINDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown kind: {', '.join(sorted(unknown))}. Use one of: {', '.join(rd_feed.KINDS)}"
+        )
+    try:
+        return rd_feed.get_feed(db, initiative_id, kinds=kind, cursor=cursor, limit=limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+
+@router.get("/initiatives/{initiative_id}/stage-history", response_model=List[RDStageTransition])
+def get_stage_history(initiative_id: int, db: Session = Depends(get_db)):
+    """Every stage an initiative has been in, oldest first"""
+    if not rd_initiative.get_initiative(db, initiative_id=initiative_id):
+        raise HTTPException(status_code=404, detail="R&D initiative not found")
+    return rd_initiative.get_stage_history(db, initiative_id=initiative_id)
+
 # ===========================
 # TEAM
 # ===========================
 
-@router.get("/initiatives/{initiative_id}/team", response_model=List[RDInitiativeTeam])
-def get_initiative_team(initiative_id: int, db: Session = Depends(get_db)):
+@router.get(
+    "/initiatives/{initiative_id}/team",
+    response_model=Union[List[RDInitiativeTeam], SyncPage[RDInitiativeTeam]]
+)
+def get_initiative_team(
+    initiative_id: int,
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False,
+    db: Session = Depends(get_db)
+):
     """Get all team members for an initiative"""
+    if updated_since is not None:
+        return _changes(
+            db, "rd_initiative_team", updated_since, include_deleted, {}, initiative_id=initiative_id
+        )
     team_members = rd_team.get_team_members_by_initiative(db, initiative_id)
     return team_members
 
@@ -116,6 +193,21 @@ def add_team_member(initiative_id: int, team_member: RDInitiativeTeamCreate, db:
     return rd_team.create_team_member(db, team_member)
 
 
+@router.get("/team/workload")
+def get_team_workload(
+    department: Optional[str] = None,
+    person: Optional[str] = None,
+    due_within_days: int = Query(rd_team_workload.DEFAULT_DUE_WITHIN_DAYS, ge=0, le=365),
+    include_inactive: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Person x initiative allocation matrix with role weights and open milestone counts"""
+    return rd_team_workload.get_workload(
+        db, department=department, person=person,
+        due_within_days=due_within_days, include_inactive=include_inactive
+    )
+
+
 @router.put("/team/{team_member_id}", response_model=RDInitiativeTeam)
 def update_team_member(team_member_id: int, team_member: RDInitiativeTeamUpdate, db: Session = Depends(get_db)):
     """Update a team member assignment"""
@@ -187,19 +279,50 @@ def delete_feasibility(feasibility_id: int, db: Session = Depends(get_db)):
 # CUSTOMER INTEREST
 # ===========================
 
-@router.get("/customers/initiative/{initiative_id}", response_model=List[RDCustomerInterest])
+@router.get(
+    "/customers/initiative/{initiative_id}",
+    response_model=Union[List[RDCustomerInterest], SyncPage[RDCustomerInterest]]
+)
 def get_customers_by_initiative(
     initiative_id: int,
     interest_level: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False,
     db: Session = Depends(get_db)
 ):
     """Get all customer interest records for an initiative"""
+    if updated_since is not None:
+        return _changes(
+            db, "rd_customer_interest", updated_since, include_deleted,
+            {"interest_level": interest_level}, initiative_id=initiative_id
+        )
     customers = rd_customer_interest.get_customers_by_initiative(
         db, initiative_id=initiative_id, interest_level=interest_level
     )
     return customers
 
 
+@router.get("/customers/canonical")
+def list_canonical_customers(
+    q: Optional[str] = None,
+    min_orders: int = Query(0, ge=0),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Customers unified across interest, revenue, sample and contact records"""
+    return customer_identity.list_canonical_customers(db, q=q, min_orders=min_orders, skip=skip, limit=limit)
+
+
+@router.get("/customers/canonical/{canonical_id}")
+def get_canonical_customer(canonical_id: str, db: Session = Depends(get_db)):
+    """A unified customer with its order history across initiatives"""
+    customer = customer_identity.get_canonical_customer(db, canonical_id)
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return customer
+
+
 @router.get("/customers/{interest_id}", response_model=RDCustomerInterest)
 def get_customer_interest(interest_id: int, db: Session = Depends(get_db)):
     """Get a specific customer interest record"""
@@ -241,9 +364,16 @@ def delete_customer_interest(interest_id: int, db: Session = Depends(get_db)):
 # SAMPLES
 # ===========================
 
-@router.get("/samples/initiative/{initiative_id}", response_model=List[RDSample])
-def get_samples_by_initiative(initiative_id: int, db: Session = Depends(get_db)):
+@router.get("/samples/initiative/{initiative_id}", response_model=Union[List[RDSample], SyncPage[RDSample]])
+def get_samples_by_initiative(
+    initiative_id: int,
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False,
+    db: Session = Depends(get_db)
+):
     """Get all samples for an initiative"""
+    if updated_since is not None:
+        return _changes(db, "rd_samples", updated_since, include_deleted, {}, initiative_id=initiative_id)
     samples = rd_sample.get_samples_by_initiative(db, initiative_id=initiative_id)
     return samples
 
@@ -255,6 +385,28 @@ def get_converted_samples(initiative_id: int, db: Session = Depends(get_db)):
     return samples
 
 
+@router.get("/samples/cohorts")
+def get_sample_cohorts(
+    group_by: Optional[List[str]] = Query(None, description="month, sample_type and/or initiative"),
+    initiative_id: Optional[int] = None,
+    sample_type: Optional[str] = None,
+    shipped_from: Optional[date] = None,
+    shipped_to: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """Sample-to-order conversion curves, time to order and revenue per sample dollar by cohort"""
+    unknown = set(group_by or []) - set(rd_sample_cohorts.DIMENSIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown group_by: {', '.join(sorted(unknown))}. Use any of: {', '.join(rd_sample_cohorts.DIMENSIONS)}"
+        )
+    return rd_sample_cohorts.get_sample_cohorts(
+        db, group_by=group_by, initiative_id=initiative_id, sample_type=sample_type,
+        shipped_from=shipped_from, shipped_to=shipped_to
+    )
+
+
 @router.get("/samples/{sample_id}", response_model=RDSample)
 def get_sample(sample_id: int, db: Session = Depends(get_db)):
     """Get a specific sample record"""
@@ -296,14 +448,21 @@ def delete_sample(sample_id: int, db: Session = Depends(get_db)):
 # CONTACTS
 # ===========================
 
-@router.get("/contacts/initiative/{initiative_id}", response_model=List[RDContact])
+@router.get("/contacts/initiative/{initiative_id}", response_model=Union[List[RDContact], SyncPage[RDContact]])
 def get_contacts_by_initiative(
     initiative_id: int,
     contact_type: Optional[str] = None,
     department: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False,
     db: Session = Depends(get_db)
 ):
     """Get all contact records for an initiative"""
+    if updated_since is not None:
+        return _changes(
+            db, "rd_contacts", updated_since, include_deleted,
+            {"contact_type": contact_type, "department": department}, initiative_id=initiative_id
+        )
     contacts = rd_contact.get_contacts_by_initiative(
         db, initiative_id=initiative_id, contact_type=contact_type, department=department
     )
@@ -351,19 +510,38 @@ def delete_contact(contact_id: int, db: Session = Depends(get_db)):
 # MILESTONES
 # ===========================
 
-@router.get("/milestones/initiative/{initiative_id}", response_model=List[RDMilestone])
+@router.get(
+    "/milestones/initiative/{initiative_id}",
+    response_model=Union[List[RDMilestone], SyncPage[RDMilestone]]
+)
 def get_milestones_by_initiative(
     initiative_id: int,
     status: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False,
     db: Session = Depends(get_db)
 ):
     """Get all milestones for an initiative"""
+    if updated_since is not None:
+        return _changes(
+            db, "rd_milestones", updated_since, include_deleted, {"status": status}, initiative_id=initiative_id
+        )
     milestones = rd_milestone.get_milestones_by_initiative(
         db, initiative_id=initiative_id, status=status
     )
     return milestones
 
 
+@router.get("/milestones/analytics")
+def get_milestone_analytics(
+    since: Optional[date] = Query(None, description="Completed milestones targeted from this date (default: one year back)"),
+    include_inactive: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Schedule slip, on-time rates, projected launch drift and blocked chains across all initiatives"""
+    return rd_milestone_analytics.get_milestone_analytics(db, since=since, include_inactive=include_inactive)
+
+
 @router.get("/milestones/{milestone_id}", response_model=RDMilestone)
 def get_milestone(milestone_id: int, db: Session = Depends(get_db)):
     """Get a specific milestone"""
@@ -405,14 +583,21 @@ def delete_milestone(milestone_id: int, db: Session = Depends(get_db)):
 # EXPENSES
 # ===========================
 
-@router.get("/expenses/initiative/{initiative_id}", response_model=List[RDExpense])
+@router.get("/expenses/initiative/{initiative_id}", response_model=Union[List[RDExpense], SyncPage[RDExpense]])
 def get_expenses_by_initiative(
     initiative_id: int,
     category: Optional[str] = None,
     department: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False,
     db: Session = Depends(get_db)
 ):
     """Get all expenses for an initiative with optional filters"""
+    if updated_since is not None:
+        return _changes(
+            db, "rd_expenses", updated_since, include_deleted,
+            {"category": category, "department": department}, initiative_id=initiative_id
+        )
     expenses = rd_expense.get_expenses_by_initiative(
         db, initiative_id=initiative_id, category=category, department=department
     )
@@ -467,9 +652,16 @@ def delete_expense(expense_id: int, db: Session = Depends(get_db)):
 # REVENUE
 # ===========================
 
-@router.get("/revenue/initiative/{initiative_id}", response_model=List[RDRevenue])
-def get_revenue_by_initiative(initiative_id: int, db: Session = Depends(get_db)):
+@router.get("/revenue/initiative/{initiative_id}", response_model=Union[List[RDRevenue], SyncPage[RDRevenue]])
+def get_revenue_by_initiative(
+    initiative_id: int,
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False,
+    db: Session = Depends(get_db)
+):
     """Get all revenue for an initiative"""
+    if updated_since is not None:
+        return _changes(db, "rd_revenue", updated_since, include_deleted, {}, initiative_id=initiative_id)
     revenue = rd_revenue.get_revenue_by_initiative(db, initiative_id=initiative_id)
     return revenue
 
@@ -522,13 +714,19 @@ def delete_revenue(revenue_id: int, db: Session = Depends(get_db)):
 # NOTES
 # ===========================
 
-@router.get("/notes/initiative/{initiative_id}", response_model=List[RDNote])
+@router.get("/notes/initiative/{initiative_id}", response_model=Union[List[RDNote], SyncPage[RDNote]])
 def get_notes_by_initiative(
     initiative_id: int,
     department: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False,
     db: Session = Depends(get_db)
 ):
     """Get all notes for an initiative"""
+    if updated_since is not None:
+        return _changes(
+            db, "rd_notes", updated_since, include_deleted, {"department": department}, initiative_id=initiative_id
+        )
     notes = rd_note.get_notes_by_initiative(
         db, initiative_id=initiative_id, department=department
     )
@@ -572,10 +770,138 @@ def delete_note(note_id: int, db: Session = Depends(get_db)):
     return {"message": "Note deleted successfully"}
 
 
+# ===========================
+# PIPELINE ANALYTICS
+# ===========================
+
+@router.get("/pipeline/velocity")
+def get_pipeline_velocity(db: Session = Depends(get_db)):
+    """Time in stage, stage conversion and quarterly throughput from the stage history"""
+    return rd_velocity.get_velocity(db)
+
+
+@router.get("/pipeline/forecast")
+def get_pipeline_forecast(
+    weight: Optional[List[str]] = Query(None, description="Override a level's probability, e.g. committed:0.8"),
+    timing: Optional[List[str]] = Query(None, description="Override a timeline's months to order, e.g. 90_days:4"),
+    use_history: bool = Query(True, description="Calibrate the weights against past orders"),
+    horizon_months: int = Query(rd_pipeline_forecast.DEFAULT_HORIZON_MONTHS, ge=1, le=36),
+    db: Session = Depends(get_db)
+):
+    """Probability-weighted expected revenue from open customer interest, per initiative and month"""
+    try:
+        weights = rd_pipeline_forecast.parse_overrides(weight, rd_pipeline_forecast.LEVEL_WEIGHTS, upper=1.0)
+        months = rd_pipeline_forecast.parse_overrides(timing, rd_pipeline_forecast.TIMELINE_MONTHS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return rd_pipeline_forecast.get_pipeline_forecast(
+        db, weights=weights, timing=months, use_history=use_history, horizon_months=horizon_months
+    )
+
+
+# ===========================
+# PORTFOLIO GUIDANCE
+# ===========================
+
+@router.get("/portfolio/recommendations")
+def get_portfolio_recommendations(
+    initiative_id: Optional[int] = None,
+    severity: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Decision guidance per initiative, re-evaluated only where ROI inputs changed"""
+    if severity and severity not in rd_portfolio_rules.SEVERITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown severity: {severity}. Use one of: {', '.join(rd_portfolio_rules.SEVERITIES)}"
+        )
+    return rd_portfolio_rules.get_recommendations(db, initiative_id=initiative_id, severity=severity)
+
+
+# ===========================
+# FOLLOW-UP QUEUE
+# ===========================
+
+@router.get("/queue")
+def get_follow_up_queue(
+    owner: Optional[str] = None,
+    due_before: Optional[date] = None,
+    kind: Optional[List[str]] = Query(None),
+    include_inactive: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """Due and overdue follow-ups, next actions and milestones across all initiatives"""
+    unknown = set(kind or []) - set(rd_queue.KINDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown kind: {', '.join(sorted(unknown))}. Use one of: {', '.join(rd_queue.KINDS)}"
+        )
+    try:
+        return rd_queue.get_queue(
+            db, owner=owner, due_before=due_before, kinds=kind,
+            include_inactive=include_inactive, cursor=cursor, limit=limit
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ===========================
+# SEARCH
+# ===========================
+
+@router.get("/search")
+def search_rd(
+    q: str = Query(..., min_length=1),
+    initiative_id: Optional[int] = None,
+    source: Optional[List[str]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Full-text search over notes, contacts, customer interest, feasibility and sample feedback"""
+    unknown = set(source or []) - set(rd_search.SOURCES)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown source: {', '.join(sorted(unknown))}. Use one of: {', '.join(rd_search.SOURCES)}"
+        )
+    
+    started = time.perf_counter()
+    try:
+        results = rd_search.search(db, q, initiative_id=initiative_id, sources=source, limit=limit)
+    except rd_search.SearchUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {
+        "query": q,
+        "count": len(results),
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        "results": results
+    }
+
+
 # ===========================
 # ROI
 # ===========================
 
+@router.get("/roi", response_model=List[RDROI])
+def get_all_roi(db: Session = Depends(get_db)):
+    """Get the maintained ROI row for every initiative"""
+    return rd_roi.get_all_roi(db)
+
+
+@router.post("/roi/rebuild")
+def rebuild_roi(
+    initiative_id: Optional[int] = None,
+    dry_run: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Recompute ROI rows from expenses, revenue and samples and report any drift"""
+    drift = rd_roi.rebuild_roi(db, initiative_id=initiative_id, dry_run=dry_run)
+    return {"dry_run": dry_run, "drifted": len(drift), "drift": drift}
+
+
 @router.get("/roi/initiative/{initiative_id}", response_model=RDROI)
 def get_roi_by_initiative(initiative_id: int, db: Session = Depends(get_db)):
     """Get ROI data for a specific initiative"""
@@ -594,10 +920,24 @@ def get_roi(roi_id: int, db: Session = Depends(get_db)):
     return roi
 
 
+def _check_roi_fields(roi, allowed=frozenset()):
+    """Reject ROI fields that are derived from expenses, revenue and samples"""
+    derived = sorted(set(roi.model_dump(exclude_unset=True)) - set(rd_roi.EDITABLE_COLUMNS) - set(allowed))
+    if derived:
+        raise HTTPException(
+            status_code=400,
+            detail=f"ROI fields are calculated from expenses, revenue and samples and can't be set: {', '.join(derived)}"
+        )
+
+
 @router.post("/roi", response_model=RDROI)
 def create_roi(roi: RDROICreate, db: Session = Depends(get_db)):
     """Create a new ROI record"""
-    return rd_roi.create_roi(db=db, roi=roi)
+    _check_roi_fields(roi, allowed={"initiative_id"})
+    db_roi = rd_roi.create_roi(db=db, roi=roi)
+    if not db_roi:
+        raise HTTPException(status_code=409, detail="ROI record already exists for this initiative")
+    return db_roi
 
 
 @router.put("/roi/{roi_id}", response_model=RDROI)
@@ -607,6 +947,7 @@ def update_roi(
     db: Session = Depends(get_db)
 ):
     """Update ROI record"""
+    _check_roi_fields(roi)
     db_roi = rd_roi.update_roi(db, roi_id=roi_id, roi=roi)
     if not db_roi:
         raise HTTPException(status_code=404, detail="ROI record not found")
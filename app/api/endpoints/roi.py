@@ -1,16 +1,21 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
 from sqlalchemy.orm import Session
 from datetime import date
 
 from app.database import get_db
 from app.crud.roi import (
     get_roi_metric, get_roi_metrics, get_roi_metrics_by_campaign,
-    get_roi_metrics_by_date_range, get_roi_metrics_with_campaign,
+    get_roi_metrics_by_date_range, roi_metrics_with_campaign_query,
     create_roi_metric, update_roi_metric, delete_roi_metric,
     get_campaign_roi_summary
 )
 from app.schemas.roi import ROIMetric, ROIMetricCreate, ROIMetricUpdate
+from app.services.tabular import tabular_response
+from app.services.attribution import (
+    METHODS, DEFAULT_METHOD, DEFAULT_HALF_LIFE_DAYS, AttributionImportError,
+    parse_touchpoints, run_attribution, get_missing_campaign_ids
+)
 
 router = APIRouter()
 
@@ -20,31 +25,9 @@ def read_roi_metrics(skip: int = 0, limit: int = 100, db: Session = Depends(get_
     return get_roi_metrics(db, skip=skip, limit=limit)
 
 @router.get("/with-campaign")
-def read_roi_metrics_with_campaign(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get ROI metrics with campaign names"""
-    results = get_roi_metrics_with_campaign(db, skip=skip, limit=limit)
-    
-    metrics = []
-    for roi, campaign_name in results:
-        metric_dict = {
-            "id": roi.id,
-            "campaign_id": roi.campaign_id,
-            "calculation_date": roi.calculation_date,
-            "period_start": roi.period_start,
-            "period_end": roi.period_end,
-            "total_cost": roi.total_cost,
-            "revenue_attributed": roi.revenue_attributed,
-            "roi_percentage": roi.roi_percentage,
-            "performance_metrics": roi.performance_metrics,
-            "attribution_method": roi.attribution_method,
-            "attribution_notes": roi.attribution_notes,
-            "created_at": roi.created_at,
-            "updated_at": roi.updated_at,
-            "campaign_name": campaign_name
-        }
-        metrics.append(metric_dict)
-    
-    return metrics
+def read_roi_metrics_with_campaign(request: Request, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    """Get ROI metrics with campaign names (Arrow IPC if requested)"""
+    return tabular_response(request, db, roi_metrics_with_campaign_query(skip=skip, limit=limit))
 
 @router.get("/campaign/{campaign_id}", response_model=List[ROIMetric])
 def read_roi_metrics_by_campaign(campaign_id: int, db: Session = Depends(get_db)):
@@ -84,6 +67,42 @@ def create_new_roi_metric(roi: ROIMetricCreate, db: Session = Depends(get_db)):
     
     return create_roi_metric(db=db, roi=roi)
 
+@router.post("/attribution/import")
+def import_attribution(
+    file: UploadFile = File(..., description="Touchpoint CSV (deal_id, campaign_id, touch_date, deal_amount, close_date)"),
+    period_start: Optional[date] = Query(None, description="First close date to include (defaults to earliest)"),
+    period_end: Optional[date] = Query(None, description="Last close date to include (defaults to latest)"),
+    methods: List[str] = Query(list(METHODS), description="Attribution methods to compute"),
+    half_life_days: float = Query(DEFAULT_HALF_LIFE_DAYS, gt=0, description="Time-decay half-life"),
+    stored_method: str = Query(DEFAULT_METHOD, description="Method whose revenue is stored as the ROI metric"),
+    db: Session = Depends(get_db)
+):
+    """Attribute deal revenue to campaigns from a touchpoint export and store ROI metrics"""
+    unknown = sorted(set(methods + [stored_method]) - set(METHODS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown attribution methods: {unknown}")
+    
+    try:
+        touches = parse_touchpoints(file.file.read())
+        if touches.empty:
+            raise AttributionImportError("No valid touchpoints in file")
+        
+        missing = get_missing_campaign_ids(db, [int(c) for c in touches["campaign_id"].unique()])
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Campaigns not found: {missing}")
+        
+        return run_attribution(
+            db, touches,
+            period_start=period_start,
+            period_end=period_end,
+            methods=methods,
+            half_life_days=half_life_days,
+            source=file.filename,
+            stored_method=stored_method
+        )
+    except AttributionImportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.put("/{roi_id}", response_model=ROIMetric)
 def update_roi_metric_endpoint(roi_id: int, roi_update: ROIMetricUpdate, db: Session = Depends(get_db)):
     """Update an existing ROI metric"""
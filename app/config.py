@@ -9,6 +9,18 @@ class Settings(BaseSettings):
         description="Database connection string"
     )
     
+    # Optional Redis for sharing live-update events across workers
+    redis_url: Optional[str] = Field(
+        default=None,
+        description="Redis connection string for the /api/events hub"
+    )
+    
+    # Worker processes for CPU-heavy simulations (0 runs them in the request thread)
+    simulation_workers: int = Field(
+        default=2,
+        description="Process pool size for budget risk simulations"
+    )
+    
     # FastAPI
     app_title: str = "UTAK Marketing Budget System"
     app_version: str = "1.0.0"
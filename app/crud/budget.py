@@ -1,3 +1,4 @@
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from app.models.budget import BudgetItem
@@ -20,10 +21,10 @@ def get_budget_items_by_cost_center(db: Session, cost_center_id: int) -> List[Bu
 def get_budget_items_by_category(db: Session, category: str) -> List[BudgetItem]:
     return db.query(BudgetItem).filter(BudgetItem.category == category).all()
 
-def get_budget_items_with_relations(db: Session, skip: int = 0, limit: int = 100):
-    """Get budget items with campaign and cost center names"""
+def budget_items_with_relations_query(skip: int = 0, limit: int = 100):
+    """Select of budget items with campaign and cost center names"""
     return (
-        db.query(
+        select(
             BudgetItem,
             Campaign.name.label('campaign_name'),
             CostCenter.name.label('cost_center_name')
@@ -32,9 +33,12 @@ def get_budget_items_with_relations(db: Session, skip: int = 0, limit: int = 100
         .join(CostCenter, BudgetItem.cost_center_id == CostCenter.id)
         .offset(skip)
         .limit(limit)
-        .all()
     )
 
+def get_budget_items_with_relations(db: Session, skip: int = 0, limit: int = 100):
+    """Get budget items with campaign and cost center names"""
+    return db.execute(budget_items_with_relations_query(skip=skip, limit=limit)).all()
+
 def create_budget_item(db: Session, budget_item: BudgetItemCreate) -> BudgetItem:
     # Convert monthly_budget to proper JSON format if it exists
     monthly_budget_json = None
@@ -83,31 +87,22 @@ def delete_budget_item(db: Session, budget_item_id: int) -> bool:
 
 def get_budget_summary_by_campaign(db: Session, campaign_id: int):
     """Get budget summary for a campaign"""
-    budget_items = get_budget_items_by_campaign(db, campaign_id)
-    
-    if not budget_items:
-        return {
-            "campaign_id": campaign_id,
-            "total_budget": 0.0,
-            "item_count": 0,
-            "categories": {}
-        }
-    
-    total_budget = sum(item.total_budget for item in budget_items)
-    categories = {}
+    rows = db.query(
+        BudgetItem.category,
+        func.count(BudgetItem.id),
+        func.coalesce(func.sum(BudgetItem.total_budget), 0.0)
+    ).filter(
+        BudgetItem.campaign_id == campaign_id
+    ).group_by(BudgetItem.category).all()
     
-    for item in budget_items:
-        if item.category not in categories:
-            categories[item.category] = {
-                "count": 0,
-                "total_budget": 0.0
-            }
-        categories[item.category]["count"] += 1
-        categories[item.category]["total_budget"] += item.total_budget
+    categories = {
+        category: {"count": count, "total_budget": float(total)}
+        for category, count, total in rows
+    }
     
     return {
         "campaign_id": campaign_id,
-        "total_budget": total_budget,
-        "item_count": len(budget_items),
+        "total_budget": sum((c["total_budget"] for c in categories.values()), 0.0),
+        "item_count": sum(c["count"] for c in categories.values()),
         "categories": categories
     }
\ No newline at end of file
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func
 from typing import List, Optional
 from app.models.campaign import Campaign
 from app.schemas.campaign import CampaignCreate, CampaignUpdate
@@ -55,11 +55,10 @@ def get_budget_allocation(db: Session, campaign_id: int):
     if not campaign:
         return None
     
-    # Get all direct children
-    children = get_campaigns_by_parent(db, campaign_id)
-    
-    # Sum their budgets
-    allocated = sum(child.total_budget for child in children)
+    # Sum the budgets of all direct children
+    allocated = float(db.query(
+        func.coalesce(func.sum(Campaign.total_budget), 0.0)
+    ).filter(Campaign.parent_id == campaign_id).scalar())
     
     return {
         "campaign_id": campaign_id,
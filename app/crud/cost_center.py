@@ -1,6 +1,9 @@
+from sqlalchemy import exists, func
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
+from app.models.budget import BudgetItem
 from app.models.cost_center import CostCenter
+from app.models.rd_initiative import RDExpense
 from app.schemas.cost_center import CostCenterCreate, CostCenterUpdate
 
 def get_cost_center(db: Session, cost_center_id: int) -> Optional[CostCenter]:
@@ -42,4 +45,16 @@ def delete_cost_center(db: Session, cost_center_id: int) -> bool:
         db_cost_center.is_active = False
         db.commit()
         return True
-    return False
\ No newline at end of file
+    return False
+
+def get_cost_center_usage(db: Session, cost_center: CostCenter) -> Dict[str, bool]:
+    """Whether any budget item or R&D expense still points at a cost center (EXISTS, no rows loaded)"""
+    has_budget_items = db.query(exists().where(BudgetItem.cost_center_id == cost_center.id)).scalar()
+    has_rd_expenses = db.query(
+        exists().where(func.upper(func.trim(RDExpense.cost_center)) == func.upper(cost_center.code))
+    ).scalar()
+    return {
+        "in_use": bool(has_budget_items or has_rd_expenses),
+        "budget_items": bool(has_budget_items),
+        "rd_expenses": bool(has_rd_expenses),
+    }
\ No newline at end of file
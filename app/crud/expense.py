@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import extract, func
+from sqlalchemy import case, extract, func, select
 from typing import List, Optional
 from datetime import date, datetime
 from app.models.expense import ActualExpense
@@ -28,10 +28,10 @@ def get_expenses_by_month(db: Session, year: int, month: int) -> List[ActualExpe
         extract('month', ActualExpense.expense_date) == month
     ).all()
 
-def get_expenses_with_details(db: Session, skip: int = 0, limit: int = 100):
-    """Get expenses with budget item, campaign, and category information"""
+def expenses_with_details_query(skip: int = 0, limit: int = 100):
+    """Select of expenses with budget item, campaign, and category information"""
     return (
-        db.query(
+        select(
             ActualExpense,
             BudgetItem.name.label('budget_item_name'),
             Campaign.name.label('campaign_name'),
@@ -41,9 +41,12 @@ def get_expenses_with_details(db: Session, skip: int = 0, limit: int = 100):
         .join(Campaign, BudgetItem.campaign_id == Campaign.id)
         .offset(skip)
         .limit(limit)
-        .all()
     )
 
+def get_expenses_with_details(db: Session, skip: int = 0, limit: int = 100):
+    """Get expenses with budget item, campaign, and category information"""
+    return db.execute(expenses_with_details_query(skip=skip, limit=limit)).all()
+
 def create_expense(db: Session, expense: ActualExpenseCreate) -> ActualExpense:
     db_expense = ActualExpense(**expense.dict())
     db.add(db_expense)
@@ -82,9 +85,13 @@ def get_budget_vs_actual(db: Session, budget_item_id: int, year: int, month: int
         monthly_budget = float(budget_item.monthly_budget[str(month)])
     
     # Get actual expenses for this month
-    expenses = get_expenses_by_month(db, year, month)
-    budget_expenses = [e for e in expenses if e.budget_item_id == budget_item_id]
-    actual_total = sum(e.amount for e in budget_expenses)
+    actual_total = float(db.query(
+        func.coalesce(func.sum(ActualExpense.amount), 0.0)
+    ).filter(
+        ActualExpense.budget_item_id == budget_item_id,
+        extract('year', ActualExpense.expense_date) == year,
+        extract('month', ActualExpense.expense_date) == month
+    ).scalar())
     
     variance = actual_total - monthly_budget
     variance_pct = (variance / monthly_budget * 100) if monthly_budget > 0 else 0
@@ -101,22 +108,61 @@ def get_budget_vs_actual(db: Session, budget_item_id: int, year: int, month: int
         "over_budget": variance > 0
     }
 
+def variance_report_query(year: int, month: int):
+    """Select of budgeted vs actual spending for every budget item in one month"""
+    month_start = date(year, month, 1)
+    next_month = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    # Date range instead of extract() so the expense_date index can be used
+    actuals = select(
+        ActualExpense.budget_item_id,
+        func.sum(ActualExpense.amount).label("actual")
+    ).where(
+        ActualExpense.expense_date >= month_start,
+        ActualExpense.expense_date < next_month
+    ).group_by(ActualExpense.budget_item_id).subquery()
+    
+    budgeted = func.coalesce(BudgetItem.monthly_budget[str(month)].as_float(), 0.0)
+    actual = func.coalesce(actuals.c.actual, 0.0)
+    variance = actual - budgeted
+    return (
+        select(
+            BudgetItem.id.label("budget_item_id"),
+            BudgetItem.name.label("budget_item_name"),
+            Campaign.name.label("campaign_name"),
+            BudgetItem.category,
+            budgeted.label("budgeted"),
+            actual.label("actual"),
+            variance.label("variance"),
+            case((budgeted > 0, variance / budgeted * 100), else_=0.0).label("variance_percentage"),
+            (variance > 0).label("over_budget")
+        )
+        .join(Campaign, BudgetItem.campaign_id == Campaign.id)
+        .outerjoin(actuals, actuals.c.budget_item_id == BudgetItem.id)
+        .order_by(BudgetItem.id)
+    )
+
 def get_campaign_spending_summary(db: Session, campaign_id: int, year: int = None):
     """Get total spending for a campaign"""
-    # Get all budget items for this campaign
-    budget_items = db.query(BudgetItem).filter(BudgetItem.campaign_id == campaign_id).all()
-    budget_item_ids = [bi.id for bi in budget_items]
-    
-    # Get all expenses for these budget items
-    query = db.query(ActualExpense).filter(ActualExpense.budget_item_id.in_(budget_item_ids))
+    total_budgeted = db.query(
+        func.coalesce(func.sum(BudgetItem.total_budget), 0.0)
+    ).filter(BudgetItem.campaign_id == campaign_id).scalar_subquery()
     
+    expense_filter = [BudgetItem.campaign_id == campaign_id]
     if year:
-        query = query.filter(extract('year', ActualExpense.expense_date) == year)
+        # Date range instead of extract() so the expense_date index can be used
+        expense_filter.append(ActualExpense.expense_date.between(date(year, 1, 1), date(year, 12, 31)))
     
-    expenses = query.all()
+    expense_totals = db.query(
+        func.coalesce(func.sum(ActualExpense.amount), 0.0).label("total_actual"),
+        func.count(ActualExpense.id).label("expense_count")
+    ).join(
+        BudgetItem, ActualExpense.budget_item_id == BudgetItem.id
+    ).filter(*expense_filter).subquery()
     
-    total_budgeted = sum(bi.total_budget for bi in budget_items)
-    total_actual = sum(e.amount for e in expenses)
+    total_budgeted, total_actual, expense_count = db.query(
+        total_budgeted, expense_totals.c.total_actual, expense_totals.c.expense_count
+    ).one()
+    total_budgeted, total_actual = float(total_budgeted), float(total_actual)
     
     return {
         "campaign_id": campaign_id,
@@ -125,5 +171,5 @@ def get_campaign_spending_summary(db: Session, campaign_id: int, year: int = Non
         "total_actual": total_actual,
         "variance": total_actual - total_budgeted,
         "variance_percentage": ((total_actual - total_budgeted) / total_budgeted * 100) if total_budgeted > 0 else 0,
-        "expense_count": len(expenses)
+        "expense_count": expense_count
     }
\ No newline at end of file
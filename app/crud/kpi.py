@@ -1,9 +1,15 @@
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.models.kpi import KPIMetric, KPISnapshot
 from app.schemas.kpi import KPIMetricCreate, KPIMetricUpdate, KPISnapshotCreate
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import date
 
+# Rows per INSERT statement in bulk loads (keeps SQLite under its bind-parameter limit)
+BULK_UPSERT_CHUNK_SIZE = 500
+
 # ==================== KPI METRICS ====================
 
 def create_metric(db: Session, metric: KPIMetricCreate) -> KPIMetric:
@@ -19,6 +25,12 @@ def get_all_metrics(db: Session) -> List[KPIMetric]:
 def get_metric(db: Session, metric_id: int) -> Optional[KPIMetric]:
     return db.query(KPIMetric).filter(KPIMetric.id == metric_id).first()
 
+def get_existing_metric_ids(db: Session, metric_ids: List[int]) -> set:
+    return {
+        metric_id for (metric_id,) in
+        db.query(KPIMetric.id).filter(KPIMetric.id.in_(metric_ids)).all()
+    }
+
 def update_metric(db: Session, metric_id: int, metric: KPIMetricUpdate) -> Optional[KPIMetric]:
     db_metric = get_metric(db, metric_id)
     if not db_metric:
@@ -43,24 +55,85 @@ def delete_metric(db: Session, metric_id: int) -> bool:
 # ==================== KPI SNAPSHOTS ====================
 
 def create_snapshot(db: Session, snapshot: KPISnapshotCreate) -> KPISnapshot:
-    db_snapshot = KPISnapshot(**snapshot.dict())
-    db.add(db_snapshot)
+    # Re-logging the same metric/date/type overwrites the existing data point
+    db_snapshot = get_snapshot_by_date(db, snapshot.metric_id, snapshot.snapshot_date, snapshot.snapshot_type)
+    if db_snapshot:
+        db_snapshot.actual_value = snapshot.actual_value
+        db_snapshot.notes = snapshot.notes
+    else:
+        db_snapshot = KPISnapshot(**snapshot.dict())
+        db.add(db_snapshot)
     db.commit()
     db.refresh(db_snapshot)
     return db_snapshot
 
+def bulk_upsert_snapshots(db: Session, snapshots: List[KPISnapshotCreate]) -> Dict[str, int]:
+    """Insert or update many snapshots in one transaction
+    
+    Upserts on (metric_id, snapshot_date, snapshot_type) with ON CONFLICT DO UPDATE.
+    Freshly inserted rows come back with a NULL updated_at, which is how
+    inserted and updated rows are told apart.
+    """
+    # If a key repeats within one load, the last row wins
+    rows = {}
+    for snapshot in snapshots:
+        row = snapshot.dict()
+        rows[(row["metric_id"], row["snapshot_date"], row["snapshot_type"])] = row
+    rows = list(rows.values())
+    
+    insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    inserted = 0
+    updated = 0
+    
+    try:
+        for start in range(0, len(rows), BULK_UPSERT_CHUNK_SIZE):
+            stmt = insert(KPISnapshot).values(rows[start:start + BULK_UPSERT_CHUNK_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[KPISnapshot.metric_id, KPISnapshot.snapshot_date, KPISnapshot.snapshot_type],
+                set_={
+                    "actual_value": stmt.excluded.actual_value,
+                    "notes": stmt.excluded.notes,
+                    "updated_at": func.now()
+                }
+            ).returning(KPISnapshot.updated_at)
+            
+            for updated_at in db.execute(stmt).scalars():
+                if updated_at is None:
+                    inserted += 1
+                else:
+                    updated += 1
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    return {
+        "received": len(snapshots),
+        "inserted": inserted,
+        "updated": updated
+    }
+
+def all_snapshots_query(skip: int = 0, limit: int = 100):
+    return select(KPISnapshot).order_by(KPISnapshot.id).offset(skip).limit(limit)
+
+def get_all_snapshots(db: Session, skip: int = 0, limit: int = 100) -> List[KPISnapshot]:
+    return db.execute(all_snapshots_query(skip, limit)).scalars().all()
+
+def snapshots_for_metric_query(metric_id: int, snapshot_type: Optional[str] = None, limit: int = 12):
+    query = select(KPISnapshot).where(KPISnapshot.metric_id == metric_id)
+    
+    if snapshot_type:
+        query = query.where(KPISnapshot.snapshot_type == snapshot_type)
+    
+    return query.order_by(KPISnapshot.snapshot_date.desc()).limit(limit)
+
 def get_snapshots_for_metric(
     db: Session,
     metric_id: int,
     snapshot_type: Optional[str] = None,
     limit: int = 12
 ) -> List[KPISnapshot]:
-    query = db.query(KPISnapshot).filter(KPISnapshot.metric_id == metric_id)
-    
-    if snapshot_type:
-        query = query.filter(KPISnapshot.snapshot_type == snapshot_type)
-    
-    return query.order_by(KPISnapshot.snapshot_date.desc()).limit(limit).all()
+    return db.execute(snapshots_for_metric_query(metric_id, snapshot_type, limit)).scalars().all()
 
 def get_latest_snapshot(
     db: Session,
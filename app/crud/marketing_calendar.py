@@ -1,6 +1,8 @@
+from sqlalchemy import case, func, update, not_
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional, Dict
 from app.models.marketing_calendar import MarketingCalendar, MarketingActivity
+from app.services.delta_sync import record_deleted
 from app.schemas.marketing_calendar import (
     MarketingCalendarCreate, MarketingCalendarUpdate,
     MarketingActivityCreate, MarketingActivityUpdate
@@ -131,14 +133,26 @@ def update_activity(db: Session, activity_id: int, activity_update: MarketingAct
     return db_activity
 
 def toggle_activity_completion(db: Session, activity_id: int) -> Optional[MarketingActivity]:
-    """Toggle completion status of an activity"""
-    db_activity = get_activity(db, activity_id)
+    """Toggle completion status of an activity
+    
+    Flips the flag in the database with a single UPDATE ... RETURNING so
+    concurrent toggles from different workers can't overwrite each other.
+    """
+    stmt = (
+        update(MarketingActivity)
+        .where(MarketingActivity.id == activity_id)
+        .values(is_completed=not_(MarketingActivity.is_completed))
+        .returning(MarketingActivity)
+        .execution_options(synchronize_session=False)
+    )
+    db_activity = db.execute(stmt).scalar_one_or_none()
     if not db_activity:
+        db.rollback()
         return None
     
-    db_activity.is_completed = not db_activity.is_completed
+    # Detach before commit so the returned row isn't expired and re-selected
+    db.expunge(db_activity)
     db.commit()
-    db.refresh(db_activity)
     return db_activity
 
 def delete_activity(db: Session, activity_id: int) -> bool:
@@ -153,10 +167,13 @@ def delete_activity(db: Session, activity_id: int) -> bool:
 
 def delete_activities_by_week(db: Session, calendar_id: int, week_number: int) -> int:
     """Delete all activities for a specific week"""
-    count = db.query(MarketingActivity).filter(
+    query = db.query(MarketingActivity).filter(
         MarketingActivity.calendar_id == calendar_id,
         MarketingActivity.week_number == week_number
-    ).delete()
+    )
+    # A bulk delete skips mapper events, so tombstone the rows for delta sync here
+    record_deleted(db, MarketingActivity, query.with_entities(MarketingActivity.id))
+    count = query.delete()
     db.commit()
     return count
 
@@ -166,10 +183,10 @@ def delete_activities_by_week(db: Session, calendar_id: int, week_number: int) -
 
 def get_calendar_completion_stats(db: Session, calendar_id: int) -> Dict:
     """Get completion statistics for a calendar"""
-    activities = get_activities_by_calendar(db, calendar_id)
-    
-    total = len(activities)
-    completed = sum(1 for a in activities if a.is_completed)
+    total, completed = db.query(
+        func.count(MarketingActivity.id),
+        func.coalesce(func.sum(case((MarketingActivity.is_completed, 1), else_=0)), 0)
+    ).filter(MarketingActivity.calendar_id == calendar_id).one()
     
     return {
         "total_activities": total,
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.models.rd_initiative import RDCustomerInterest
+from app.models.rd_initiative import RDCustomerInterest, RDInterestLevelTransition
 from app.schemas.rd_customer_interest import RDCustomerInterestCreate, RDCustomerInterestUpdate
 
 
@@ -27,6 +27,8 @@ def create_customer_interest(db: Session, interest: RDCustomerInterestCreate) ->
     """Create a new customer interest record"""
     db_interest = RDCustomerInterest(**interest.model_dump())
     db.add(db_interest)
+    db.flush()
+    record_level_transition(db, db_interest.id, None, db_interest.interest_level)
     db.commit()
     db.refresh(db_interest)
     return db_interest
@@ -42,15 +44,24 @@ def update_customer_interest(
     if not db_interest:
         return None
     
+    previous_level = db_interest.interest_level
     update_data = interest.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_interest, field, value)
     
+    if db_interest.interest_level != previous_level:
+        record_level_transition(db, db_interest.id, previous_level, db_interest.interest_level)
+    
     db.commit()
     db.refresh(db_interest)
     return db_interest
 
 
+def record_level_transition(db: Session, interest_id: int, from_level: Optional[str], to_level: str):
+    """Append an interest level change to the history, in the caller's transaction"""
+    db.add(RDInterestLevelTransition(customer_interest_id=interest_id, from_level=from_level, to_level=to_level))
+
+
 def delete_customer_interest(db: Session, interest_id: int) -> bool:
     """Delete customer interest record"""
     db_interest = get_customer_interest(db, interest_id)
@@ -1,5 +1,7 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from app.crud.rd_roi import apply_roi_change, apply_roi_delta, expense_contribution
 from app.models.rd_initiative import RDExpense
 from app.schemas.rd_expense import RDExpenseCreate, RDExpenseUpdate
 
@@ -30,6 +32,8 @@ def create_expense(db: Session, expense: RDExpenseCreate) -> RDExpense:
     """Create a new expense"""
     db_expense = RDExpense(**expense.model_dump())
     db.add(db_expense)
+    db.flush()
+    apply_roi_delta(db, db_expense.initiative_id, expense_contribution(db_expense))
     db.commit()
     db.refresh(db_expense)
     return db_expense
@@ -45,9 +49,11 @@ def update_expense(
     if not db_expense:
         return None
     
+    previous = (db_expense.initiative_id, expense_contribution(db_expense))
     update_data = expense.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_expense, field, value)
+    apply_roi_change(db, previous, (db_expense.initiative_id, expense_contribution(db_expense)))
     
     db.commit()
     db.refresh(db_expense)
@@ -60,6 +66,7 @@ def delete_expense(db: Session, expense_id: int) -> bool:
     if not db_expense:
         return False
     
+    apply_roi_delta(db, db_expense.initiative_id, expense_contribution(db_expense), sign=-1)
     db.delete(db_expense)
     db.commit()
     return True
@@ -67,5 +74,7 @@ def delete_expense(db: Session, expense_id: int) -> bool:
 
 def get_total_expenses(db: Session, initiative_id: int) -> float:
     """Calculate total expenses for an initiative"""
-    expenses = get_expenses_by_initiative(db, initiative_id)
-    return sum(exp.amount for exp in expenses)
\ No newline at end of file
+    total = db.query(
+        func.coalesce(func.sum(RDExpense.amount), 0.0)
+    ).filter(RDExpense.initiative_id == initiative_id).scalar()
+    return float(total)
\ No newline at end of file
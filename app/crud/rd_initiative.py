@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
-from app.models.rd_initiative import RDInitiative
+from app.models.rd_initiative import RDInitiative, RDStageTransition
 from app.schemas.rd_initiative import RDInitiativeCreate, RDInitiativeUpdate
 
 
@@ -35,6 +35,8 @@ def create_initiative(db: Session, initiative: RDInitiativeCreate) -> RDInitiati
     """Create a new R&D initiative"""
     db_initiative = RDInitiative(**initiative.model_dump())
     db.add(db_initiative)
+    db.flush()
+    record_stage_transition(db, db_initiative.id, None, db_initiative.stage)
     db.commit()
     db.refresh(db_initiative)
     return db_initiative
@@ -50,15 +52,31 @@ def update_initiative(
     if not db_initiative:
         return None
     
+    previous_stage = db_initiative.stage
     update_data = initiative.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_initiative, field, value)
     
+    if db_initiative.stage != previous_stage:
+        record_stage_transition(db, db_initiative.id, previous_stage, db_initiative.stage)
+    
     db.commit()
     db.refresh(db_initiative)
     return db_initiative
 
 
+def record_stage_transition(db: Session, initiative_id: int, from_stage: Optional[str], to_stage: str):
+    """Append a stage change to the history, in the caller's transaction"""
+    db.add(RDStageTransition(initiative_id=initiative_id, from_stage=from_stage, to_stage=to_stage))
+
+
+def get_stage_history(db: Session, initiative_id: int) -> List[RDStageTransition]:
+    """Stage changes for an initiative, oldest first"""
+    return db.query(RDStageTransition).filter(
+        RDStageTransition.initiative_id == initiative_id
+    ).order_by(RDStageTransition.transitioned_at, RDStageTransition.id).all()
+
+
 def delete_initiative(db: Session, initiative_id: int) -> bool:
     """Delete an R&D initiative"""
     db_initiative = get_initiative(db, initiative_id)
@@ -1,5 +1,7 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from app.crud.rd_roi import apply_roi_change, apply_roi_delta, revenue_contribution
 from app.models.rd_initiative import RDRevenue
 from app.schemas.rd_revenue import RDRevenueCreate, RDRevenueUpdate
 
@@ -18,6 +20,8 @@ def create_revenue(db: Session, revenue: RDRevenueCreate) -> RDRevenue:
     """Create a new revenue record"""
     db_revenue = RDRevenue(**revenue.model_dump())
     db.add(db_revenue)
+    db.flush()
+    apply_roi_delta(db, db_revenue.initiative_id, revenue_contribution(db_revenue))
     db.commit()
     db.refresh(db_revenue)
     return db_revenue
@@ -33,9 +37,11 @@ def update_revenue(
     if not db_revenue:
         return None
     
+    previous = (db_revenue.initiative_id, revenue_contribution(db_revenue))
     update_data = revenue.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_revenue, field, value)
+    apply_roi_change(db, previous, (db_revenue.initiative_id, revenue_contribution(db_revenue)))
     
     db.commit()
     db.refresh(db_revenue)
@@ -48,6 +54,7 @@ def delete_revenue(db: Session, revenue_id: int) -> bool:
     if not db_revenue:
         return False
     
+    apply_roi_delta(db, db_revenue.initiative_id, revenue_contribution(db_revenue), sign=-1)
     db.delete(db_revenue)
     db.commit()
     return True
@@ -55,5 +62,7 @@ def delete_revenue(db: Session, revenue_id: int) -> bool:
 
 def get_total_revenue(db: Session, initiative_id: int) -> float:
     """Calculate total revenue for an initiative"""
-    revenue_records = get_revenue_by_initiative(db, initiative_id)
-    return sum(rev.order_value for rev in revenue_records)
\ No newline at end of file
+    total = db.query(
+        func.coalesce(func.sum(RDRevenue.order_value), 0.0)
+    ).filter(RDRevenue.initiative_id == initiative_id).scalar()
+    return float(total)
\ No newline at end of file
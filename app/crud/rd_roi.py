@@ -1,8 +1,31 @@
+from datetime import date
+from sqlalchemy import case, func, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from typing import Optional
-from app.models.rd_initiative import RDROI
+from typing import Dict, List, Optional
+from app.models.rd_initiative import RDROI, RDExpense, RDRevenue, RDSample
 from app.schemas.rd_roi import RDROICreate, RDROIUpdate
 
+# RDROI is kept current incrementally: every rd_expense, rd_revenue and
+# rd_sample write applies its delta to the initiative's row in the same
+# transaction. Investment is the expense ledger (as in the Financials tab);
+# samples contribute the sent/converted counts.
+
+# Expense category -> RDROI cost column (anything else is "other")
+EXPENSE_COST_COLUMNS = {
+    "samples": "total_sample_cost",
+    "marketing": "total_marketing_cost",
+    "materials": "total_development_cost",
+    "staffing": "total_development_cost",
+    "development": "total_development_cost",
+}
+OTHER_COST_COLUMN = "total_other_costs"
+COST_COLUMNS = ["total_development_cost", "total_sample_cost", "total_marketing_cost", "total_other_costs"]
+COUNTER_COLUMNS = COST_COLUMNS + ["total_revenue", "total_orders", "samples_sent_count", "samples_converted_count"]
+# The only fields a client may set; everything else is derived
+EDITABLE_COLUMNS = ["notes"]
+
 
 def get_roi(db: Session, roi_id: int) -> Optional[RDROI]:
     """Get ROI record"""
@@ -14,13 +37,32 @@ def get_roi_by_initiative(db: Session, initiative_id: int) -> Optional[RDROI]:
     return db.query(RDROI).filter(RDROI.initiative_id == initiative_id).first()
 
 
-def create_roi(db: Session, roi: RDROICreate) -> RDROI:
-    """Create ROI record"""
-    db_roi = RDROI(**roi.model_dump())
-    db.add(db_roi)
+def get_all_roi(db: Session) -> List[RDROI]:
+    """Get ROI rows for every initiative"""
+    return db.query(RDROI).order_by(RDROI.initiative_id).all()
+
+
+def create_roi(db: Session, roi: RDROICreate) -> Optional[RDROI]:
+    """Create an initiative's ROI record from its ledger; None if it already has one"""
+    counters = compute_roi_totals(db, roi.initiative_id).get(
+        roi.initiative_id, {c: 0 for c in COUNTER_COLUMNS}
+    )
+    # Expense, revenue and sample writes may have created the row already
+    roi_id = db.execute(
+        _insert(db)(RDROI).values(initiative_id=roi.initiative_id, notes=roi.notes, **counters)
+        .on_conflict_do_nothing(index_elements=[RDROI.initiative_id])
+        .returning(RDROI.id)
+    ).scalar()
+    if roi_id is None:
+        db.rollback()
+        return None
+    
+    db.execute(
+        update(RDROI).where(RDROI.id == roi_id).values(_derived_values())
+        .execution_options(synchronize_session=False)
+    )
     db.commit()
-    db.refresh(db_roi)
-    return db_roi
+    return get_roi(db, roi_id)
 
 
 def update_roi(
@@ -28,14 +70,15 @@ def update_roi(
     roi_id: int,
     roi: RDROIUpdate
 ) -> Optional[RDROI]:
-    """Update ROI record"""
+    """Update ROI record (counters and derived figures are maintained from the ledger)"""
     db_roi = get_roi(db, roi_id)
     if not db_roi:
         return None
     
     update_data = roi.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_roi, field, value)
+    for field in EDITABLE_COLUMNS:
+        if field in update_data:
+            setattr(db_roi, field, update_data[field])
     
     db.commit()
     db.refresh(db_roi)
@@ -50,4 +93,157 @@ def delete_roi(db: Session, roi_id: int) -> bool:
     
     db.delete(db_roi)
     db.commit()
-    return True
\ No newline at end of file
+    return True
+
+
+# ========================================
+# Incremental maintenance
+# ========================================
+
+def expense_contribution(expense: RDExpense) -> Dict[str, float]:
+    """What an expense adds to its initiative's ROI row"""
+    column = EXPENSE_COST_COLUMNS.get((expense.expense_category or "").strip().lower(), OTHER_COST_COLUMN)
+    return {column: expense.amount or 0.0}
+
+
+def revenue_contribution(revenue: RDRevenue) -> Dict[str, float]:
+    """What a revenue record adds to its initiative's ROI row"""
+    return {"total_revenue": revenue.order_value or 0.0, "total_orders": 1}
+
+
+def sample_contribution(sample: RDSample) -> Dict[str, float]:
+    """What a sample adds to its initiative's ROI row"""
+    return {"samples_sent_count": 1, "samples_converted_count": 1 if sample.converted_to_order == "yes" else 0}
+
+
+def _insert(db: Session):
+    return postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+
+
+def _derived_values():
+    investment = sum(func.coalesce(getattr(RDROI, c), 0.0) for c in COST_COLUMNS)
+    sent = func.coalesce(RDROI.samples_sent_count, 0)
+    return {
+        "total_investment": investment,
+        "roi_percentage": case(
+            (investment > 0, (func.coalesce(RDROI.total_revenue, 0.0) - investment) * 100.0 / investment),
+            else_=None
+        ),
+        "conversion_rate": case(
+            (sent > 0, func.coalesce(RDROI.samples_converted_count, 0) * 100.0 / sent),
+            else_=None
+        ),
+        "last_calculated_date": date.today(),
+    }
+
+
+def apply_roi_delta(db: Session, initiative_id: int, deltas: Dict[str, float], sign: int = 1):
+    """Add (or with sign=-1 remove) a contribution to an initiative's ROI row, without committing"""
+    if not any(deltas.values()):
+        return
+    
+    # Create the row if missing; a concurrent writer creating it first is not an error
+    db.execute(
+        _insert(db)(RDROI).values(initiative_id=initiative_id, **{c: 0 for c in COUNTER_COLUMNS})
+        .on_conflict_do_nothing(index_elements=[RDROI.initiative_id])
+    )
+    
+    # Relative updates so concurrent writers can't lose each other's deltas
+    db.execute(
+        update(RDROI).where(RDROI.initiative_id == initiative_id).values({
+            column: func.coalesce(getattr(RDROI, column), 0) + sign * value
+            for column, value in deltas.items() if value
+        }).execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(RDROI).where(RDROI.initiative_id == initiative_id).values(_derived_values())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def apply_roi_change(db: Session, old: Optional[tuple], new: Optional[tuple]):
+    """Swap an old (initiative_id, contribution) for a new one"""
+    if old == new:
+        return
+    if old:
+        apply_roi_delta(db, old[0], old[1], sign=-1)
+    if new:
+        apply_roi_delta(db, new[0], new[1])
+
+
+# ========================================
+# Rebuild
+# ========================================
+
+def compute_roi_totals(db: Session, initiative_id: Optional[int] = None) -> Dict[int, Dict[str, float]]:
+    """Recompute every counter from the source tables with one GROUP BY per table"""
+    totals: Dict[int, Dict[str, float]] = {}
+    
+    def row(initiative):
+        return totals.setdefault(initiative, {c: 0 for c in COUNTER_COLUMNS})
+    
+    category = func.lower(func.trim(RDExpense.expense_category))
+    cost_column = case(
+        *[(category == name, column) for name, column in EXPENSE_COST_COLUMNS.items()],
+        else_=OTHER_COST_COLUMN
+    )
+    expenses = db.query(RDExpense.initiative_id, cost_column, func.sum(RDExpense.amount))
+    revenue = db.query(RDRevenue.initiative_id, func.sum(RDRevenue.order_value), func.count(RDRevenue.id))
+    samples = db.query(
+        RDSample.initiative_id,
+        func.count(RDSample.id),
+        func.sum(case((RDSample.converted_to_order == "yes", 1), else_=0))
+    )
+    if initiative_id is not None:
+        expenses = expenses.filter(RDExpense.initiative_id == initiative_id)
+        revenue = revenue.filter(RDRevenue.initiative_id == initiative_id)
+        samples = samples.filter(RDSample.initiative_id == initiative_id)
+    
+    for initiative, column, amount in expenses.group_by(RDExpense.initiative_id, cost_column).all():
+        row(initiative)[column] += float(amount or 0)
+    for initiative, amount, orders in revenue.group_by(RDRevenue.initiative_id).all():
+        row(initiative).update(total_revenue=float(amount or 0), total_orders=orders)
+    for initiative, sent, converted in samples.group_by(RDSample.initiative_id).all():
+        row(initiative).update(samples_sent_count=sent, samples_converted_count=int(converted or 0))
+    return totals
+
+
+def rebuild_roi(db: Session, initiative_id: Optional[int] = None, dry_run: bool = False) -> List[Dict]:
+    """Recompute ROI rows from scratch; returns the drift found (and fixed unless dry_run)"""
+    expected = compute_roi_totals(db, initiative_id)
+    query = db.query(RDROI)
+    if initiative_id is not None:
+        query = query.filter(RDROI.initiative_id == initiative_id)
+    stored = {r.initiative_id: r for r in query.all()}
+    
+    drift = []
+    for initiative in sorted(set(expected) | set(stored)):
+        values = expected.get(initiative, {c: 0 for c in COUNTER_COLUMNS})
+        current = stored.get(initiative)
+        differences = {
+            column: {"stored": getattr(current, column) if current else None, "expected": value}
+            for column, value in values.items()
+            if current is None or abs((getattr(current, column) or 0) - value) > 0.005
+        }
+        if not differences:
+            continue
+        drift.append({"initiative_id": initiative, "missing_row": current is None, "fields": differences})
+        
+        if dry_run:
+            continue
+        if current is None:
+            db.add(RDROI(initiative_id=initiative, **values))
+            db.flush()
+        else:
+            db.execute(
+                update(RDROI).where(RDROI.initiative_id == initiative).values(values)
+                .execution_options(synchronize_session=False)
+            )
+        db.execute(
+            update(RDROI).where(RDROI.initiative_id == initiative).values(_derived_values())
+            .execution_options(synchronize_session=False)
+        )
+    
+    if not dry_run:
+        db.commit()
+    return drift
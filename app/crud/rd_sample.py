@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from app.crud.rd_roi import apply_roi_change, apply_roi_delta, sample_contribution
 from app.models.rd_initiative import RDSample
 from app.schemas.rd_sample import RDSampleCreate, RDSampleUpdate
 
@@ -18,6 +19,8 @@ def create_sample(db: Session, sample: RDSampleCreate) -> RDSample:
     """Create a new sample record"""
     db_sample = RDSample(**sample.model_dump())
     db.add(db_sample)
+    db.flush()
+    apply_roi_delta(db, db_sample.initiative_id, sample_contribution(db_sample))
     db.commit()
     db.refresh(db_sample)
     return db_sample
@@ -33,9 +36,11 @@ def update_sample(
     if not db_sample:
         return None
     
+    previous = (db_sample.initiative_id, sample_contribution(db_sample))
     update_data = sample.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_sample, field, value)
+    apply_roi_change(db, previous, (db_sample.initiative_id, sample_contribution(db_sample)))
     
     db.commit()
     db.refresh(db_sample)
@@ -48,6 +53,7 @@ def delete_sample(db: Session, sample_id: int) -> bool:
     if not db_sample:
         return False
     
+    apply_roi_delta(db, db_sample.initiative_id, sample_contribution(db_sample), sign=-1)
     db.delete(db_sample)
     db.commit()
     return True
@@ -1,3 +1,4 @@
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
@@ -25,18 +26,20 @@ def get_roi_metrics_by_date_range(db: Session, start_date: date, end_date: date)
         ROIMetric.period_end <= end_date
     ).all()
 
-def get_roi_metrics_with_campaign(db: Session, skip: int = 0, limit: int = 100):
+def roi_metrics_with_campaign_query(skip: int = 0, limit: int = 100):
     return (
-        db.query(
+        select(
             ROIMetric,
             Campaign.name.label('campaign_name')
         )
         .join(Campaign, ROIMetric.campaign_id == Campaign.id)
         .offset(skip)
         .limit(limit)
-        .all()
     )
 
+def get_roi_metrics_with_campaign(db: Session, skip: int = 0, limit: int = 100):
+    return db.execute(roi_metrics_with_campaign_query(skip=skip, limit=limit)).all()
+
 def create_roi_metric(db: Session, roi: ROIMetricCreate) -> ROIMetric:
     roi_percentage = calculate_roi_percentage(roi.revenue_attributed, roi.total_cost)
     
@@ -89,25 +92,16 @@ def delete_roi_metric(db: Session, roi_id: int) -> bool:
     return False
 
 def get_campaign_roi_summary(db: Session, campaign_id: int):
-    roi_metrics = get_roi_metrics_by_campaign(db, campaign_id)
-    
-    if not roi_metrics:
-        return {
-            "campaign_id": campaign_id,
-            "total_cost": 0.0,
-            "total_revenue": 0.0,
-            "overall_roi": 0.0,
-            "metric_count": 0
-        }
-    
-    total_cost = sum(m.total_cost for m in roi_metrics)
-    total_revenue = sum(m.revenue_attributed for m in roi_metrics)
-    overall_roi = calculate_roi_percentage(total_revenue, total_cost)
+    total_cost, total_revenue, metric_count = db.query(
+        func.coalesce(func.sum(ROIMetric.total_cost), 0.0),
+        func.coalesce(func.sum(ROIMetric.revenue_attributed), 0.0),
+        func.count(ROIMetric.id)
+    ).filter(ROIMetric.campaign_id == campaign_id).one()
     
     return {
         "campaign_id": campaign_id,
-        "total_cost": total_cost,
-        "total_revenue": total_revenue,
-        "overall_roi": overall_roi,
-        "metric_count": len(roi_metrics)
+        "total_cost": float(total_cost),
+        "total_revenue": float(total_revenue),
+        "overall_roi": calculate_roi_percentage(total_revenue, total_cost),
+        "metric_count": metric_count
     }
\ No newline at end of file
@@ -34,11 +34,26 @@ from app.models.rd_initiative import (
     RDROI,
     RDExpense,
     RDRevenue,
-    RDNote
+    RDNote,
+    RDStageTransition,
+    RDInterestLevelTransition,
+    RDRecommendation
 )
 
+# Delta-sync tombstones; importing the service registers the listeners that write them
+from app.models.sync import DeletedRecord
+import app.services.delta_sync
+
 Base.metadata.create_all(bind=engine)
 
+# Full-text index over R&D free text (FTS5 / tsvector, not an ORM table)
+from app.services.rd_search import ensure_search_index
+ensure_search_index(engine)
+
+# Marketing + R&D spend by cost center (a materialized view on PostgreSQL)
+from app.services.spend_ledger import ensure_spend_ledger
+ensure_spend_ledger(engine)
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_title,
@@ -58,6 +73,9 @@ try:
     from app.api.endpoints.rd_initiatives import router as rd_initiatives_router
     from app.api.endpoints.marketing_calendar import router as marketing_calendar_router
     from app.api.endpoints.marketing_budget import router as marketing_budget_router
+    from app.api.endpoints.events import router as events_router
+    from app.api.endpoints.forecast import router as forecast_router
+    from app.api.endpoints.analytics import router as analytics_router
     from app.models.strategic_foundation import StrategicTarget, TargetAudience, MarketingObjective
     from app.models.channels import MarketingChannel
     
@@ -71,6 +89,9 @@ try:
     app.include_router(rd_initiatives_router, prefix="/api/rd", tags=["R&D Initiatives"])
     app.include_router(marketing_calendar_router, prefix="/api/marketing-calendar", tags=["marketing-calendar"])
     app.include_router(marketing_budget_router, prefix="/api/marketing-budget", tags=["marketing-budget"])
+    app.include_router(events_router, prefix="/api/events", tags=["events"])
+    app.include_router(forecast_router, prefix="/api/forecast", tags=["forecast"])
+    app.include_router(analytics_router, prefix="/api/analytics", tags=["analytics"])
     from app.api.endpoints.strategic_foundation import router as strategic_foundation_router
     from app.api.endpoints.channels import router as channels_router
     
@@ -2,13 +2,17 @@ from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, DateTim
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.models.sync import changed_at_index
 
 class BudgetItem(Base):
     __tablename__ = "budget_items"
+    __table_args__ = (
+        changed_at_index("budget_items"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False)
-    cost_center_id = Column(Integer, ForeignKey("cost_centers.id"), nullable=False)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False, index=True)
+    cost_center_id = Column(Integer, ForeignKey("cost_centers.id"), nullable=False, index=True)
     
     # Budget details
     name = Column(String(255), nullable=False, index=True)
@@ -28,7 +32,7 @@ class BudgetItem(Base):
     # Relationships
     campaign = relationship("Campaign", back_populates="budget_items")
     cost_center = relationship("CostCenter", back_populates="budget_items")
-    actual_expenses = relationship("ActualExpense", back_populates="budget_item", cascade="all, delete-orphan")
+    actual_expenses = relationship("ActualExpense", back_populates="budget_item", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<BudgetItem(name='{self.name}', budget=${self.total_budget})>"
\ No newline at end of file
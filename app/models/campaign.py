@@ -2,9 +2,13 @@ from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Text, D
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.models.sync import changed_at_index
 
 class Campaign(Base):
     __tablename__ = "campaigns"
+    __table_args__ = (
+        changed_at_index("campaigns"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
@@ -29,7 +33,7 @@ class Campaign(Base):
     # Relationships
     parent = relationship("Campaign", remote_side=[id], back_populates="children")
     children = relationship("Campaign", back_populates="parent")
-    budget_items = relationship("BudgetItem", back_populates="campaign", cascade="all, delete-orphan")
+    budget_items = relationship("BudgetItem", back_populates="campaign", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<Campaign(name='{self.name}', level={self.level})>"
\ No newline at end of file
@@ -2,12 +2,16 @@ from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Text, D
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.models.sync import changed_at_index
 
 class ActualExpense(Base):
     __tablename__ = "actual_expenses"
+    __table_args__ = (
+        changed_at_index("actual_expenses"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    budget_item_id = Column(Integer, ForeignKey("budget_items.id"), nullable=False)
+    budget_item_id = Column(Integer, ForeignKey("budget_items.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Expense details
     amount = Column(Float, nullable=False)
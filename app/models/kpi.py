@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Text, DateTime
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Text, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.models.sync import changed_at_index
 
 class KPIMetric(Base):
     __tablename__ = "kpi_metrics"
@@ -40,6 +41,11 @@ class KPIMetric(Base):
 
 class KPISnapshot(Base):
     __tablename__ = "kpi_snapshots"
+    __table_args__ = (
+        # One data point per metric, date and type; bulk loads upsert on this key
+        Index("uq_kpi_snapshots_metric_date_type", "metric_id", "snapshot_date", "snapshot_type", unique=True),
+        changed_at_index("kpi_snapshots"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     metric_id = Column(Integer, ForeignKey("kpi_metrics.id"), nullable=False)
@@ -2,6 +2,7 @@ from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, JSON, DateT
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.models.sync import changed_at_index
 
 class MarketingCalendar(Base):
     """Monthly marketing calendar entries"""
@@ -27,6 +28,9 @@ class MarketingCalendar(Base):
 class MarketingActivity(Base):
     """Individual marketing activities within a calendar month"""
     __tablename__ = "marketing_activities"
+    __table_args__ = (
+        changed_at_index("marketing_activities"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     calendar_id = Column(Integer, ForeignKey("marketing_calendars.id"), nullable=False)
@@ -1,11 +1,41 @@
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Text, DateTime, JSON, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Text, DateTime, JSON, Boolean, Index, text
+from sqlalchemy.orm import backref, relationship
 from sqlalchemy.sql import func
 from datetime import date
 from app.database import Base
+from app.models.sync import changed_at_index
+
+# Open follow-up items. The R&D work queue filters on these exact predicates, so the
+# partial indexes below apply (SQLite only uses a partial index whose WHERE terms
+# appear verbatim in the query).
+OPEN_CUSTOMER_FOLLOW_UP = "next_follow_up_date IS NOT NULL AND interest_level NOT IN ('ordered', 'not_interested')"
+OPEN_SAMPLE_FOLLOW_UP = "follow_up_date IS NOT NULL AND feedback_received != 'yes'"
+OPEN_NEXT_ACTION = "next_action_date IS NOT NULL"
+OPEN_MILESTONE = "target_date IS NOT NULL AND status != 'completed'"
+
+# Owners are matched ignoring case; the queue's owner filter uses these exact
+# expressions (contacts fall back to the UTAK contact) so the owner indexes apply.
+NEXT_ACTION_OWNER_KEY = "lower(coalesce(next_action_owner, utak_contact))"
+MILESTONE_OWNER_KEY = "lower(owner)"
+
+# Team members are matched by name ignoring case and surrounding spaces; the team
+# workload endpoint groups and filters on this exact expression so its index applies.
+PERSON_KEY = "lower(trim(person_name))"
+
+# RDExpense.cost_center is typed by hand; it matches CostCenter.code ignoring case and
+# surrounding spaces. The spend ledger joins on this exact expression so its index applies.
+COST_CENTER_KEY = "upper(trim(cost_center))"
+
+
+def _partial_index(name, *columns, where):
+    return Index(name, *columns, sqlite_where=text(where), postgresql_where=text(where))
+
 
 class RDInitiative(Base):
     __tablename__ = "rd_initiatives"
+    __table_args__ = (
+        changed_at_index("rd_initiatives"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
@@ -43,17 +73,20 @@ class RDInitiative(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
-    # Relationships
-    team_members = relationship("RDInitiativeTeam", back_populates="initiative", cascade="all, delete-orphan")
-    feasibility = relationship("RDFeasibility", back_populates="initiative", uselist=False)
-    customer_interests = relationship("RDCustomerInterest", back_populates="initiative", cascade="all, delete-orphan")
-    samples = relationship("RDSample", back_populates="initiative", cascade="all, delete-orphan")
-    contacts = relationship("RDContact", back_populates="initiative", cascade="all, delete-orphan")
-    milestones = relationship("RDMilestone", back_populates="initiative", cascade="all, delete-orphan")
-    roi_data = relationship("RDROI", back_populates="initiative", uselist=False)
-    expenses = relationship("RDExpense", back_populates="initiative", cascade="all, delete-orphan")
-    revenue = relationship("RDRevenue", back_populates="initiative", cascade="all, delete-orphan")
-    notes = relationship("RDNote", back_populates="initiative", cascade="all, delete-orphan")
+    # Relationships. Children go with the initiative via ON DELETE CASCADE in the database;
+    # passive_deletes stops the ORM loading and deleting them row by row first.
+    team_members = relationship("RDInitiativeTeam", back_populates="initiative", cascade="all, delete-orphan", passive_deletes=True)
+    feasibility = relationship("RDFeasibility", back_populates="initiative", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    customer_interests = relationship("RDCustomerInterest", back_populates="initiative", cascade="all, delete-orphan", passive_deletes=True)
+    samples = relationship("RDSample", back_populates="initiative", cascade="all, delete-orphan", passive_deletes=True)
+    contacts = relationship("RDContact", back_populates="initiative", cascade="all, delete-orphan", passive_deletes=True)
+    milestones = relationship("RDMilestone", back_populates="initiative", cascade="all, delete-orphan", passive_deletes=True)
+    roi_data = relationship("RDROI", back_populates="initiative", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    expenses = relationship("RDExpense", back_populates="initiative", cascade="all, delete-orphan", passive_deletes=True)
+    revenue = relationship("RDRevenue", back_populates="initiative", cascade="all, delete-orphan", passive_deletes=True)
+    notes = relationship("RDNote", back_populates="initiative", cascade="all, delete-orphan", passive_deletes=True)
+    stage_transitions = relationship("RDStageTransition", back_populates="initiative", cascade="all, delete-orphan", passive_deletes=True)
+    recommendation = relationship("RDRecommendation", back_populates="initiative", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<RDInitiative(name='{self.name}', stage='{self.stage}')>"
@@ -62,9 +95,14 @@ class RDInitiative(Base):
 class RDInitiativeTeam(Base):
     """Team members assigned to R&D initiatives by department"""
     __tablename__ = "rd_initiative_team"
+    __table_args__ = (
+        Index("ix_rd_initiative_team_person_key", text(PERSON_KEY), "initiative_id"),
+        Index("ix_rd_initiative_team_department", "department", "person_name"),
+        changed_at_index("rd_initiative_team"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id"), nullable=False)
+    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Assignment details
     department = Column(String(100), nullable=False)  # Marketing, Operations, Manufacturing, Sales, R&D
@@ -88,7 +126,7 @@ class RDFeasibility(Base):
     __tablename__ = "rd_feasibility"
     
     id = Column(Integer, primary_key=True, index=True)
-    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id"), nullable=False, unique=True)
+    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id", ondelete="CASCADE"), nullable=False, unique=True)
     
     # NEW: Manufacturing familiarity checks
     matrix_familiar = Column(Boolean, nullable=True)  # Have we worked with this matrix?
@@ -132,9 +170,14 @@ class RDFeasibility(Base):
 
 class RDCustomerInterest(Base):
     __tablename__ = "rd_customer_interest"
+    __table_args__ = (
+        _partial_index("ix_rd_customer_interest_open_follow_up", "next_follow_up_date", "id",
+                       where=OPEN_CUSTOMER_FOLLOW_UP),
+        changed_at_index("rd_customer_interest"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id"), nullable=False)
+    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Customer info
     customer_name = Column(String(255), nullable=False)
@@ -181,9 +224,14 @@ class RDCustomerInterest(Base):
 
 class RDSample(Base):
     __tablename__ = "rd_samples"
+    __table_args__ = (
+        Index("ix_rd_samples_initiative_ship_date", "initiative_id", "ship_date", "id"),
+        _partial_index("ix_rd_samples_open_follow_up", "follow_up_date", "id", where=OPEN_SAMPLE_FOLLOW_UP),
+        changed_at_index("rd_samples"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id"), nullable=False)
+    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id", ondelete="CASCADE"), nullable=False)
     
     # Sample details
     sample_type = Column(String(100), nullable=False)  # trial_batch, demo_sample, validation_sample
@@ -229,9 +277,16 @@ class RDSample(Base):
 
 class RDContact(Base):
     __tablename__ = "rd_contacts"
+    __table_args__ = (
+        Index("ix_rd_contacts_initiative_date", "initiative_id", "contact_date", "id"),
+        _partial_index("ix_rd_contacts_open_next_action", "next_action_date", "id", where=OPEN_NEXT_ACTION),
+        _partial_index("ix_rd_contacts_open_next_action_owner", text(NEXT_ACTION_OWNER_KEY), "next_action_date",
+                       where=OPEN_NEXT_ACTION),
+        changed_at_index("rd_contacts"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id"), nullable=False)
+    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id", ondelete="CASCADE"), nullable=False)
     
     # Contact details
     contact_date = Column(Date, nullable=False)
@@ -266,9 +321,17 @@ class RDContact(Base):
 
 class RDMilestone(Base):
     __tablename__ = "rd_milestones"
+    __table_args__ = (
+        Index("ix_rd_milestones_initiative_target", "initiative_id", "target_date", "id"),
+        Index("ix_rd_milestones_status_target", "status", "target_date"),
+        _partial_index("ix_rd_milestones_open_target", "target_date", "id", where=OPEN_MILESTONE),
+        _partial_index("ix_rd_milestones_open_owner", text(MILESTONE_OWNER_KEY), "target_date",
+                       where=OPEN_MILESTONE),
+        changed_at_index("rd_milestones"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id"), nullable=False)
+    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id", ondelete="CASCADE"), nullable=False)
     
     # Milestone details
     milestone_name = Column(String(255), nullable=False)
@@ -305,7 +368,7 @@ class RDROI(Base):
     __tablename__ = "rd_roi"
     
     id = Column(Integer, primary_key=True, index=True)
-    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id"), nullable=False, unique=True)
+    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id", ondelete="CASCADE"), nullable=False, unique=True)
     
     # Investment
     total_development_cost = Column(Float, nullable=True, default=0.0)
@@ -342,9 +405,14 @@ class RDROI(Base):
 
 class RDExpense(Base):
     __tablename__ = "rd_expenses"
+    __table_args__ = (
+        Index("ix_rd_expenses_initiative_date", "initiative_id", "expense_date", "id"),
+        Index("ix_rd_expenses_cost_center_key", text(COST_CENTER_KEY), "expense_date"),
+        changed_at_index("rd_expenses"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id"), nullable=False)
+    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id", ondelete="CASCADE"), nullable=False)
     
     # Expense details
     expense_category = Column(String(100), nullable=False)  # Samples, Travel, Materials, Staffing, Marketing, Other
@@ -373,13 +441,17 @@ class RDExpense(Base):
 
 class RDRevenue(Base):
     __tablename__ = "rd_revenue"
+    __table_args__ = (
+        Index("ix_rd_revenue_initiative_date", "initiative_id", "order_date", "id"),
+        changed_at_index("rd_revenue"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id"), nullable=False)
+    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id", ondelete="CASCADE"), nullable=False)
     
     # Customer reference (links to customer interest if applicable)
     customer_name = Column(String(255), nullable=False)
-    customer_interest_id = Column(Integer, ForeignKey("rd_customer_interest.id"), nullable=True)
+    customer_interest_id = Column(Integer, ForeignKey("rd_customer_interest.id", ondelete="SET NULL"), nullable=True, index=True)
     
     # Order details
     order_number = Column(String(100), nullable=True)
@@ -398,7 +470,7 @@ class RDRevenue(Base):
     
     # Relationships
     initiative = relationship("RDInitiative", back_populates="revenue")
-    customer_interest = relationship("RDCustomerInterest", backref="orders")
+    customer_interest = relationship("RDCustomerInterest", backref=backref("orders", passive_deletes=True))
     
     def __repr__(self):
         return f"<RDRevenue(customer='{self.customer_name}', value=${self.order_value})>"
@@ -406,9 +478,14 @@ class RDRevenue(Base):
 
 class RDNote(Base):
     __tablename__ = "rd_notes"
+    __table_args__ = (
+        # Activity feed: newest entries per initiative
+        Index("ix_rd_notes_initiative_date", "initiative_id", "note_date", "id"),
+        changed_at_index("rd_notes"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id"), nullable=False)
+    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id", ondelete="CASCADE"), nullable=False)
     
     # Note metadata
     department = Column(String(100), nullable=True)  # Marketing, Sales, Ops, Manufacturing
@@ -428,4 +505,62 @@ class RDNote(Base):
     
     def __repr__(self):
         return f"<RDNote(author='{self.author}', date={self.note_date})>"
-    
\ No newline at end of file
+    
+
+
+class RDStageTransition(Base):
+    __tablename__ = "rd_stage_transitions"
+    __table_args__ = (
+        Index("ix_rd_stage_transitions_initiative_at", "initiative_id", "transitioned_at", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id", ondelete="CASCADE"), nullable=False)
+    
+    # Append-only: one row per stage change; from_stage is empty for the initial stage
+    from_stage = Column(String(50), nullable=True)
+    to_stage = Column(String(50), nullable=False)
+    transitioned_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    
+    # Relationships
+    initiative = relationship("RDInitiative", back_populates="stage_transitions")
+    
+    def __repr__(self):
+        return f"<RDStageTransition(initiative={self.initiative_id}, {self.from_stage} -> {self.to_stage})>"
+
+class RDInterestLevelTransition(Base):
+    __tablename__ = "rd_interest_level_transitions"
+    __table_args__ = (
+        Index("ix_rd_interest_level_transitions_interest_at", "customer_interest_id", "transitioned_at", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    customer_interest_id = Column(
+        Integer, ForeignKey("rd_customer_interest.id", ondelete="CASCADE"), nullable=False
+    )
+    
+    # Append-only: one row per interest level change; from_level is empty for the initial level
+    from_level = Column(String(20), nullable=True)
+    to_level = Column(String(20), nullable=False)
+    transitioned_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    
+    def __repr__(self):
+        return f"<RDInterestLevelTransition(interest={self.customer_interest_id}, {self.from_level} -> {self.to_level})>"
+
+class RDRecommendation(Base):
+    __tablename__ = "rd_recommendations"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    initiative_id = Column(Integer, ForeignKey("rd_initiatives.id", ondelete="CASCADE"), nullable=False, unique=True)
+    
+    # Fingerprint of the rule set and the inputs the rules last saw; re-evaluated when it changes
+    inputs_hash = Column(String(64), nullable=False)
+    inputs = Column(JSON, nullable=True)
+    recommendations = Column(JSON, nullable=False, default=list)  # [{rule, severity, icon, title, action}]
+    evaluated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    initiative = relationship("RDInitiative", back_populates="recommendation")
+    
+    def __repr__(self):
+        return f"<RDRecommendation(initiative={self.initiative_id}, count={len(self.recommendations or [])})>"
@@ -7,7 +7,7 @@ class ROIMetric(Base):
     __tablename__ = "roi_metrics"
     
     id = Column(Integer, primary_key=True, index=True)
-    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # ROI calculation period
     calculation_date = Column(Date, nullable=False, index=True)
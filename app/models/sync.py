@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index, text
+from sqlalchemy.sql import func
+from app.database import Base
+
+# updated_at stays NULL until a row's first edit, so a row last changed when it was created
+# is matched on created_at. Delta queries filter and order on this exact expression.
+CHANGED_AT = "coalesce(updated_at, created_at)"
+
+
+def changed_at_index(table_name):
+    """Index serving "changed since" delta queries on a synced table"""
+    return Index(f"ix_{table_name}_changed_at", text(CHANGED_AT), "id")
+
+
+class DeletedRecord(Base):
+    """Tombstone for a deleted row of a synced table, so delta clients can drop it"""
+    __tablename__ = "deleted_records"
+    __table_args__ = (
+        Index("ix_deleted_records_table_deleted_at", "table_name", "deleted_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    table_name = Column(String(64), nullable=False)
+    record_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<DeletedRecord(table_name='{self.table_name}', record_id={self.record_id})>"
@@ -57,6 +57,11 @@ class KPISnapshotBase(BaseModel):
 class KPISnapshotCreate(KPISnapshotBase):
     pass
 
+class KPISnapshotBulkResult(BaseModel):
+    received: int
+    inserted: int
+    updated: int
+
 class KPISnapshotResponse(KPISnapshotBase):
     id: int
     created_at: datetime
@@ -74,4 +74,20 @@ class MarketingBudgetWithCategories(MarketingBudget):
     categories: list[BudgetCategory] = []
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+# ========================================
+# Optimizer Schemas
+# ========================================
+
+class CategoryBounds(BaseModel):
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+
+class BudgetOptimizeRequest(BaseModel):
+    # Default bounds as fractions of each category's current amount
+    min_fraction: float = 0.5
+    max_fraction: float = 1.5
+    # Per-category overrides keyed by category id
+    bounds: Dict[int, CategoryBounds] = {}
+    # Amount to allocate (defaults to the budget's flexible_budget)
+    total: Optional[float] = None
@@ -0,0 +1,14 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+
+class RDStageTransition(BaseModel):
+    id: int
+    initiative_id: int
+    from_stage: Optional[str] = None
+    to_stage: str
+    transitioned_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Generic, List, TypeVar
+from datetime import datetime
+
+T = TypeVar("T")
+
+class SyncPage(BaseModel, Generic[T]):
+    """Changes to a collection since a watermark (?updated_since=...)"""
+    watermark: datetime
+    reset: bool = False
+    items: List[T] = []
+    deleted: List[int] = []
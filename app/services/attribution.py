@@ -0,0 +1,250 @@
+"""
+Batch multi-touch revenue attribution
+
+Takes a touchpoint export (one row per campaign touch on a deal, e.g. a
+HubSpot deal/campaign report saved as CSV), computes first-touch,
+last-touch, linear, time-decay and position-based credit for every touch
+in one vectorized pass, and writes the per-campaign ROIMetric rows for one
+stored method in bulk. ROI consumers sum ROIMetric rows, so storing every
+method would count each deal once per method; the other methods' revenue is
+returned with the import for comparison only.
+
+Expected CSV columns (HubSpot export headers are accepted too):
+    deal_id, campaign_id, touch_date, deal_amount, close_date (optional)
+"""
+import io
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, func, insert
+from sqlalchemy.orm import Session
+
+from app.models.budget import BudgetItem
+from app.models.campaign import Campaign
+from app.models.expense import ActualExpense
+from app.models.roi import ROIMetric
+
+METHODS = ("first_touch", "last_touch", "linear", "time_decay", "position_based")
+
+# The method whose revenue is stored as the ROI metric (the ROIMetric column default)
+DEFAULT_METHOD = "last_touch"
+
+# Prefix of the notes on imported rows, which tells them apart from manually recorded ones
+IMPORT_NOTES = "Multi-touch import"
+
+# Time decay: a touch loses half its credit for every half-life before the close
+DEFAULT_HALF_LIFE_DAYS = 7.0
+
+# Position based (U-shaped): first and last touch share this much, the middle splits the rest
+POSITION_ENDPOINT_SHARE = 0.4
+
+COLUMN_ALIASES = {
+    "deal_id": ["deal_id", "deal id", "record id", "deal record id"],
+    "campaign_id": ["campaign_id", "campaign id", "associated campaign id"],
+    "touch_date": ["touch_date", "touch date", "timestamp", "touched_at", "interaction date", "activity date"],
+    "deal_amount": ["deal_amount", "amount", "deal amount", "revenue", "order_value"],
+    "close_date": ["close_date", "close date", "closed_at", "closed date"],
+}
+REQUIRED_COLUMNS = ("deal_id", "campaign_id", "touch_date", "deal_amount")
+
+
+class AttributionImportError(ValueError):
+    """Raised when a touchpoint file can't be parsed"""
+
+
+# ==================== PARSING ====================
+
+def parse_touchpoints(content: bytes) -> pd.DataFrame:
+    """Read a touchpoint CSV into a normalized frame"""
+    try:
+        raw = pd.read_csv(io.BytesIO(content))
+    except Exception as e:
+        raise AttributionImportError(f"Could not read CSV: {e}")
+
+    lookup = {str(c).strip().lower(): c for c in raw.columns}
+    columns = {}
+    for name, aliases in COLUMN_ALIASES.items():
+        match = next((lookup[a] for a in aliases if a in lookup), None)
+        if match is not None:
+            columns[name] = raw[match]
+
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    if missing:
+        raise AttributionImportError(f"Missing required columns: {', '.join(missing)}")
+
+    touches = pd.DataFrame({
+        "deal_id": columns["deal_id"].astype(str),
+        "campaign_id": pd.to_numeric(columns["campaign_id"], errors="coerce"),
+        "touch_date": pd.to_datetime(columns["touch_date"], errors="coerce", utc=True),
+        "deal_amount": pd.to_numeric(
+            columns["deal_amount"].astype(str).str.replace(r"[$,]", "", regex=True), errors="coerce"
+        ),
+    })
+    if "close_date" in columns:
+        touches["close_date"] = pd.to_datetime(columns["close_date"], errors="coerce", utc=True)
+    touches = touches.dropna(subset=["campaign_id", "touch_date", "deal_amount"])
+    touches["campaign_id"] = touches["campaign_id"].astype(np.int64)
+
+    # A deal without a close date closes at its last touch; amounts are per deal, not per touch
+    last_touch = touches.groupby("deal_id")["touch_date"].transform("max")
+    touches["close_date"] = touches["close_date"].fillna(last_touch) if "close_date" in touches else last_touch
+    touches["deal_amount"] = touches.groupby("deal_id")["deal_amount"].transform("max")
+    return touches.reset_index(drop=True)
+
+
+# ==================== ATTRIBUTION ====================
+
+def attribution_weights(touches: pd.DataFrame, half_life_days: float = DEFAULT_HALF_LIFE_DAYS) -> pd.DataFrame:
+    """Per-touch credit under every method; each method's weights sum to 1 per deal"""
+    touches = touches.sort_values(["deal_id", "touch_date"], kind="stable").reset_index(drop=True)
+    deals = touches.groupby("deal_id", sort=False)
+    position = deals.cumcount().to_numpy()
+    count = deals["deal_id"].transform("size").to_numpy()
+
+    first = position == 0
+    last = position == count - 1
+
+    weights = pd.DataFrame(index=touches.index)
+    weights["first_touch"] = first.astype(np.float64)
+    weights["last_touch"] = last.astype(np.float64)
+    weights["linear"] = 1.0 / count
+
+    age_days = (touches["close_date"] - touches["touch_date"]).dt.total_seconds().to_numpy() / 86400
+    decay = np.power(0.5, np.clip(age_days, 0, None) / half_life_days)
+    weights["time_decay"] = decay / pd.Series(decay).groupby(touches["deal_id"]).transform("sum").to_numpy()
+
+    middle_share = (1 - 2 * POSITION_ENDPOINT_SHARE) / np.maximum(count - 2, 1)
+    weights["position_based"] = np.select(
+        [count == 1, count == 2, first | last],
+        [1.0, 0.5, POSITION_ENDPOINT_SHARE],
+        middle_share
+    )
+    return pd.concat([touches, weights], axis=1)
+
+
+def attribute_revenue(
+    touches: pd.DataFrame,
+    methods: Iterable[str] = METHODS,
+    half_life_days: float = DEFAULT_HALF_LIFE_DAYS
+) -> pd.DataFrame:
+    """Attributed revenue, touches and deals per (method, campaign)"""
+    methods = list(methods)
+    weighted = attribution_weights(touches, half_life_days)
+
+    credited = weighted[methods].to_numpy() * weighted["deal_amount"].to_numpy()[:, None]
+    revenue = pd.DataFrame(credited, columns=methods)
+    revenue["campaign_id"] = weighted["campaign_id"].to_numpy()
+
+    totals = revenue.groupby("campaign_id")[methods].sum()
+    activity = weighted.groupby("campaign_id").agg(touchpoints=("deal_id", "size"), deals=("deal_id", "nunique"))
+
+    result = totals.stack().rename("revenue_attributed").reset_index()
+    result.columns = ["campaign_id", "attribution_method", "revenue_attributed"]
+    return result.merge(activity, left_on="campaign_id", right_index=True)
+
+
+# ==================== PERSISTENCE ====================
+
+def get_campaign_costs(db: Session, campaign_ids: List[int], period_start: date, period_end: date) -> Dict[int, float]:
+    """Actual spend per campaign within the period"""
+    rows = db.query(
+        BudgetItem.campaign_id, func.sum(ActualExpense.amount)
+    ).join(
+        ActualExpense, ActualExpense.budget_item_id == BudgetItem.id
+    ).filter(
+        BudgetItem.campaign_id.in_(campaign_ids),
+        ActualExpense.expense_date.between(period_start, period_end)
+    ).group_by(BudgetItem.campaign_id).all()
+    return {campaign_id: float(total or 0) for campaign_id, total in rows}
+
+
+def get_missing_campaign_ids(db: Session, campaign_ids: List[int]) -> List[int]:
+    existing = {row[0] for row in db.query(Campaign.id).filter(Campaign.id.in_(campaign_ids)).all()}
+    return sorted(set(campaign_ids) - existing)
+
+
+def run_attribution(
+    db: Session,
+    touches: pd.DataFrame,
+    period_start: Optional[date] = None,
+    period_end: Optional[date] = None,
+    methods: Iterable[str] = METHODS,
+    half_life_days: float = DEFAULT_HALF_LIFE_DAYS,
+    source: Optional[str] = None,
+    stored_method: str = DEFAULT_METHOD
+) -> Dict:
+    """Attribute deals closed in the period and replace its imported ROIMetric rows with the stored method's"""
+    methods = [m for m in METHODS if m in set(methods) | {stored_method}]
+
+    close_dates = touches["close_date"].dt.date
+    period_start = period_start or close_dates.min()
+    period_end = period_end or close_dates.max()
+    touches = touches[(close_dates >= period_start) & (close_dates <= period_end)]
+    if touches.empty:
+        raise AttributionImportError("No deals closed within the period")
+
+    attributed = attribute_revenue(touches, methods, half_life_days)
+    campaign_ids = sorted(int(c) for c in attributed["campaign_id"].unique())
+    costs = get_campaign_costs(db, campaign_ids, period_start, period_end)
+
+    stored = attributed[attributed["attribution_method"] == stored_method]
+    cost = stored["campaign_id"].map(costs).fillna(0.0).to_numpy()
+    revenue = stored["revenue_attributed"].to_numpy()
+    roi = np.divide((revenue - cost) * 100, cost, out=np.zeros_like(revenue), where=cost != 0)
+
+    notes = f"{IMPORT_NOTES}{f' from {source}' if source else ''}"
+    if stored_method == "time_decay":
+        notes += f"; time-decay half-life {half_life_days:g} days"
+    today = date.today()
+    rows = [
+        {
+            "campaign_id": int(campaign_id),
+            "calculation_date": today,
+            "period_start": period_start,
+            "period_end": period_end,
+            "total_cost": float(c),
+            "revenue_attributed": round(float(r), 2),
+            "roi_percentage": float(p),
+            "performance_metrics": {"touchpoints": float(t), "deals": float(d)},
+            "attribution_method": method,
+            "attribution_notes": notes,
+        }
+        for campaign_id, method, r, t, d, c, p in zip(
+            stored["campaign_id"], stored["attribution_method"], revenue,
+            stored["touchpoints"], stored["deals"], cost, roi
+        )
+    ]
+
+    try:
+        # Re-importing a period replaces its imported rows (whatever method they were stored
+        # with) instead of double counting; manually recorded metrics are left alone
+        db.execute(delete(ROIMetric).where(
+            ROIMetric.period_start == period_start,
+            ROIMetric.period_end == period_end,
+            ROIMetric.attribution_method.in_(METHODS),
+            ROIMetric.attribution_notes.like(f"{IMPORT_NOTES}%"),
+            ROIMetric.campaign_id.in_(campaign_ids)
+        ))
+        db.execute(insert(ROIMetric), rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    summary = attributed.pivot(index="campaign_id", columns="attribution_method", values="revenue_attributed")
+    return {
+        "period_start": period_start,
+        "period_end": period_end,
+        "touchpoints": int(len(touches)),
+        "deals": int(touches["deal_id"].nunique()),
+        "campaigns": len(campaign_ids),
+        "methods": methods,
+        "stored_method": stored_method,
+        "metrics_written": len(rows),
+        "revenue_by_campaign": {
+            int(campaign_id): {m: round(float(v), 2) for m, v in values.items()}
+            for campaign_id, values in summary.iterrows()
+        },
+    }
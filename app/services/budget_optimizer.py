@@ -0,0 +1,238 @@
+"""
+Flexible-budget reallocation driven by ROI history
+
+Each ROIMetric (a campaign's cost and attributed revenue over a period) is
+split across budget categories in proportion to the campaign's budget items
+per category, then annualized. A diminishing-returns curve
+
+    revenue = a * spend ** b        (0 < b < 1)
+
+is fitted per category by least squares in log-log space. Allocating the
+flexible budget to maximize total expected revenue is then a concave
+problem: at the optimum every unconstrained category has the same marginal
+return (a * b * spend ** (b - 1) = lambda), so lambda is found by bisection
+and each category's spend follows in closed form, clipped to its min/max.
+Everything is vectorized across categories.
+
+Categories with no usable ROI history keep their current amount.
+"""
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.models.budget import BudgetItem
+from app.models.marketing_budget import MarketingBudget, BudgetCategory
+from app.models.roi import ROIMetric
+
+# Fallback elasticity when a category's history has no spread in spend
+DEFAULT_ELASTICITY = 0.5
+MIN_ELASTICITY, MAX_ELASTICITY = 0.05, 0.95
+
+BISECTION_STEPS = 200
+DAYS_PER_YEAR = 365.0
+
+
+class OptimizationError(ValueError):
+    """Raised when the requested bounds can't be satisfied"""
+
+
+def _normalize(name: Optional[str]) -> str:
+    return (name or "").strip().lower()
+
+
+# ==================== CURVE FITTING ====================
+
+def load_category_points(db: Session) -> pd.DataFrame:
+    """Annualized (spend, revenue) observations per budget item category"""
+    items = pd.DataFrame(
+        db.query(BudgetItem.campaign_id, BudgetItem.category, BudgetItem.total_budget).all(),
+        columns=["campaign_id", "category", "budget"]
+    )
+    metrics = pd.DataFrame(
+        db.query(
+            ROIMetric.id, ROIMetric.campaign_id, ROIMetric.total_cost, ROIMetric.revenue_attributed,
+            ROIMetric.period_start, ROIMetric.period_end
+        ).all(),
+        columns=["metric_id", "campaign_id", "cost", "revenue", "period_start", "period_end"]
+    )
+    if items.empty or metrics.empty:
+        return pd.DataFrame(columns=["category", "spend", "revenue"])
+
+    # Share of each campaign's planned budget that sits in each category
+    items["category"] = items["category"].map(_normalize)
+    shares = items.groupby(["campaign_id", "category"], as_index=False)["budget"].sum()
+    shares = shares[shares["budget"] > 0]
+    shares["share"] = shares["budget"] / shares.groupby("campaign_id")["budget"].transform("sum")
+
+    days = (pd.to_datetime(metrics["period_end"]) - pd.to_datetime(metrics["period_start"])).dt.days + 1
+    metrics["annualize"] = DAYS_PER_YEAR / days.clip(lower=1)
+
+    points = metrics.merge(shares[["campaign_id", "category", "share"]], on="campaign_id")
+    points["spend"] = points["cost"] * points["share"] * points["annualize"]
+    points["revenue"] = points["revenue"] * points["share"] * points["annualize"]
+    return points.loc[(points["spend"] > 0) & (points["revenue"] > 0), ["category", "spend", "revenue"]]
+
+
+def fit_curves(points: pd.DataFrame) -> pd.DataFrame:
+    """Fit revenue = a * spend ** b per category; one row per category"""
+    if points.empty:
+        return pd.DataFrame(columns=["a", "b", "points", "r_squared"])
+
+    logs = pd.DataFrame({
+        "category": points["category"].to_numpy(),
+        "x": np.log(points["spend"].to_numpy(dtype=np.float64)),
+        "y": np.log(points["revenue"].to_numpy(dtype=np.float64)),
+    })
+    logs["xx"], logs["xy"], logs["yy"] = logs["x"] ** 2, logs["x"] * logs["y"], logs["y"] ** 2
+    sums = logs.groupby("category").agg(
+        n=("x", "size"), x=("x", "mean"), y=("y", "mean"), xx=("xx", "mean"), xy=("xy", "mean"), yy=("yy", "mean")
+    )
+
+    var_x = sums["xx"] - sums["x"] ** 2
+    var_y = sums["yy"] - sums["y"] ** 2
+    cov = sums["xy"] - sums["x"] * sums["y"]
+    has_spread = (var_x > 1e-12) & (sums["n"] >= 3)
+
+    b = np.where(has_spread, cov / var_x.where(has_spread, 1), DEFAULT_ELASTICITY)
+    b = np.clip(b, MIN_ELASTICITY, MAX_ELASTICITY)
+    log_a = sums["y"] - b * sums["x"]
+
+    r_squared = np.where(
+        has_spread & (var_y > 1e-12),
+        (cov ** 2) / (var_x * var_y).where(has_spread & (var_y > 1e-12), 1),
+        np.nan
+    )
+    return pd.DataFrame(
+        {"a": np.exp(log_a), "b": b, "points": sums["n"], "r_squared": r_squared},
+        index=sums.index
+    )
+
+
+# ==================== SOLVER ====================
+
+def allocate(a: np.ndarray, b: np.ndarray, lower: np.ndarray, upper: np.ndarray, total: float) -> np.ndarray:
+    """Maximize sum(a * x ** b) subject to sum(x) == total and lower <= x <= upper"""
+    if lower.sum() - total > 1e-6 or total - upper.sum() > 1e-6:
+        raise OptimizationError(
+            f"Bounds allow between {lower.sum():,.2f} and {upper.sum():,.2f}, cannot allocate {total:,.2f}"
+        )
+
+    def spend_at(log_lambda: float) -> np.ndarray:
+        # Marginal return a*b*x**(b-1) equals lambda at x = (a*b/lambda) ** (1/(1-b))
+        x = np.exp((np.log(a * b) - log_lambda) / (1 - b))
+        return np.clip(x, lower, upper)
+
+    # Bracket lambda in log space; spend is decreasing in lambda
+    lo, hi = -50.0, 50.0
+    for _ in range(BISECTION_STEPS):
+        mid = (lo + hi) / 2
+        if spend_at(mid).sum() > total:
+            lo = mid
+        else:
+            hi = mid
+        if hi - lo < 1e-12:
+            break
+
+    x = spend_at((lo + hi) / 2)
+    # Hand the rounding residue to categories with room, so the total is exact
+    residue = total - x.sum()
+    room = (upper - x) if residue > 0 else (x - lower)
+    if room.sum() > 0:
+        x = x + residue * room / room.sum()
+    return x
+
+
+# ==================== OPTIMIZE ====================
+
+def optimize_budget(
+    db: Session,
+    budget: MarketingBudget,
+    min_fraction: float = 0.5,
+    max_fraction: float = 1.5,
+    bounds: Optional[Dict[int, Dict[str, Optional[float]]]] = None,
+    total: Optional[float] = None
+) -> Dict:
+    """Recommend a revenue-maximizing split of the flexible budget"""
+    bounds = bounds or {}
+    categories = db.query(BudgetCategory).filter(
+        BudgetCategory.budget_id == budget.id,
+        BudgetCategory.category_type == "flexible"
+    ).order_by(BudgetCategory.category_name).all()
+    if not categories:
+        raise OptimizationError("Budget has no flexible categories to optimize")
+
+    total = float(budget.flexible_budget if total is None else total)
+    curves = fit_curves(load_category_points(db))
+
+    frame = pd.DataFrame({
+        "category_id": [c.id for c in categories],
+        "category_name": [c.category_name for c in categories],
+        "key": [_normalize(c.category_name) for c in categories],
+        "current_amount": [float(c.amount or 0) for c in categories],
+    })
+    frame = frame.join(curves, on="key")
+    frame["fitted"] = frame["a"].notna()
+
+    frame["min_amount"] = frame["current_amount"] * min_fraction
+    frame["max_amount"] = frame["current_amount"] * max_fraction
+    for i, category_id in enumerate(frame["category_id"]):
+        override = bounds.get(category_id) or {}
+        if override.get("min_amount") is not None:
+            frame.loc[i, "min_amount"] = override["min_amount"]
+        if override.get("max_amount") is not None:
+            frame.loc[i, "max_amount"] = override["max_amount"]
+
+    if (frame["min_amount"] > frame["max_amount"]).any():
+        raise OptimizationError("A category's min_amount exceeds its max_amount")
+
+    # Without a curve there is no basis to move money; hold at current amount within bounds
+    held = ~frame["fitted"]
+    frame.loc[held, "recommended_amount"] = frame.loc[held, "current_amount"].clip(
+        frame.loc[held, "min_amount"], frame.loc[held, "max_amount"]
+    )
+
+    fitted = frame[frame["fitted"]]
+    if len(fitted):
+        frame.loc[frame["fitted"], "recommended_amount"] = allocate(
+            fitted["a"].to_numpy(dtype=np.float64),
+            fitted["b"].to_numpy(dtype=np.float64),
+            fitted["min_amount"].to_numpy(dtype=np.float64),
+            fitted["max_amount"].to_numpy(dtype=np.float64),
+            total - frame.loc[held, "recommended_amount"].sum()
+        )
+
+    a, b = frame["a"].fillna(0).to_numpy(), frame["b"].fillna(1).to_numpy()
+    current, recommended = frame["current_amount"].to_numpy(), frame["recommended_amount"].to_numpy()
+    frame["expected_revenue_current"] = np.where(frame["fitted"], a * current ** b, np.nan)
+    frame["expected_revenue_recommended"] = np.where(frame["fitted"], a * recommended ** b, np.nan)
+    frame["marginal_roi"] = np.where(
+        frame["fitted"] & (recommended > 0),
+        a * b * np.power(np.where(recommended > 0, recommended, 1), b - 1),
+        np.nan
+    )
+    frame["change"] = recommended - current
+
+    current_revenue = float(np.nansum(frame["expected_revenue_current"]))
+    optimized_revenue = float(np.nansum(frame["expected_revenue_recommended"]))
+
+    records = frame.drop(columns=["key", "a", "b", "points", "r_squared"]).round(2)
+    records["curve"] = [
+        {"a": round(float(row.a), 6), "b": round(float(row.b), 4), "points": int(row.points),
+         "r_squared": None if pd.isna(row.r_squared) else round(float(row.r_squared), 4)}
+        if row.fitted else None
+        for row in frame.itertuples()
+    ]
+    records = records.astype(object).where(records.notna(), None)
+
+    return {
+        "budget_id": budget.id,
+        "year": budget.year,
+        "flexible_budget": total,
+        "expected_revenue_current": round(current_revenue, 2),
+        "expected_revenue_optimized": round(optimized_revenue, 2),
+        "expected_lift": round(optimized_revenue - current_revenue, 2),
+        "unallocated": round(total - float(recommended.sum()), 2),
+        "categories": records.to_dict(orient="records"),
+    }
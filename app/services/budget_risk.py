@@ -0,0 +1,335 @@
+"""
+Monte Carlo overrun risk for the annual marketing budget
+
+For each BudgetCategory the historical monthly spend-to-plan ratio is
+derived from actual_expenses against the monthly plan of budget items in
+the matching category (BudgetItem.category == BudgetCategory.category_name).
+Year-end spend is then simulated as the actual spend in closed months plus
+the remaining planned spend scaled by ratios drawn from that history. All
+paths and categories are drawn at once with NumPy.
+
+Simulations run in a process pool so they don't hold API worker threads
+or the GIL; the endpoint awaits them instead of blocking a thread. Draws are
+made one category at a time, so memory grows with paths, not
+categories x paths. Results are memoized by a data-version fingerprint of
+the budget, its categories, budget items and expenses.
+"""
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import extract, func
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models.budget import BudgetItem
+from app.models.expense import ActualExpense
+from app.models.marketing_budget import MarketingBudget, BudgetCategory
+from app.services.forecast import monthly_budget_matrix
+
+MONTHS = 12
+DEFAULT_PATHS = 100_000
+
+# Used when neither the category nor the portfolio has any spend history
+DEFAULT_RATIO_MEAN = 1.0
+DEFAULT_RATIO_STD = 0.15
+
+# Seconds to wait on the process pool before giving up on a run
+SIMULATION_TIMEOUT = 60
+
+# Distinct budget/paths/seed/month combinations kept in memory
+CACHE_SIZE = 64
+
+_cache: Dict[Tuple, Tuple[Tuple, Dict]] = {}
+_cache_lock = threading.Lock()
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class SimulationTimeoutError(RuntimeError):
+    """Raised when a simulation on the process pool runs past SIMULATION_TIMEOUT"""
+
+
+# ==================== DATA LOADING ====================
+
+def get_data_version(db: Session, budget: MarketingBudget) -> Tuple:
+    """Fingerprint of everything a budget's risk simulation reads"""
+    categories = db.query(
+        func.count(BudgetCategory.id),
+        func.max(BudgetCategory.created_at),
+        func.max(BudgetCategory.updated_at)
+    ).filter(BudgetCategory.budget_id == budget.id).one()
+    items = db.query(
+        func.count(BudgetItem.id),
+        func.max(BudgetItem.created_at),
+        func.max(BudgetItem.updated_at)
+    ).one()
+    expenses = db.query(
+        func.count(ActualExpense.id),
+        func.max(ActualExpense.id),
+        func.max(ActualExpense.updated_at)
+    ).one()
+    return (budget.updated_at, tuple(categories), tuple(items), tuple(expenses))
+
+
+def _normalize(name: Optional[str]) -> str:
+    return (name or "").strip().lower()
+
+
+def months_closed(year: int, as_of: date) -> int:
+    """Number of fully completed months of `year` as of a date"""
+    if as_of.year < year:
+        return 0
+    if as_of.year > year:
+        return MONTHS
+    return as_of.month - 1
+
+
+def load_monthly_history(db: Session, as_of: date) -> pd.DataFrame:
+    """Planned vs actual spend per item category, year and closed month"""
+    items = pd.DataFrame(
+        db.query(BudgetItem.id, BudgetItem.category, BudgetItem.total_budget, BudgetItem.monthly_budget).all(),
+        columns=["budget_item_id", "category", "total_budget", "monthly_budget"]
+    )
+    year, month = extract("year", ActualExpense.expense_date), extract("month", ActualExpense.expense_date)
+    actuals = pd.DataFrame(
+        db.query(
+            ActualExpense.budget_item_id, year, month, func.sum(ActualExpense.amount)
+        ).group_by(ActualExpense.budget_item_id, year, month).all(),
+        columns=["budget_item_id", "year", "month", "actual"]
+    )
+    if items.empty or actuals.empty:
+        return pd.DataFrame(columns=["category", "year", "month", "plan", "actual"])
+
+    # Monthly plan per item: monthly_budget weights scaled to total_budget, else an even split
+    weights = np.clip(monthly_budget_matrix(items["monthly_budget"]), 0, None)
+    totals = weights.sum(axis=1, keepdims=True)
+    weights = np.where(totals > 0, weights / np.where(totals > 0, totals, 1), 1 / MONTHS)
+    plan = weights * items["total_budget"].fillna(0).to_numpy(dtype=np.float64)[:, None]
+
+    # An item counts as active in every year it has spend; expand to all closed months of those years
+    active = actuals[["budget_item_id", "year"]].drop_duplicates()
+    grid = active.loc[active.index.repeat(MONTHS)].reset_index(drop=True)
+    grid["month"] = np.tile(np.arange(1, MONTHS + 1), len(active))
+    closed = (grid["year"] < as_of.year) | ((grid["year"] == as_of.year) & (grid["month"] < as_of.month))
+    grid = grid[closed]
+
+    row = pd.Index(items["budget_item_id"]).get_indexer(grid["budget_item_id"])
+    grid = grid[row >= 0]
+    row = row[row >= 0]
+    grid = grid.assign(
+        category=items["category"].map(_normalize).to_numpy()[row],
+        plan=plan[row, grid["month"].to_numpy(dtype=np.int64) - 1]
+    ).merge(actuals, on=["budget_item_id", "year", "month"], how="left")
+    grid["actual"] = grid["actual"].fillna(0.0)
+
+    return grid.groupby(["category", "year", "month"], as_index=False)[["plan", "actual"]].sum()
+
+
+def ratio_stats(history: pd.DataFrame) -> Tuple[Dict[str, Tuple[float, float, int]], Tuple[float, float]]:
+    """Mean/std of the monthly spend-to-plan ratio per category, plus the pooled fallback"""
+    history = history[history["plan"] > 0]
+    if history.empty:
+        return {}, (DEFAULT_RATIO_MEAN, DEFAULT_RATIO_STD)
+
+    ratios = history.assign(ratio=history["actual"] / history["plan"])
+    grouped = ratios.groupby("category")["ratio"].agg(["mean", "std", "count"])
+    pooled_std = ratios["ratio"].std()
+    pooled = (
+        float(ratios["ratio"].mean()),
+        float(pooled_std) if pd.notna(pooled_std) else DEFAULT_RATIO_STD
+    )
+
+    stats = {}
+    for category, mean, std, count in grouped.itertuples():
+        # A single month says nothing about spread; borrow the pooled one
+        stats[category] = (float(mean), float(std) if count > 1 and pd.notna(std) else pooled[1], int(count))
+    return stats, pooled
+
+
+def seasonal_weights(budget: MarketingBudget) -> np.ndarray:
+    """Monthly weights from the budget's quarterly distribution, else an even split"""
+    weights = np.full(MONTHS, 1 / MONTHS)
+    quarters = budget.quarterly_distribution or {}
+    totals = np.array([
+        float((quarters.get(f"Q{q}") or {}).get("total") or 0) for q in range(1, 5)
+    ])
+    if totals.sum() > 0:
+        weights = np.repeat(totals / totals.sum() / 3, 3)
+    return weights
+
+
+def build_inputs(db: Session, budget: MarketingBudget, as_of: date) -> Dict:
+    """Gather plain arrays for the simulator (picklable for the process pool)"""
+    categories: List[BudgetCategory] = db.query(BudgetCategory).filter(
+        BudgetCategory.budget_id == budget.id
+    ).order_by(BudgetCategory.category_type, BudgetCategory.category_name).all()
+
+    closed = months_closed(budget.year, as_of)
+    history = load_monthly_history(db, as_of)
+    stats, pooled = ratio_stats(history)
+
+    this_year = history[(history["year"] == budget.year) & (history["month"] <= closed)]
+    spent = this_year.groupby("category")["actual"].sum().to_dict()
+
+    rows = []
+    for category in categories:
+        key = _normalize(category.category_name)
+        if key in stats:
+            mean, std, months, source = *stats[key], "category"
+        elif stats:
+            mean, std, months, source = *pooled, 0, "pooled"
+        else:
+            mean, std, months, source = DEFAULT_RATIO_MEAN, DEFAULT_RATIO_STD, 0, "default"
+        rows.append({
+            "category_id": category.id,
+            "category_name": category.category_name,
+            "category_type": category.category_type,
+            "amount": float(category.amount or 0),
+            "actual_to_date": float(spent.get(key, 0.0)),
+            "ratio_mean": mean,
+            "ratio_std": std,
+            "history_months": months,
+            "history_source": source,
+        })
+
+    return {
+        "budget_id": budget.id,
+        "year": budget.year,
+        "total_budget": float(budget.total_budget or 0),
+        "months_closed": closed,
+        "weights": seasonal_weights(budget),
+        "categories": rows,
+    }
+
+
+# ==================== SIMULATION ====================
+
+def simulate(inputs: Dict, paths: int = DEFAULT_PATHS, seed: Optional[int] = None) -> Dict:
+    """Vectorized Monte Carlo of year-end spend per category and in total"""
+    categories = inputs["categories"]
+    closed = inputs["months_closed"]
+    rng = np.random.default_rng(seed)
+
+    amount = np.array([c["amount"] for c in categories], dtype=np.float64)
+    spent = np.array([c["actual_to_date"] for c in categories], dtype=np.float64)
+    mean = np.array([c["ratio_mean"] for c in categories], dtype=np.float64)
+    std = np.array([c["ratio_std"] for c in categories], dtype=np.float64)
+    monthly_plan = amount[:, None] * inputs["weights"][None, :]
+
+    # Remaining spend is a plan-weighted sum of independent monthly ratios, so it
+    # is drawn in one shot from the matching normal (floored at zero) instead of
+    # month by month. Categories are drawn in turn (the same stream as a single
+    # categories x paths draw) and summarized before the next, so only the
+    # current category's paths and the running total are held in memory.
+    remaining_plan = monthly_plan[:, closed:]
+    remaining_mean = mean * remaining_plan.sum(axis=1)
+    remaining_std = std * np.sqrt((remaining_plan ** 2).sum(axis=1))
+
+    total = np.zeros(paths)
+    results = []
+    for i, category in enumerate(categories):
+        spend = spent[i] + np.maximum(remaining_mean[i] + remaining_std[i] * rng.standard_normal(paths), 0.0)
+        total += spend
+        p50, p90 = np.percentile(spend, [50, 90])
+        results.append({
+            **category,
+            "ratio_mean": round(category["ratio_mean"], 4),
+            "ratio_std": round(category["ratio_std"], 4),
+            "expected_spend": round(float(spend.mean()), 2),
+            "p50_spend": round(float(p50), 2),
+            "p90_spend": round(float(p90), 2),
+            "overrun_probability": round(float((spend > amount[i]).mean()), 4),
+        })
+
+    total_p50, total_p90 = np.percentile(total, [50, 90])
+    total_budget = inputs["total_budget"] or amount.sum()
+
+    return {
+        "budget_id": inputs["budget_id"],
+        "year": inputs["year"],
+        "months_closed": closed,
+        "paths": paths,
+        "seed": seed,
+        "total": {
+            "budget": round(total_budget, 2),
+            "allocated": round(float(amount.sum()), 2),
+            "actual_to_date": round(float(spent.sum()), 2),
+            "expected_spend": round(float(total.mean()), 2),
+            "p50_spend": round(float(total_p50), 2),
+            "p90_spend": round(float(total_p90), 2),
+            "overrun_probability": round(float((total > total_budget).mean()), 4),
+        },
+        "categories": results,
+    }
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    if settings.simulation_workers <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking a threaded API worker can deadlock the child
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.simulation_workers,
+                mp_context=get_context("spawn")
+            )
+        return _executor
+
+
+async def _run(inputs: Dict, paths: int, seed: Optional[int]) -> Dict:
+    global _executor
+    executor = _get_executor()
+    if executor is None:
+        return await run_in_threadpool(simulate, inputs, paths, seed)
+    future = executor.submit(simulate, inputs, paths, seed)
+    try:
+        # Awaited on the event loop, so no worker thread sits waiting on the pool
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=SIMULATION_TIMEOUT)
+    except asyncio.TimeoutError:
+        # Drops it if still queued; a simulation already running finishes in its worker
+        future.cancel()
+        raise SimulationTimeoutError(f"Simulation did not finish within {SIMULATION_TIMEOUT} seconds")
+    except BrokenProcessPool:
+        with _executor_lock:
+            _executor = None
+        return await run_in_threadpool(simulate, inputs, paths, seed)
+
+
+async def get_budget_risk(
+    db: Session,
+    budget: MarketingBudget,
+    paths: int = DEFAULT_PATHS,
+    seed: Optional[int] = 0,
+    as_of: Optional[date] = None
+) -> Dict:
+    """Memoized overrun risk for a budget, re-simulated only when its data changes
+
+    A None seed draws fresh paths every call and is never cached.
+    """
+    as_of = as_of or date.today()
+    key = (budget.id, paths, seed, as_of.year, as_of.month)
+    version = await run_in_threadpool(get_data_version, db, budget)
+
+    with _cache_lock:
+        cached = _cache.get(key)
+    if seed is not None and cached and cached[0] == version:
+        return cached[1]
+
+    inputs = await run_in_threadpool(build_inputs, db, budget, as_of)
+    result = await _run(inputs, paths, seed)
+    result["as_of"] = as_of.isoformat()
+    if seed is not None:
+        with _cache_lock:
+            if len(_cache) >= CACHE_SIZE and key not in _cache:
+                _cache.clear()
+            _cache[key] = (version, result)
+    return result
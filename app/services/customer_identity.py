@@ -0,0 +1,338 @@
+"""
+Customer identity resolution across R&D tables
+
+The same lab appears under slightly different spellings in customer
+interest, revenue, sample and contact records. Every name is normalized
+(case, punctuation, legal suffixes, "Labs"/"Laboratories"/...), and
+distinct normalized names are clustered into canonical customers:
+
+- blocking: an inverted index from character trigrams to names holding
+  only each name's rarest trigrams (prefix filtering: two names with
+  Jaccard similarity >= SIMILARITY_THRESHOLD must share one of them), so
+  candidate generation stays near-linear
+- matching: trigram Jaccard similarity, merged with union-find
+- revenue rows linked to a customer interest record are merged with it
+
+The index lives in memory and is keyed by a cheap data-version query. When
+only new rows have arrived since the last build, just those rows are
+added; edits or deletes trigger a full rebuild.
+"""
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.rd_initiative import RDCustomerInterest, RDRevenue, RDSample, RDContact, RDInitiative
+
+SIMILARITY_THRESHOLD = 0.6
+
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "llp", "ltd", "limited", "corp", "corporation",
+    "co", "company", "plc", "gmbh", "ag", "sa", "pc", "pllc",
+}
+TOKEN_SYNONYMS = {
+    "labs": "lab", "laboratory": "lab", "laboratories": "lab", "lab's": "lab",
+    "diagnostics": "diagnostic", "dept": "department", "intl": "international",
+    "ctr": "center", "centre": "center", "univ": "university",
+}
+
+# source -> (model, name column)
+SOURCES = {
+    "customer_interest": (RDCustomerInterest, RDCustomerInterest.customer_name),
+    "revenue": (RDRevenue, RDRevenue.customer_name),
+    "sample": (RDSample, RDSample.recipient_company),
+    "contact": (RDContact, RDContact.company),
+}
+
+_index: Optional["CustomerIndex"] = None
+_index_version: Optional[Tuple] = None
+_index_lock = threading.Lock()
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Comparable form of a company name"""
+    if not name:
+        return ""
+    text = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().lower()
+    text = text.replace("&", " and ")
+    tokens = re.findall(r"[a-z0-9']+", text)
+    tokens = [TOKEN_SYNONYMS.get(t, t).replace("'", "") for t in tokens]
+    tokens = [t for t in tokens if t and t not in LEGAL_SUFFIXES]
+    # Dotted acronyms ("N.M.S.") read as one word
+    tokens = re.sub(r"\b(\w) (?=\w\b)", r"\1", " ".join(tokens)).split()
+    if tokens and tokens[0] == "the":
+        tokens = tokens[1:]
+    return " ".join(tokens)
+
+
+def trigrams(normalized: str) -> frozenset:
+    padded = f"  {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _slug(normalized: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", normalized).strip("-")
+
+
+class CustomerIndex:
+    """Trigram blocking index + union-find over distinct normalized names"""
+
+    def __init__(self):
+        self.node_of: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.grams: List[frozenset] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        self.parent: List[int] = []
+        self.mentions: List[Dict] = []
+        self.interest_node: Dict[int, int] = {}
+        self.watermarks: Dict[str, int] = {source: 0 for source in SOURCES}
+        # Trigram document frequency at the first build; fixed afterwards so prefixes stay comparable
+        self.rarity: Optional[Dict[str, int]] = None
+        self._customers: Optional[Dict[str, Dict]] = None
+
+    # ----- union-find -----
+
+    def find(self, node: int) -> int:
+        root = node
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[node] != root:
+            self.parent[node], node = root, self.parent[node]
+        return root
+
+    def union(self, a: int, b: int):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+    # ----- names -----
+
+    def _prefix(self, grams: frozenset) -> List[str]:
+        """A name's rarest trigrams; any name at the threshold shares at least one of its own prefix"""
+        required = math.ceil(SIMILARITY_THRESHOLD * len(grams) - 1e-9)
+        ordered = sorted(grams, key=lambda g: (self.rarity.get(g, 0), g))
+        return ordered[:len(grams) - required + 1]
+
+    def add_name(self, normalized: str) -> int:
+        node = self.node_of.get(normalized)
+        if node is not None:
+            return node
+
+        node = len(self.parent)
+        grams = trigrams(normalized)
+        self.node_of[normalized] = node
+        self.keys.append(normalized)
+        self.grams.append(grams)
+        self.parent.append(node)
+
+        # Prefix filtering: both sides are indexed and probed by their prefix under one fixed
+        # trigram order, and only names of compatible length can reach the threshold
+        prefix = self._prefix(grams)
+        low, high = SIMILARITY_THRESHOLD * len(grams), len(grams) / SIMILARITY_THRESHOLD
+        candidates = {other for g in prefix for other in self.postings.get(g, ())}
+        for other in candidates:
+            size = len(self.grams[other])
+            if size < low or size > high:
+                continue
+            shared = len(grams & self.grams[other])
+            if shared / (len(grams) + size - shared) >= SIMILARITY_THRESHOLD:
+                self.union(node, other)
+
+        for g in prefix:
+            self.postings[g].append(node)
+        return node
+
+    def add_mentions(self, rows: List[Dict]):
+        """Index new rows from any source (interest rows first, so revenue links resolve)"""
+        rows = sorted(rows, key=lambda r: r["source"] != "customer_interest")
+        if self.rarity is None:
+            names = {normalize_name(r["name"]) for r in rows}
+            self.rarity = Counter(g for name in names if name for g in trigrams(name))
+        for row in rows:
+            normalized = normalize_name(row["name"])
+            if not normalized:
+                continue
+            node = self.add_name(normalized)
+            row["node"] = node
+            self.mentions.append(row)
+
+            if row["source"] == "customer_interest":
+                self.interest_node[row["id"]] = node
+            elif row.get("customer_interest_id") in self.interest_node:
+                self.union(node, self.interest_node[row["customer_interest_id"]])
+
+            self.watermarks[row["source"]] = max(self.watermarks[row["source"]], row["id"])
+        self._customers = None
+
+    # ----- clusters -----
+
+    def customers(self) -> Dict[str, Dict]:
+        """Canonical customers keyed by canonical id (computed once per index change)"""
+        if self._customers is not None:
+            return self._customers
+
+        clusters: Dict[int, List[Dict]] = defaultdict(list)
+        for mention in self.mentions:
+            clusters[self.find(mention["node"])].append(mention)
+
+        customers = {}
+        for mentions in clusters.values():
+            spellings = Counter(m["name"].strip() for m in mentions)
+            # Most used spelling names the customer; ties go to the shortest, then alphabetical
+            name = min(spellings, key=lambda s: (-spellings[s], len(s), s))
+            orders = sorted(
+                (m for m in mentions if m["source"] == "revenue"),
+                key=lambda m: (m["order_date"] is not None, m["order_date"]), reverse=True
+            )
+            by_initiative: Dict[int, Dict] = {}
+            for order in orders:
+                entry = by_initiative.setdefault(
+                    order["initiative_id"],
+                    {"initiative_id": order["initiative_id"], "order_count": 0, "order_value": 0.0}
+                )
+                entry["order_count"] += 1
+                entry["order_value"] += order["order_value"] or 0.0
+            order_dates = [o["order_date"] for o in orders if o["order_date"]]
+
+            # Keyed by the cluster's match keys, not its spellings, so new variants or mention
+            # counts don't move it; the smallest key doesn't depend on load order either
+            canonical_id = _slug(min(self.keys[node] for node in {m["node"] for m in mentions}))
+            customers[canonical_id] = {
+                "canonical_id": canonical_id,
+                "name": name,
+                "variants": [{"name": s, "mentions": n} for s, n in spellings.most_common()],
+                "sources": dict(Counter(m["source"] for m in mentions)),
+                "initiative_ids": sorted({m["initiative_id"] for m in mentions}),
+                "order_count": len(orders),
+                "order_value": round(sum(o["order_value"] or 0.0 for o in orders), 2),
+                "first_order_date": min(order_dates) if order_dates else None,
+                "last_order_date": max(order_dates) if order_dates else None,
+                "orders_by_initiative": sorted(
+                    ({**e, "order_value": round(e["order_value"], 2)} for e in by_initiative.values()),
+                    key=lambda e: -e["order_value"]
+                ),
+                "orders": [
+                    {k: o.get(k) for k in ("id", "initiative_id", "order_number", "order_value", "order_date",
+                                           "product_launched", "name")}
+                    for o in orders
+                ],
+            }
+        self._customers = customers
+        return customers
+
+
+# ==================== LOADING ====================
+
+def get_data_version(db: Session) -> Tuple:
+    """(count, max id, last edit) per source table"""
+    version = []
+    for model, _ in SOURCES.values():
+        version.append(tuple(db.query(func.count(model.id), func.max(model.id), func.max(model.updated_at)).one()))
+    return tuple(version)
+
+
+def load_mentions(db: Session, after: Optional[Dict[str, int]] = None) -> List[Dict]:
+    """Rows naming a customer, optionally only those newer than per-source id watermarks"""
+    rows = []
+    for source, (model, column) in SOURCES.items():
+        columns = [model.id, model.initiative_id, column]
+        if source == "revenue":
+            columns += [RDRevenue.customer_interest_id, RDRevenue.order_value, RDRevenue.order_date,
+                        RDRevenue.order_number, RDRevenue.product_launched]
+        query = db.query(*columns).filter(column.isnot(None))
+        if after:
+            query = query.filter(model.id > after[source])
+
+        for values in query.all():
+            row = {"source": source, "id": values[0], "initiative_id": values[1], "name": values[2]}
+            if source == "revenue":
+                row.update(zip(
+                    ("customer_interest_id", "order_value", "order_date", "order_number", "product_launched"),
+                    values[3:]
+                ))
+            rows.append(row)
+    return rows
+
+
+def _only_appended(db: Session, old: Tuple, new: Tuple) -> bool:
+    """True when every change since `old` is a newly inserted row"""
+    for (old_count, old_max, old_edit), (new_count, _, new_edit), (source, (model, _)) in zip(
+        old, new, SOURCES.items()
+    ):
+        if old_edit != new_edit:
+            return False
+        appended = db.query(func.count(model.id)).filter(model.id > (old_max or 0)).scalar()
+        if new_count - old_count != appended:
+            return False
+    return True
+
+
+def get_customer_index(db: Session) -> CustomerIndex:
+    """Current index, built from scratch or topped up with newly added rows"""
+    global _index, _index_version
+    version = get_data_version(db)
+
+    with _index_lock:
+        if _index is not None and _index_version == version:
+            return _index
+
+        if _index is not None and _only_appended(db, _index_version, version):
+            _index.add_mentions(load_mentions(db, after=_index.watermarks))
+        else:
+            _index = CustomerIndex()
+            _index.add_mentions(load_mentions(db))
+        _index_version = version
+        return _index
+
+
+def _initiative_names(db: Session, customers: List[Dict]) -> Dict[int, str]:
+    ids = {i for c in customers for i in c["initiative_ids"]}
+    return dict(db.query(RDInitiative.id, RDInitiative.name).filter(RDInitiative.id.in_(ids)).all()) if ids else {}
+
+
+def _present(customer: Dict, names: Dict[int, str], include_orders: bool) -> Dict:
+    result = {k: v for k, v in customer.items() if k != "orders"}
+    result["orders_by_initiative"] = [
+        {**entry, "initiative_name": names.get(entry["initiative_id"])} for entry in customer["orders_by_initiative"]
+    ]
+    if include_orders:
+        result["orders"] = [{**o, "initiative_name": names.get(o["initiative_id"])} for o in customer["orders"]]
+    return result
+
+
+def list_canonical_customers(
+    db: Session,
+    q: Optional[str] = None,
+    min_orders: int = 0,
+    skip: int = 0,
+    limit: int = 100
+) -> Dict:
+    """Canonical customers, biggest order value first"""
+    customers = list(get_customer_index(db).customers().values())
+    if q:
+        needle = normalize_name(q)
+        customers = [
+            c for c in customers
+            if any(needle in normalize_name(v["name"]) for v in c["variants"])
+        ]
+    customers = [c for c in customers if c["order_count"] >= min_orders]
+    customers.sort(key=lambda c: (-c["order_value"], c["name"].lower()))
+    page = customers[skip:skip + limit]
+    names = _initiative_names(db, page)
+    return {
+        "count": len(customers),
+        "customers": [_present(c, names, include_orders=False) for c in page],
+    }
+
+
+def get_canonical_customer(db: Session, canonical_id: str) -> Optional[Dict]:
+    """One canonical customer with its full cross-initiative order history"""
+    customer = get_customer_index(db).customers().get(canonical_id)
+    if not customer:
+        return None
+    return _present(customer, _initiative_names(db, [customer]), include_orders=True)
@@ -0,0 +1,169 @@
+"""
+Delta sync for collection endpoints
+
+A client that already holds a collection asks for ?updated_since=<watermark>
+and gets back only the rows changed since then, the ids deleted since then
+(with include_deleted) and a new watermark to send next time. Rows match on
+coalesce(updated_at, created_at), which every synced table indexes.
+
+Deletes leave a tombstone in deleted_records. Mapper events write it in the
+same flush as the DELETE; rows the database removes itself (ON DELETE
+CASCADE) are tombstoned from the parent's before_delete with one
+INSERT ... SELECT per child table, and rows a cascade SET NULLs get their
+updated_at bumped so they show up as changed. Bulk query deletes skip mapper
+events and must call record_deleted themselves.
+
+The watermark is the database clock minus a small lag, so a row written by a
+transaction that committed just after the read is still returned next time.
+Deltas overlap a little; clients apply them idempotently (deletes, then
+upserts by id). Tombstones older than the retention window are purged, and a
+request reaching back past it is answered with reset=True: refetch in full.
+"""
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from sqlalchemy import DateTime, event, func, insert, literal, literal_column, select, update
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models.budget import BudgetItem
+from app.models.campaign import Campaign
+from app.models.expense import ActualExpense
+from app.models.kpi import KPISnapshot
+from app.models.marketing_calendar import MarketingActivity
+from app.models.rd_initiative import (
+    RDInitiative, RDInitiativeTeam, RDCustomerInterest, RDSample, RDContact, RDMilestone,
+    RDExpense, RDRevenue, RDNote
+)
+from app.models.sync import CHANGED_AT, DeletedRecord
+
+WATERMARK_LAG_SECONDS = 5
+TOMBSTONE_RETENTION_DAYS = 30
+
+# table name -> model for every collection offered as a delta
+SYNCED = {
+    model.__tablename__: model
+    for model in (
+        Campaign, BudgetItem, ActualExpense, KPISnapshot, MarketingActivity,
+        RDInitiative, RDInitiativeTeam, RDCustomerInterest, RDSample, RDContact, RDMilestone,
+        RDExpense, RDRevenue, RDNote,
+    )
+}
+
+tombstones = DeletedRecord.__table__
+
+
+# ==================== TOMBSTONES ====================
+
+def record_deleted(db: Session, model, ids):
+    """Tombstone the rows of a synced model whose ids the select returns, before they are deleted"""
+    table_name = model.__tablename__
+    ids = ids.subquery()
+    db.execute(insert(tombstones).from_select(
+        ["table_name", "record_id"],
+        select(literal(table_name), ids.c[0])
+    ))
+
+
+@lru_cache(maxsize=None)
+def _dependents(table_name: str) -> Tuple:
+    """(child table, foreign key) for every FK with an ON DELETE rule referencing the table"""
+    return tuple(
+        (child, fk)
+        for child in Base.metadata.tables.values()
+        for fk in child.foreign_keys
+        if fk.column.table.name == table_name and fk.ondelete
+    )
+
+
+def _cascade(connection, table_name: str, ids):
+    """Tombstone (or bump) synced rows the database will cascade to from the given parent ids"""
+    for child, fk in _dependents(table_name):
+        affected = select(child.c.id).where(fk.parent.in_(ids))
+        if fk.ondelete.upper() == "CASCADE":
+            if child.name in SYNCED:
+                connection.execute(insert(tombstones).from_select(
+                    ["table_name", "record_id"], select(literal(child.name), affected.subquery().c.id)
+                ))
+            _cascade(connection, child.name, affected)
+        elif fk.ondelete.upper() == "SET NULL" and child.name in SYNCED:
+            connection.execute(update(child).where(fk.parent.in_(ids)).values(updated_at=func.now()))
+
+
+@event.listens_for(Base, "before_delete", propagate=True)
+def _tombstone_cascades(mapper, connection, target):
+    table_name = mapper.local_table.name
+    if _dependents(table_name):
+        _cascade(connection, table_name, [target.id])
+
+
+@event.listens_for(Base, "after_delete", propagate=True)
+def _tombstone(mapper, connection, target):
+    table_name = mapper.local_table.name
+    if table_name in SYNCED:
+        connection.execute(insert(tombstones).values(table_name=table_name, record_id=target.id))
+
+
+def purge_tombstones(db: Session, retention_days: int = TOMBSTONE_RETENTION_DAYS) -> int:
+    """Delete tombstones older than the retention window; returns how many"""
+    horizon = _now(db) - timedelta(days=retention_days)
+    result = db.execute(tombstones.delete().where(tombstones.c.deleted_at < horizon))
+    db.commit()
+    return result.rowcount
+
+
+# ==================== DELTAS ====================
+
+def _now(db: Session) -> datetime:
+    # The database clock, which stamped updated_at/created_at/deleted_at
+    return db.execute(select(func.now())).scalar()
+
+
+def _as_db_time(db: Session, value: datetime) -> datetime:
+    # SQLite keeps naive UTC text; elsewhere timestamps are zone-aware. Naive input is taken as UTC.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    if db.get_bind().dialect.name == "sqlite":
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def get_changes(
+    db: Session,
+    table_name: str,
+    updated_since: datetime,
+    include_deleted: bool = False,
+    **scope
+) -> Dict:
+    """Rows of a synced table changed since a watermark, plus deleted ids and the next watermark
+
+    `scope` narrows the rows by column equality, e.g. initiative_id=3.
+    Deleted ids are not scoped (a tombstone only keeps the id); clients
+    ignore ids they don't hold.
+    """
+    model = SYNCED[table_name]
+    now = _now(db)
+    since = _as_db_time(db, updated_since)
+    result = {"watermark": now - timedelta(seconds=WATERMARK_LAG_SECONDS), "reset": False, "items": [], "deleted": []}
+
+    # Tombstones before the horizon may already be purged, so a delta can't be complete
+    horizon = now - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+    if include_deleted and since < horizon:
+        result["reset"] = True
+        return result
+
+    changed_at = literal_column(CHANGED_AT, DateTime(timezone=True))
+    query = db.query(model).filter(changed_at >= since)
+    for column, value in scope.items():
+        query = query.filter(getattr(model, column) == value)
+    result["items"] = query.order_by(changed_at, model.id).all()
+
+    if include_deleted:
+        result["deleted"] = db.execute(
+            select(tombstones.c.record_id).where(
+                tombstones.c.table_name == table_name,
+                tombstones.c.deleted_at >= since
+            ).distinct().order_by(tombstones.c.record_id)
+        ).scalars().all()
+    return result
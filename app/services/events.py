@@ -0,0 +1,235 @@
+"""
+Entity-change event hub backing the /api/events feed
+
+Write endpoints publish small change events (activity toggled, snapshot
+logged, expense created, ...). Every event gets a monotonically increasing
+version so clients can either stream them over SSE or cheaply poll for
+"changes since version N" and refetch only the sections that changed.
+
+The default hub is in-process. Set REDIS_URL to share versions and events
+across gunicorn workers (requires the optional `redis` package).
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.config import settings
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+class EventHub:
+    """In-process pub/sub hub with a bounded replay buffer"""
+
+    def __init__(self, history_size: int = 1000):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+
+    # ----- publishing -----
+
+    def publish(self, entity: str, action: str, entity_id: Optional[int] = None, **data) -> Dict:
+        """Record a change and fan it out to every live subscriber"""
+        with self._lock:
+            self._version += 1
+            event = self._make_event(self._version, entity, action, entity_id, data)
+            self._history.append(event)
+        self._dispatch(event)
+        return event
+
+    @staticmethod
+    def _make_event(version: int, entity: str, action: str, entity_id: Optional[int], data: Dict) -> Dict:
+        return {
+            "version": version,
+            "entity": entity,
+            "action": action,
+            "entity_id": entity_id,
+            "data": data,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+
+    def _dispatch(self, event: Dict):
+        # Publishers usually run in FastAPI's threadpool, so hand events to
+        # each subscriber's event loop instead of touching the queue directly
+        for loop, queue in list(self._subscribers):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # Loop already closed; the subscriber will be cleaned up on exit
+                pass
+
+    # ----- reading -----
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _buffered_events(self) -> List[Dict]:
+        with self._lock:
+            return list(self._history)
+
+    def changes_since(self, since: int) -> Dict:
+        """Summarize changes after `since`
+
+        `reset` is True when the client is too far behind (or ahead, after a
+        server restart) for the replay buffer, meaning it should refetch
+        everything.
+        """
+        version = self.version
+        events = self._buffered_events()
+        oldest = events[0]["version"] if events else version + 1
+
+        reset = since > version or (since < version and since + 1 < oldest)
+        changes = [] if reset else [e for e in events if e["version"] > since]
+
+        return {
+            "version": version,
+            "since": since,
+            "reset": reset,
+            "entities": sorted({e["entity"] for e in changes}),
+            "changes": changes
+        }
+
+    async def subscribe(
+        self,
+        last_event_id: Optional[int] = None,
+        heartbeat: Optional[float] = None
+    ) -> AsyncIterator[Optional[Dict]]:
+        """Yield events as they are published, replaying any after `last_event_id`
+
+        With `heartbeat` set, yields None whenever that many seconds pass
+        without an event so callers can keep idle connections alive.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        subscriber = (loop, queue)
+        self._subscribers.add(subscriber)
+        try:
+            if last_event_id is not None:
+                for event in self.changes_since(last_event_id)["changes"]:
+                    yield event
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self._subscribers.discard(subscriber)
+
+
+class RedisEventHub(EventHub):
+    """Hub that shares versions and events across workers through Redis"""
+
+    CHANNEL = "marketing_budget:events"
+    VERSION_KEY = "marketing_budget:events:version"
+    HISTORY_KEY = "marketing_budget:events:history"
+    LISTENER_RETRY_SECONDS = 5
+
+    def __init__(self, url: str, history_size: int = 1000):
+        super().__init__(history_size=history_size)
+        self._history_size = history_size
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self._listener = None
+
+    def publish(self, entity: str, action: str, entity_id: Optional[int] = None, **data) -> Optional[Dict]:
+        # Called after the write has committed: delivery is best-effort, so a Redis
+        # outage is logged (and the event lost) rather than failing the request
+        try:
+            version = self._client.incr(self.VERSION_KEY)
+            event = self._make_event(version, entity, action, entity_id, data)
+            payload = json.dumps(event, default=str)
+
+            pipe = self._client.pipeline()
+            pipe.rpush(self.HISTORY_KEY, payload)
+            pipe.ltrim(self.HISTORY_KEY, -self._history_size, -1)
+            pipe.publish(self.CHANNEL, payload)
+            pipe.execute()
+        except redis.RedisError:
+            logger.exception("Failed to publish %s %s event to Redis", entity, action)
+            return None
+        # Local subscribers receive it through the Redis listener like everyone else
+        return event
+
+    # While Redis is unreachable, reads fall back to the events this worker's
+    # listener has already received (the in-process version and buffer)
+
+    @property
+    def version(self) -> int:
+        self._ensure_listener()
+        try:
+            return int(self._client.get(self.VERSION_KEY) or 0)
+        except redis.RedisError:
+            logger.warning("Redis unavailable; serving the in-process event version", exc_info=True)
+            return super().version
+
+    def _buffered_events(self) -> List[Dict]:
+        self._ensure_listener()
+        try:
+            return [json.loads(item) for item in self._client.lrange(self.HISTORY_KEY, 0, -1)]
+        except redis.RedisError:
+            logger.warning("Redis unavailable; serving the in-process event buffer", exc_info=True)
+            return super()._buffered_events()
+
+    def _receive(self, event: Dict):
+        with self._lock:
+            self._version = max(self._version, event["version"])
+            self._history.append(event)
+        self._dispatch(event)
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is not None:
+                return
+
+            def listen():
+                # Reconnect and resubscribe after any Redis error; events published
+                # while disconnected aren't replayed to live subscribers
+                while True:
+                    try:
+                        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                        pubsub.subscribe(self.CHANNEL)
+                        for message in pubsub.listen():
+                            self._receive(json.loads(message["data"]))
+                    except redis.RedisError:
+                        logger.warning("Redis event listener disconnected; retrying", exc_info=True)
+                        time.sleep(self.LISTENER_RETRY_SECONDS)
+
+            self._listener = threading.Thread(target=listen, name="event-hub-redis", daemon=True)
+            self._listener.start()
+
+    async def subscribe(
+        self,
+        last_event_id: Optional[int] = None,
+        heartbeat: Optional[float] = None
+    ) -> AsyncIterator[Optional[Dict]]:
+        self._ensure_listener()
+        async for event in super().subscribe(last_event_id, heartbeat):
+            yield event
+
+
+def _create_hub() -> EventHub:
+    if settings.redis_url:
+        if redis is None:
+            print("Warning: REDIS_URL is set but the redis package is not installed - using in-process events")
+        else:
+            return RedisEventHub(settings.redis_url)
+    return EventHub()
+
+
+event_hub = _create_hub()
+
+
+def publish_event(entity: str, action: str, entity_id: Optional[int] = None, **data) -> Optional[Dict]:
+    """Publish an entity-change event on the shared hub"""
+    return event_hub.publish(entity, action, entity_id, **data)
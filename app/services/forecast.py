@@ -0,0 +1,243 @@
+"""
+Budget burn-rate and year-end forecast
+
+Builds a budget_item x month matrix of plan and actual spend from a single
+query (actuals pivoted to month columns in SQL), then projects year-end spend for every item at once:
+
+- run-rate: average monthly spend over the closed months
+- straight-line projection: spend to date + run-rate for the remaining months
+- seasonality-adjusted projection: spend to date + the remaining planned
+  spend, scaled by how far ahead or behind plan the item is running
+
+Each item's monthly_budget gives its seasonal shape, scaled to its
+total_budget. Items without a monthly distribution follow the portfolio's
+overall planned shape (or spread evenly if nothing has one). Results
+roll up to campaigns and cost centers.
+"""
+from datetime import date
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import and_, case, extract, func, or_
+from sqlalchemy.orm import Session
+
+from app.models.budget import BudgetItem
+from app.models.campaign import Campaign
+from app.models.cost_center import CostCenter
+from app.models.expense import ActualExpense
+
+MONTHS = 12
+
+# Projected spend within this share of budget counts as on track
+ON_TRACK_TOLERANCE = 0.05
+
+ITEM_COLUMNS = [
+    "budget_item_id", "name", "category",
+    "campaign_id", "campaign_name",
+    "cost_center_id", "cost_center_name", "cost_center_code",
+    "total_budget", "monthly_budget"
+]
+ACTUAL_COLUMNS = [f"actual_{m}" for m in range(1, MONTHS + 1)]
+
+
+def load_budget_actuals(db: Session, year: int) -> pd.DataFrame:
+    """Budget items with their actual spend pivoted into one column per month (one row per item)"""
+    year_start, year_end = date(year, 1, 1), date(year, 12, 31)
+
+    # Extract the month once per expense, then pivot the (item, month) sums into columns
+    item_months = db.query(
+        ActualExpense.budget_item_id.label("budget_item_id"),
+        extract("month", ActualExpense.expense_date).label("month"),
+        func.sum(ActualExpense.amount).label("actual")
+    ).filter(
+        ActualExpense.expense_date.between(year_start, year_end)
+    ).group_by(
+        "budget_item_id", "month"
+    ).subquery()
+
+    monthly_actuals = db.query(
+        item_months.c.budget_item_id,
+        *[
+            func.sum(case((item_months.c.month == m, item_months.c.actual), else_=0)).label(column)
+            for m, column in enumerate(ACTUAL_COLUMNS, start=1)
+        ]
+    ).group_by(
+        item_months.c.budget_item_id
+    ).subquery()
+
+    rows = db.query(
+        BudgetItem.id,
+        BudgetItem.name,
+        BudgetItem.category,
+        BudgetItem.campaign_id,
+        Campaign.name,
+        BudgetItem.cost_center_id,
+        CostCenter.name,
+        CostCenter.code,
+        BudgetItem.total_budget,
+        BudgetItem.monthly_budget,
+        *[monthly_actuals.c[column] for column in ACTUAL_COLUMNS]
+    ).join(
+        Campaign, BudgetItem.campaign_id == Campaign.id
+    ).join(
+        CostCenter, BudgetItem.cost_center_id == CostCenter.id
+    ).outerjoin(
+        monthly_actuals, monthly_actuals.c.budget_item_id == BudgetItem.id
+    ).filter(
+        # Items whose campaign runs during the year, plus anything with spend in it
+        or_(
+            and_(
+                or_(Campaign.start_date.is_(None), Campaign.start_date <= year_end),
+                or_(Campaign.end_date.is_(None), Campaign.end_date >= year_start)
+            ),
+            monthly_actuals.c.budget_item_id.isnot(None)
+        )
+    ).all()
+
+    return pd.DataFrame(rows, columns=ITEM_COLUMNS + ACTUAL_COLUMNS)
+
+
+def months_closed(year: int, as_of: date) -> int:
+    """Number of fully completed months of `year` as of a date"""
+    if as_of.year < year:
+        return 0
+    if as_of.year > year:
+        return MONTHS
+    return as_of.month - 1
+
+
+def monthly_budget_matrix(monthly_budgets: pd.Series) -> np.ndarray:
+    """One row of 12 month amounts per monthly_budget JSON ({"1": 1000, ...})"""
+    if monthly_budgets.empty:
+        return np.zeros((0, MONTHS))
+    amounts = pd.DataFrame.from_records([mb or {} for mb in monthly_budgets], index=monthly_budgets.index)
+    # Keys are free-form strings: ones that aren't a month number are dropped, "1" and "01" are summed
+    amounts.columns = pd.to_numeric(amounts.columns, errors="coerce")
+    amounts = amounts.T.groupby(level=0).sum().T
+    return amounts.reindex(index=monthly_budgets.index, columns=range(1, MONTHS + 1), fill_value=0).to_numpy(dtype=np.float64)
+
+
+def build_matrices(df: pd.DataFrame):
+    """Split the item rows into an items frame plus plan and actual matrices"""
+    actual = df[ACTUAL_COLUMNS].fillna(0).to_numpy(dtype=np.float64)
+    items = df.drop(columns=ACTUAL_COLUMNS)
+
+    if items.empty:
+        return items, np.zeros((0, MONTHS)), actual.reshape(0, MONTHS)
+
+    # Plan: monthly_budget JSON ({"1": 1000, ...}) as seasonal weights per item
+    shape = np.clip(monthly_budget_matrix(items["monthly_budget"]), 0, None)
+
+    shape_totals = shape.sum(axis=1)
+    has_shape = shape_totals > 0
+    portfolio = shape[has_shape].sum(axis=0)
+    portfolio = portfolio / portfolio.sum() if portfolio.sum() > 0 else np.full(MONTHS, 1 / MONTHS)
+
+    weights = np.where(
+        has_shape[:, None],
+        shape / np.where(has_shape, shape_totals, 1)[:, None],
+        portfolio
+    )
+    total_budget = items["total_budget"].fillna(0).to_numpy(dtype=np.float64)
+    plan = weights * total_budget[:, None]
+
+    return items, plan, actual
+
+
+def project(plan: np.ndarray, actual: np.ndarray, closed: int) -> Dict[str, np.ndarray]:
+    """Vectorized run-rate and year-end projections for every item"""
+    budget = plan.sum(axis=1)
+    actual_to_date = actual.sum(axis=1)
+    actual_closed = actual[:, :closed].sum(axis=1)
+    plan_closed = plan[:, :closed].sum(axis=1)
+    plan_remaining = plan[:, closed:].sum(axis=1)
+    remaining_months = MONTHS - closed
+
+    run_rate = actual_closed / closed if closed else np.zeros_like(actual_closed)
+    straight_line = actual_closed + run_rate * remaining_months
+
+    # Pace vs plan so far; with no plan to compare against, assume the plan holds
+    pace = np.divide(actual_closed, plan_closed, out=np.ones_like(plan_closed), where=plan_closed > 0)
+    seasonal = actual_closed + plan_remaining * pace
+
+    # Spend already booked in open months is a floor on the projection
+    seasonal = np.maximum(seasonal, actual_to_date)
+    straight_line = np.maximum(straight_line, actual_to_date)
+
+    variance = seasonal - budget
+    return {
+        "total_budget": budget,
+        "plan_to_date": plan_closed,
+        "actual_to_date": actual_to_date,
+        "run_rate": run_rate,
+        "pace": pace,
+        "projected_straight_line": straight_line,
+        "projected_year_end": seasonal,
+        "projected_variance": variance,
+    }
+
+
+def _status(variance: pd.Series, budget: pd.Series) -> pd.Series:
+    tolerance = budget.abs() * ON_TRACK_TOLERANCE
+    return pd.Series(
+        np.select([variance > tolerance, variance < -tolerance], ["over", "under"], "on_track"),
+        index=variance.index
+    )
+
+
+def _finalize(frame: pd.DataFrame) -> pd.DataFrame:
+    frame = frame.copy()
+    frame["projected_variance_pct"] = np.round(
+        np.divide(
+            frame["projected_variance"], frame["total_budget"],
+            out=np.zeros(len(frame)), where=frame["total_budget"].to_numpy() != 0
+        ) * 100, 2
+    )
+    frame["status"] = _status(frame["projected_variance"], frame["total_budget"])
+    return frame.round(2)
+
+
+SUM_COLUMNS = [
+    "total_budget", "plan_to_date", "actual_to_date", "run_rate",
+    "projected_straight_line", "projected_year_end", "projected_variance"
+]
+
+
+def build_forecast(db: Session, year: int, as_of: Optional[date] = None, include_items: bool = True) -> Dict:
+    """Year-end forecast per budget item, campaign and cost center"""
+    as_of = as_of or date.today()
+    closed = months_closed(year, as_of)
+
+    df = load_budget_actuals(db, year)
+    items, plan, actual = build_matrices(df)
+    projections = project(plan, actual, closed)
+
+    for column, values in projections.items():
+        items[column] = values
+    items = items.drop(columns=["monthly_budget"])
+    items = _finalize(items)
+
+    campaigns = _finalize(
+        items.groupby(["campaign_id", "campaign_name"], as_index=False)[SUM_COLUMNS].sum()
+    )
+    cost_centers = _finalize(
+        items.groupby(["cost_center_id", "cost_center_name", "cost_center_code"], as_index=False)[SUM_COLUMNS].sum()
+    )
+    totals = _finalize(items[SUM_COLUMNS].sum().to_frame().T).iloc[0].to_dict()
+
+    result = {
+        "year": year,
+        "as_of": as_of.isoformat(),
+        "months_closed": closed,
+        "totals": totals,
+        "monthly": {
+            "plan": np.round(plan.sum(axis=0), 2).tolist(),
+            "actual": np.round(actual.sum(axis=0), 2).tolist()
+        },
+        "campaigns": campaigns.to_dict(orient="records"),
+        "cost_centers": cost_centers.to_dict(orient="records")
+    }
+    if include_items:
+        result["items"] = items.drop(columns=["pace"]).to_dict(orient="records")
+    return result
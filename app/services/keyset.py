@@ -0,0 +1,31 @@
+"""
+Opaque cursors for keyset pagination
+
+A cursor is the sort key of the last row on a page, JSON-encoded and
+base64'd so clients treat it as a token rather than building their own.
+"""
+import base64
+import json
+from typing import List, Optional
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor can't be decoded"""
+
+
+def encode_cursor(*key) -> str:
+    raw = json.dumps(list(key), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[List]:
+    """Sort key from a cursor (None for the first page)"""
+    if not cursor:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(key, list) or len(key) != size:
+        raise InvalidCursor("Invalid cursor")
+    return key
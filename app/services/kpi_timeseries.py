@@ -0,0 +1,250 @@
+"""
+Columnar time-series analytics for KPI metrics
+
+Loads a metric's full snapshot history into NumPy arrays and computes
+resampled monthly values, rolling statistics, percent-to-target, linear
+trend and anomaly z-scores without per-row Python loops.
+
+Results are memoized per metric and keyed by a cheap data-version query
+(snapshot count plus latest write time), so any new, updated or deleted
+snapshot invalidates the cached analytics on the next request - in every
+worker, not just the one that handled the write.
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.kpi import KPIMetric, KPISnapshot
+
+# Weekly-to-monthly aggregations
+AGGREGATIONS = ("sum", "mean", "last")
+
+# Distinct metric/window/aggregation/threshold combinations kept in memory
+CACHE_SIZE = 256
+
+_cache: Dict[Tuple, Tuple[Tuple, Dict]] = {}
+_cache_lock = threading.Lock()
+
+
+# ==================== DATA LOADING ====================
+
+def get_data_version(db: Session, metric: KPIMetric) -> Tuple:
+    """Fingerprint of a metric's snapshot data and target settings"""
+    count, last_created, last_updated = db.query(
+        func.count(KPISnapshot.id),
+        func.max(KPISnapshot.created_at),
+        func.max(KPISnapshot.updated_at)
+    ).filter(KPISnapshot.metric_id == metric.id).one()
+    return (count, last_created, last_updated, metric.updated_at)
+
+
+def load_history(db: Session, metric_id: int) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Load every snapshot for a metric as (dates, values) arrays per snapshot type"""
+    rows = db.query(
+        KPISnapshot.snapshot_type,
+        KPISnapshot.snapshot_date,
+        KPISnapshot.actual_value
+    ).filter(
+        KPISnapshot.metric_id == metric_id
+    ).order_by(KPISnapshot.snapshot_date).all()
+
+    history = {}
+    if not rows:
+        return history
+
+    types, dates, values = zip(*rows)
+    types = np.array(types)
+    dates = np.array(dates, dtype="datetime64[D]")
+    values = np.array(values, dtype=np.float64)
+
+    for snapshot_type in np.unique(types):
+        mask = types == snapshot_type
+        history[str(snapshot_type)] = (dates[mask], values[mask])
+    return history
+
+
+# ==================== VECTOR OPERATIONS ====================
+
+def resample_monthly(dates: np.ndarray, values: np.ndarray, how: str = "sum") -> Tuple[np.ndarray, np.ndarray]:
+    """Aggregate date-sorted points into calendar months"""
+    if dates.size == 0:
+        return dates.astype("datetime64[M]"), values
+
+    months = dates.astype("datetime64[M]")
+    unique_months, first_index, inverse = np.unique(months, return_index=True, return_inverse=True)
+
+    if how == "sum":
+        aggregated = np.bincount(inverse, weights=values)
+    elif how == "mean":
+        aggregated = np.bincount(inverse, weights=values) / np.bincount(inverse)
+    elif how == "last":
+        # Input is date-sorted, so the last point of each month sits just before the next month starts
+        last_index = np.append(first_index[1:] - 1, values.size - 1)
+        aggregated = values[last_index]
+    else:
+        raise ValueError(f"Unknown aggregation '{how}', expected one of {AGGREGATIONS}")
+
+    return unique_months, aggregated
+
+
+def rolling_stats(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Trailing rolling mean and sample std, NaN until the window fills"""
+    mean = np.full(values.size, np.nan)
+    std = np.full(values.size, np.nan)
+    if window < 1 or values.size < window:
+        return mean, std
+
+    windows = np.lib.stride_tricks.sliding_window_view(values, window)
+    mean[window - 1:] = windows.mean(axis=1)
+    if window > 1:
+        std[window - 1:] = windows.std(axis=1, ddof=1)
+    return mean, std
+
+
+def linear_trend(values: np.ndarray) -> Tuple[float, float]:
+    """Least-squares slope (per period) and intercept"""
+    if values.size < 2:
+        return 0.0, float(values[0]) if values.size else 0.0
+    slope, intercept = np.polyfit(np.arange(values.size), values, 1)
+    return float(slope), float(intercept)
+
+
+def anomaly_z_scores(values: np.ndarray, slope: float, intercept: float) -> np.ndarray:
+    """Z-scores of each point's residual from the linear trend"""
+    if values.size < 3:
+        return np.zeros(values.size)
+    residuals = values - (slope * np.arange(values.size) + intercept)
+    spread = residuals.std(ddof=1)
+    if spread == 0:
+        return np.zeros(values.size)
+    return residuals / spread
+
+
+def trailing_declines(values: np.ndarray) -> int:
+    """Number of consecutive period-over-period declines ending at the latest point"""
+    if values.size < 2:
+        return 0
+    rising_or_flat = np.flatnonzero(np.diff(values) >= 0)
+    last_non_decline = rising_or_flat[-1] + 1 if rising_or_flat.size else 0
+    return int(values.size - 1 - last_non_decline)
+
+
+# ==================== ANALYTICS ====================
+
+def _to_list(array: np.ndarray, decimals: int = 4) -> List[Optional[float]]:
+    rounded = np.round(array.astype(np.float64), decimals)
+    return [None if np.isnan(v) else float(v) for v in rounded]
+
+
+def series_analytics(
+    dates: np.ndarray,
+    values: np.ndarray,
+    target: Optional[float],
+    window: int,
+    anomaly_threshold: float
+) -> Dict:
+    """Rolling stats, target progress, trend and anomalies for one series"""
+    rolling_mean, rolling_std = rolling_stats(values, window)
+    slope, intercept = linear_trend(values)
+    z_scores = anomaly_z_scores(values, slope, intercept)
+
+    if target:
+        percent_to_target = values / target * 100
+    else:
+        percent_to_target = np.full(values.size, np.nan)
+
+    anomalies = np.flatnonzero(np.abs(z_scores) >= anomaly_threshold)
+
+    return {
+        "dates": [str(d) for d in dates],
+        "values": _to_list(values),
+        "rolling_mean": _to_list(rolling_mean),
+        "rolling_std": _to_list(rolling_std),
+        "percent_to_target": _to_list(percent_to_target, 2),
+        "z_scores": _to_list(z_scores),
+        "anomalies": [
+            {"date": str(dates[i]), "value": float(values[i]), "z_score": round(float(z_scores[i]), 4)}
+            for i in anomalies
+        ],
+        "trend": {
+            "slope_per_period": round(slope, 4),
+            "intercept": round(intercept, 4)
+        },
+        "declining_periods": trailing_declines(values),
+        "latest_value": float(values[-1]) if values.size else None
+    }
+
+
+def compute_metric_analytics(
+    db: Session,
+    metric: KPIMetric,
+    window: int = 4,
+    monthly_agg: Optional[str] = None,
+    anomaly_threshold: float = 2.0
+) -> Dict:
+    """Full analytics for a metric's weekly and monthly series"""
+    if monthly_agg is None:
+        # Rates don't add up across weeks; counts do
+        monthly_agg = "mean" if metric.unit == "%" else "sum"
+    if monthly_agg not in AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation '{monthly_agg}', expected one of {AGGREGATIONS}")
+
+    history = load_history(db, metric.id)
+    empty = (np.array([], dtype="datetime64[D]"), np.array([], dtype=np.float64))
+    weekly_dates, weekly_values = history.get("weekly", empty)
+    monthly_dates, monthly_values = history.get("monthly", empty)
+
+    # Months with an explicit monthly snapshot win; weekly data fills the gaps
+    logged_months, logged_values = resample_monthly(monthly_dates, monthly_values, "last")
+    resampled_months, resampled_values = resample_monthly(weekly_dates, weekly_values, monthly_agg)
+    fill = ~np.isin(resampled_months, logged_months)
+
+    months = np.concatenate([logged_months, resampled_months[fill]])
+    month_values = np.concatenate([logged_values, resampled_values[fill]])
+    order = np.argsort(months, kind="stable")
+
+    target = metric.target_value
+    return {
+        "metric_id": metric.id,
+        "metric_name": metric.name,
+        "unit": metric.unit,
+        "target_value": target,
+        "window": window,
+        "monthly_aggregation": monthly_agg,
+        "weekly": series_analytics(weekly_dates, weekly_values, target, window, anomaly_threshold),
+        "monthly": series_analytics(months[order], month_values[order], target, window, anomaly_threshold)
+    }
+
+
+def get_metric_analytics(
+    db: Session,
+    metric: KPIMetric,
+    window: int = 4,
+    monthly_agg: Optional[str] = None,
+    anomaly_threshold: float = 2.0
+) -> Dict:
+    """Memoized analytics, recomputed only when the metric's data version changes"""
+    key = (metric.id, window, monthly_agg, anomaly_threshold)
+    version = get_data_version(db, metric)
+
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    result = compute_metric_analytics(db, metric, window, monthly_agg, anomaly_threshold)
+    with _cache_lock:
+        if len(_cache) >= CACHE_SIZE and key not in _cache:
+            _cache.clear()
+        _cache[key] = (version, result)
+    return result
+
+
+def invalidate_metric(metric_id: int):
+    """Drop memoized analytics for a metric"""
+    with _cache_lock:
+        for key in [k for k in _cache if k[0] == metric_id]:
+            del _cache[key]
@@ -0,0 +1,123 @@
+"""
+Chronological activity feed for one initiative
+
+Notes, contacts, milestones, samples, expenses and revenue are merged into
+one timeline, newest first, ordered by (event date, kind, id) with keyset
+pagination. Each table contributes at most `limit + 1` rows past the cursor
+via its (initiative_id, date, id) index, and one UNION ALL merges those
+top-k lists, so a page costs the same however long the initiative's
+history is.
+"""
+from datetime import date
+from typing import Dict, List, Optional
+
+from sqlalchemy import Date, Float, String, and_, func, literal, or_, select, type_coerce, union_all
+from sqlalchemy.orm import Session
+
+from app.models.rd_initiative import RDNote, RDContact, RDMilestone, RDSample, RDExpense, RDRevenue
+from app.services.keyset import InvalidCursor, decode_cursor, encode_cursor
+
+COLUMNS = ["kind", "item_id", "event_date", "title", "detail", "actor", "status", "amount"]
+
+
+def _sources():
+    """(kind, model, row filter, event date, title, detail, actor, status, amount) per branch"""
+    sample_columns = (
+        func.coalesce(RDSample.recipient_company, RDSample.recipient_name), RDSample.sample_type,
+        None, RDSample.converted_to_order, RDSample.sample_cost
+    )
+    return [
+        ("contact", RDContact, None, RDContact.contact_date,
+         func.coalesce(RDContact.subject, RDContact.contact_type), RDContact.notes,
+         RDContact.utak_contact, RDContact.outcome, None),
+        ("expense", RDExpense, None, RDExpense.expense_date,
+         RDExpense.expense_category, RDExpense.expense_description,
+         RDExpense.department, None, RDExpense.amount),
+        ("milestone", RDMilestone, None,
+         func.coalesce(RDMilestone.actual_date, RDMilestone.target_date, func.date(RDMilestone.created_at)),
+         RDMilestone.milestone_name, RDMilestone.notes,
+         RDMilestone.owner, RDMilestone.status, None),
+        ("note", RDNote, None, RDNote.note_date,
+         func.coalesce(RDNote.note_category, "Note"), RDNote.note_text,
+         RDNote.author, None, None),
+        ("revenue", RDRevenue, None, RDRevenue.order_date,
+         RDRevenue.customer_name, RDRevenue.order_number,
+         None, RDRevenue.product_launched, RDRevenue.order_value),
+        # Shipped samples read straight off the ship_date index; unshipped ones fall back to when they were logged
+        ("sample", RDSample, RDSample.ship_date.isnot(None), RDSample.ship_date, *sample_columns),
+        ("sample", RDSample, RDSample.ship_date.is_(None), func.date(RDSample.created_at), *sample_columns),
+    ]
+
+
+KINDS = tuple(sorted({source[0] for source in _sources()}))
+
+
+def _before(kind: str, event_date, item_id, after: Optional[List]):
+    """Keyset condition for rows sorting after the cursor in (date, kind, id) DESC order"""
+    if after is None:
+        return None
+    cursor_date, cursor_kind, cursor_id = after
+    if kind < cursor_kind:
+        return event_date <= cursor_date
+    if kind > cursor_kind:
+        return event_date < cursor_date
+    return or_(event_date < cursor_date, and_(event_date == cursor_date, item_id < cursor_id))
+
+
+def get_feed(
+    db: Session,
+    initiative_id: int,
+    kinds: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50
+) -> Dict:
+    """One page of an initiative's merged activity timeline, newest first"""
+    after = decode_cursor(cursor, 3)
+    if after:
+        try:
+            after = [date.fromisoformat(after[0]), str(after[1]), int(after[2])]
+        except (TypeError, ValueError):
+            raise InvalidCursor("Invalid cursor")
+
+    branches = []
+    for kind, model, row_filter, event_date, title, detail, actor, status, amount in _sources():
+        if kinds and kind not in kinds:
+            continue
+        event_date = type_coerce(event_date, Date)
+        conditions = [model.initiative_id == initiative_id]
+        if row_filter is not None:
+            conditions.append(row_filter)
+        keyset = _before(kind, event_date, model.id, after)
+        if keyset is not None:
+            conditions.append(keyset)
+        # Top-k per table first; compound members need a subquery to carry their own ORDER BY/LIMIT
+        top = select(
+            literal(kind).label("kind"),
+            model.id.label("item_id"),
+            event_date.label("event_date"),
+            type_coerce(title, String).label("title"),
+            type_coerce(detail, String).label("detail"),
+            (actor if actor is not None else literal(None, String)).label("actor"),
+            (status if status is not None else literal(None, String)).label("status"),
+            (amount if amount is not None else literal(None, Float)).label("amount"),
+        ).where(*conditions).order_by(event_date.desc(), model.id.desc()).limit(limit + 1).subquery()
+        branches.append(select(*[top.c[c] for c in COLUMNS]))
+
+    if not branches:
+        return {"initiative_id": initiative_id, "count": 0, "next_cursor": None, "events": []}
+
+    events = union_all(*branches).subquery("events")
+    rows = db.execute(
+        select(*[events.c[c] for c in COLUMNS])
+        .order_by(events.c.event_date.desc(), events.c.kind.desc(), events.c.item_id.desc())
+        .limit(limit + 1)
+    ).all()
+
+    page = rows[:limit]
+    last = page[-1] if page else None
+    return {
+        "initiative_id": initiative_id,
+        "count": len(page),
+        "next_cursor": encode_cursor(last.event_date, last.kind, last.item_id) if len(rows) > limit else None,
+        "events": [dict(zip(COLUMNS, row)) for row in page],
+    }
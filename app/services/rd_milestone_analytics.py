@@ -0,0 +1,249 @@
+"""
+Portfolio milestone schedule analytics
+
+Reads every open milestone plus completed milestones targeted since a
+cutoff in one query (a UNION ALL whose halves can each range-scan the
+(status, target_date) index, so old completed history isn't read) and
+computes across all initiatives:
+
+- slip: actual minus target for completed milestones, days overdue for open ones
+- on-time rate, mean/median slip and open/overdue counts per owner and per type
+- launch drift: each initiative is assumed to keep running as late as its
+  worst overdue milestone or its latest completed one, and that slip is
+  carried onto its launch date (target_launch_date, else the launch
+  milestone's target) and compared with the plan
+- blocked chains: the earliest blocked milestone per initiative and the
+  open milestones due after it that it holds up
+"""
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import func, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.rd_initiative import RDInitiative, RDMilestone
+
+OPEN_STATUSES = ("not_started", "in_progress", "delayed", "blocked")
+LAUNCH_TYPE = "launched"
+DEFAULT_HISTORY_DAYS = 365
+
+COLUMNS = [
+    "milestone_id", "initiative_id", "initiative_name", "target_launch_date", "milestone_name",
+    "milestone_type", "target_date", "actual_date", "status", "owner", "blockers",
+]
+
+
+def load_milestones(db: Session, since: date, include_inactive: bool = False) -> pd.DataFrame:
+    """Open milestones and completed ones targeted on or after `since`"""
+    def branch(*conditions):
+        query = select(
+            RDMilestone.id,
+            RDMilestone.initiative_id,
+            RDInitiative.name,
+            RDInitiative.target_launch_date,
+            RDMilestone.milestone_name,
+            RDMilestone.milestone_type,
+            RDMilestone.target_date,
+            RDMilestone.actual_date,
+            RDMilestone.status,
+            func.coalesce(RDMilestone.owner, RDInitiative.lead_owner, "Unassigned"),
+            RDMilestone.blockers,
+        ).join(RDInitiative, RDInitiative.id == RDMilestone.initiative_id).where(*conditions)
+        if not include_inactive:
+            query = query.where(RDInitiative.is_active == "active")
+        return query
+
+    # Two branches rather than an OR so each is its own range scan on (status, target_date)
+    query = union_all(
+        branch(RDMilestone.status.in_(OPEN_STATUSES)),
+        branch(RDMilestone.status == "completed", RDMilestone.target_date >= since),
+    )
+
+    frame = pd.DataFrame(db.execute(query).all(), columns=COLUMNS)
+    for column in ("target_launch_date", "target_date", "actual_date"):
+        frame[column] = pd.to_datetime(frame[column])
+    return frame
+
+
+def _days(delta: pd.Series) -> pd.Series:
+    return delta.dt.days.astype(float)
+
+
+def _date(value) -> Optional[date]:
+    return None if pd.isna(value) else value.date()
+
+
+def _number(value, digits: int = 1):
+    return None if pd.isna(value) else round(float(value), digits)
+
+
+def add_slip(frame: pd.DataFrame, today: date) -> pd.DataFrame:
+    """Per-milestone slip, overdue and blocked columns"""
+    now = pd.Timestamp(today)
+    done = frame["status"] == "completed"
+    frame["completed"] = done
+    frame["slip_days"] = _days(frame["actual_date"] - frame["target_date"]).where(done)
+    frame["on_time"] = done & (frame["slip_days"] <= 0)
+    frame["overdue_days"] = _days(now - frame["target_date"]).where(~done & (frame["target_date"] < now))
+    frame["overdue"] = frame["overdue_days"].notna()
+    has_blockers = frame["blockers"].fillna("").str.strip() != ""
+    frame["blocked"] = ~done & ((frame["status"] == "blocked") | has_blockers)
+    return frame
+
+
+def rates_by(frame: pd.DataFrame, column: str) -> List[Dict]:
+    """On-time rate, slip and open work per value of `column`"""
+    scored = frame.assign(scored=frame["slip_days"].notna(), open=~frame["completed"])
+    grouped = scored.groupby(column)
+    stats = pd.DataFrame({
+        "completed": grouped["scored"].sum(),
+        "on_time": grouped["on_time"].sum(),
+        "mean_slip_days": grouped["slip_days"].mean(),
+        "median_slip_days": grouped["slip_days"].median(),
+        "open": grouped["open"].sum(),
+        "overdue": grouped["overdue"].sum(),
+        "blocked": grouped["blocked"].sum(),
+    })
+    rows = []
+    for key, row in stats.iterrows():
+        completed = int(row["completed"])
+        rows.append({
+            column: key,
+            "completed": completed,
+            "on_time": int(row["on_time"]),
+            "on_time_rate": round(row["on_time"] / completed * 100, 1) if completed else None,
+            "mean_slip_days": _number(row["mean_slip_days"]),
+            "median_slip_days": _number(row["median_slip_days"]),
+            "open": int(row["open"]),
+            "overdue": int(row["overdue"]),
+            "blocked": int(row["blocked"]),
+        })
+    rows.sort(key=lambda r: (r["on_time_rate"] is None, r["on_time_rate"] if r["on_time_rate"] is not None else 0))
+    return rows
+
+
+def launch_drift(frame: pd.DataFrame, today: date) -> List[Dict]:
+    """Projected launch date per initiative with the slip carried forward"""
+    now = pd.Timestamp(today)
+    by_initiative = frame.groupby("initiative_id")
+
+    # Slip of the most recently targeted completed milestone
+    completed = frame[frame["slip_days"].notna()].sort_values(["initiative_id", "target_date"])
+    latest_slip = completed.groupby("initiative_id")["slip_days"].last()
+    worst_overdue = by_initiative["overdue_days"].max()
+    running_slip = pd.concat([latest_slip, worst_overdue], axis=1).max(axis=1).clip(lower=0).fillna(0)
+
+    launch = frame[frame["milestone_type"] == LAUNCH_TYPE].sort_values("target_date").groupby("initiative_id")
+    launch_target = launch["target_date"].last()
+    launched_on = launch["actual_date"].max().where(launch["completed"].any())
+
+    initiatives = by_initiative.agg(
+        initiative_name=("initiative_name", "first"),
+        target_launch_date=("target_launch_date", "first"),
+        open=("completed", lambda done: int((~done).sum())),
+        overdue=("overdue", "sum"),
+        blocked=("blocked", "sum"),
+    )
+    initiatives["running_slip_days"] = running_slip
+    planned = initiatives["target_launch_date"].fillna(launch_target)
+    projected = planned + pd.to_timedelta(initiatives["running_slip_days"], unit="D")
+    projected = projected.where(projected.isna() | (projected >= now), now)
+    initiatives["projected_launch_date"] = launched_on.reindex(initiatives.index).fillna(projected)
+    initiatives["launched"] = launched_on.reindex(initiatives.index).notna()
+    initiatives["drift_days"] = _days(initiatives["projected_launch_date"] - planned)
+
+    rows = [
+        {
+            "initiative_id": int(initiative_id),
+            "initiative_name": row["initiative_name"],
+            "target_launch_date": _date(row["target_launch_date"]),
+            "planned_launch_date": _date(planned[initiative_id]),
+            "projected_launch_date": _date(row["projected_launch_date"]),
+            "launched": bool(row["launched"]),
+            "drift_days": _number(row["drift_days"], 0),
+            "running_slip_days": _number(row["running_slip_days"], 0),
+            "open": int(row["open"]),
+            "overdue": int(row["overdue"]),
+            "blocked": int(row["blocked"]),
+        }
+        for initiative_id, row in initiatives.iterrows()
+    ]
+    rows.sort(key=lambda r: -(r["drift_days"] or 0))
+    return rows
+
+
+def blocked_chains(frame: pd.DataFrame) -> List[Dict]:
+    """Earliest blocked milestone per initiative and the open milestones due after it"""
+    blocked = frame[frame["blocked"]].sort_values(["initiative_id", "target_date", "milestone_id"], na_position="last")
+    heads = blocked.groupby("initiative_id").head(1).set_index("initiative_id")
+    if heads.empty:
+        return []
+
+    open_rows = frame[~frame["completed"]].join(heads[["milestone_id", "target_date"]], on="initiative_id", rsuffix="_head", how="inner")
+    # Undated blockers hold up everything still open in the initiative
+    downstream = (open_rows["milestone_id"] != open_rows["milestone_id_head"]) & (
+        open_rows["target_date_head"].isna() | (open_rows["target_date"] >= open_rows["target_date_head"])
+    )
+    held = open_rows[downstream].sort_values(["initiative_id", "target_date"])
+
+    held_by_initiative: Dict[int, List[Dict]] = {}
+    for m in held[["initiative_id", "milestone_id", "milestone_name", "milestone_type", "target_date", "blocked"]].to_dict("records"):
+        held_by_initiative.setdefault(m["initiative_id"], []).append(m)
+
+    chains = []
+    for initiative_id, head in heads.iterrows():
+        chain = held_by_initiative.get(initiative_id, [])
+        chains.append({
+            "initiative_id": int(initiative_id),
+            "initiative_name": head["initiative_name"],
+            "milestone_id": int(head["milestone_id"]),
+            "milestone_name": head["milestone_name"],
+            "status": head["status"],
+            "blockers": head["blockers"],
+            "target_date": _date(head["target_date"]),
+            "overdue_days": _number(head["overdue_days"], 0),
+            "held_milestones": [
+                {"milestone_id": int(m["milestone_id"]), "milestone_name": m["milestone_name"],
+                 "target_date": _date(m["target_date"]), "blocked": bool(m["blocked"])}
+                for m in chain
+            ],
+            "launch_at_risk": head["milestone_type"] == LAUNCH_TYPE or any(m["milestone_type"] == LAUNCH_TYPE for m in chain),
+        })
+    chains.sort(key=lambda c: (-len(c["held_milestones"]), -(c["overdue_days"] or 0)))
+    return chains
+
+
+def get_milestone_analytics(
+    db: Session,
+    since: Optional[date] = None,
+    include_inactive: bool = False,
+    today: Optional[date] = None
+) -> Dict:
+    """Slip, on-time rates, launch drift and blocked chains across the portfolio"""
+    today = today or date.today()
+    since = since or today - timedelta(days=DEFAULT_HISTORY_DAYS)
+    frame = load_milestones(db, since, include_inactive=include_inactive)
+    if frame.empty:
+        return {"as_of": today, "since": since, "summary": {"milestones": 0}, "by_owner": [], "by_type": [],
+                "initiatives": [], "blocked_chains": []}
+
+    frame = add_slip(frame, today)
+    scored = int(frame["slip_days"].notna().sum())
+    return {
+        "as_of": today,
+        "since": since,
+        "summary": {
+            "milestones": len(frame),
+            "completed": int(frame["completed"].sum()),
+            "on_time_rate": round(frame["on_time"].sum() / scored * 100, 1) if scored else None,
+            "median_slip_days": _number(frame["slip_days"].median()),
+            "open": int((~frame["completed"]).sum()),
+            "overdue": int(frame["overdue"].sum()),
+            "blocked": int(frame["blocked"].sum()),
+        },
+        "by_owner": rates_by(frame, "owner"),
+        "by_type": rates_by(frame, "milestone_type"),
+        "initiatives": launch_drift(frame, today),
+        "blocked_chains": blocked_chains(frame),
+    }
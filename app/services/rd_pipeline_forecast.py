@@ -0,0 +1,283 @@
+"""
+Weighted revenue forecast for the R&D customer pipeline
+
+Each open customer interest row is expected to order with a probability set
+by its interest level, after a lag set by its interest timeline, for about
+its historical order volume. Those prior weights and lags are calibrated
+against what actually happened: interest rows linked to RDRevenue orders
+(customer_interest_id) give an observed conversion rate per level and an
+observed contact-to-order lag per timeline, blended with the priors in
+proportion to how many rows back them (a beta/normal shrinkage with
+PRIOR_STRENGTH pseudo-observations). Rows still inside their expected
+lag are left out of the observed rates rather than counted as misses.
+A converted row has usually moved on to "ordered", so it counts under the
+level it held when it converted, taken from its level history
+(rd_interest_level_transitions); one that reached "ordered" before that
+history was recorded has no known level and stays out of the open levels.
+
+Everything is read with one grouped query (interest rows left-joined to
+their order totals) and calibrated column-wise with NumPy. Results are
+memoized by a data version of the interest and revenue tables.
+"""
+import threading
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.rd_initiative import RDInitiative, RDCustomerInterest, RDInterestLevelTransition, RDRevenue
+
+# Prior probability that an interest row at each level turns into an order
+LEVEL_WEIGHTS = {
+    "interested": 0.10,
+    "highly_interested": 0.25,
+    "testing": 0.40,
+    "committed": 0.70,
+    "ordered": 0.0,
+    "not_interested": 0.0,
+}
+
+# Prior months from first contact to first order per interest timeline
+TIMELINE_MONTHS = {
+    "immediate": 0.0,
+    "30_days": 1.0,
+    "90_days": 3.0,
+    "future": 6.0,
+}
+UNKNOWN_TIMELINE = "unknown"
+UNKNOWN_TIMELINE_MONTHS = 3.0
+
+# Levels whose rows are closed and never forecast
+CLOSED_LEVELS = ("ordered", "not_interested")
+
+# Pseudo-observations the priors count for when blending with history
+PRIOR_STRENGTH = 5.0
+DEFAULT_HORIZON_MONTHS = 12
+
+# Distinct weight/timing combinations kept in memory
+CACHE_SIZE = 32
+
+_cache: Dict[Tuple, Tuple[Tuple, Dict]] = {}
+_cache_lock = threading.Lock()
+
+
+def parse_overrides(values: Optional[List[str]], known: Dict[str, float], upper: Optional[float] = None) -> Dict[str, float]:
+    """`key:value` strings on top of the defaults in `known`"""
+    merged = dict(known)
+    for value in values or []:
+        key, sep, number = value.partition(":")
+        key = key.strip()
+        if not sep or key not in known:
+            raise ValueError(f"Expected one of {', '.join(known)} as 'key:value', got '{value}'")
+        try:
+            merged[key] = float(number)
+        except ValueError:
+            raise ValueError(f"'{number}' is not a number")
+        if merged[key] < 0 or (upper is not None and merged[key] > upper):
+            raise ValueError(f"{key} is out of range")
+    return merged
+
+
+def get_data_version(db: Session) -> Tuple:
+    """(count, max id, last edit) of interest rows and orders"""
+    return tuple(
+        tuple(db.query(func.count(model.id), func.max(model.id), func.max(model.updated_at)).one())
+        for model in (RDCustomerInterest, RDRevenue)
+    )
+
+
+def load_pipeline(db: Session) -> Dict[str, np.ndarray]:
+    """Interest rows with their order totals, as columns"""
+    # The level each row held when it first moved to "ordered"
+    converted_from = select(RDInterestLevelTransition.from_level).where(
+        RDInterestLevelTransition.customer_interest_id == RDCustomerInterest.id,
+        RDInterestLevelTransition.to_level == "ordered"
+    ).order_by(
+        RDInterestLevelTransition.transitioned_at, RDInterestLevelTransition.id
+    ).limit(1).scalar_subquery()
+
+    rows = db.query(
+        RDCustomerInterest.id,
+        RDCustomerInterest.initiative_id,
+        RDInitiative.name,
+        RDCustomerInterest.interest_level,
+        RDCustomerInterest.interest_timeline,
+        RDCustomerInterest.historical_order_volume,
+        func.coalesce(RDCustomerInterest.first_contact_date, func.date(RDCustomerInterest.created_at)),
+        func.count(RDRevenue.id),
+        func.coalesce(func.sum(RDRevenue.order_value), 0.0),
+        func.min(RDRevenue.order_date),
+        converted_from,
+    ).join(
+        RDInitiative, RDInitiative.id == RDCustomerInterest.initiative_id
+    ).outerjoin(
+        RDRevenue, RDRevenue.customer_interest_id == RDCustomerInterest.id
+    ).group_by(
+        RDCustomerInterest.id, RDInitiative.name
+    ).all()
+
+    columns = list(zip(*rows)) if rows else [()] * 11
+    return {
+        "initiative_id": np.array(columns[1], dtype=np.int64),
+        "initiative_name": np.array(columns[2], dtype=object),
+        "level": np.array([level or "interested" for level in columns[3]], dtype=object),
+        "timeline": np.array([t if t in TIMELINE_MONTHS else UNKNOWN_TIMELINE for t in columns[4]], dtype=object),
+        "volume": np.array([np.nan if v is None else v for v in columns[5]], dtype=float),
+        "contacted": np.array([_as_date(d) for d in columns[6]], dtype="datetime64[D]"),
+        "orders": np.array(columns[7], dtype=np.int64),
+        "revenue": np.array(columns[8], dtype=float),
+        "first_order": np.array([_as_date(d) for d in columns[9]], dtype="datetime64[D]"),
+        "converted_from": np.array(columns[10], dtype=object),
+    }
+
+
+def _as_date(value):
+    # func.date() comes back as a string on SQLite
+    if value is None:
+        return np.datetime64("NaT")
+    return np.datetime64(str(value)[:10], "D")
+
+
+def calibrate(data: Dict[str, np.ndarray], weights: Dict[str, float], timing: Dict[str, float], today: date) -> Dict:
+    """Blend prior level weights and timeline lags with observed outcomes"""
+    converted = data["orders"] > 0
+    # An open row only counts as a miss once its expected order date has passed
+    prior_lag = np.array([timing.get(t, UNKNOWN_TIMELINE_MONTHS) for t in data["timeline"]], dtype=float)
+    age_months = (np.datetime64(today, "D") - data["contacted"]).astype(np.int64) / 30.44
+    decided = converted | (~np.isnat(data["contacted"]) & (age_months >= prior_lag))
+    # Converted rows count under the level they converted from, when it was recorded
+    at_conversion = np.where(converted & data["converted_from"].astype(bool), data["converted_from"], data["level"])
+
+    levels = {}
+    for level, prior in weights.items():
+        in_level = (at_conversion == level) & decided
+        n = int(in_level.sum())
+        hits = int((in_level & converted).sum())
+        if level in CLOSED_LEVELS:
+            probability = prior
+        else:
+            probability = (prior * PRIOR_STRENGTH + hits) / (PRIOR_STRENGTH + n)
+        levels[level] = {
+            "prior": prior,
+            "rows": n,
+            "converted": hits,
+            "observed_rate": round(hits / n, 3) if n else None,
+            "probability": round(float(probability), 3),
+        }
+
+    has_lag = converted & ~np.isnat(data["first_order"]) & ~np.isnat(data["contacted"])
+    lag_months = np.where(has_lag, (data["first_order"] - data["contacted"]).astype(np.int64), 0) / 30.44
+    lags = {}
+    for timeline, prior in {**timing, UNKNOWN_TIMELINE: timing.get(UNKNOWN_TIMELINE, UNKNOWN_TIMELINE_MONTHS)}.items():
+        observed = np.clip(lag_months[has_lag & (data["timeline"] == timeline)], 0, None)
+        n = observed.size
+        months = (prior * PRIOR_STRENGTH + observed.sum()) / (PRIOR_STRENGTH + n)
+        lags[timeline] = {
+            "prior_months": prior,
+            "orders": int(n),
+            "observed_months": round(float(observed.mean()), 1) if n else None,
+            "months": round(float(months), 1),
+        }
+
+    # Deal size when an interest row has no historical volume: what converted rows actually ordered
+    realized = data["revenue"][converted]
+    fallback_value = float(realized.mean()) if realized.size else 0.0
+    return {"levels": levels, "timing": lags, "fallback_order_value": round(fallback_value, 2)}
+
+
+def forecast(
+    data: Dict[str, np.ndarray],
+    calibration: Dict,
+    today: date,
+    horizon_months: int
+) -> Dict:
+    """Expected revenue per initiative and per month from open interest rows"""
+    probability = np.array([calibration["levels"].get(level, {}).get("probability", 0.0) for level in data["level"]])
+    lag = np.array([calibration["timing"][timeline]["months"] for timeline in data["timeline"]])
+    open_rows = (data["orders"] == 0) & ~np.isin(data["level"], CLOSED_LEVELS) & (probability > 0)
+
+    value = np.where(np.isnan(data["volume"]), calibration["fallback_order_value"], data["volume"])
+    expected = np.where(open_rows, probability * value, 0.0)
+
+    # Months from now until the expected first order; anything overdue lands in the current month
+    this_month = np.datetime64(today, "M")
+    contacted = np.where(np.isnat(data["contacted"]), np.datetime64(today, "D"), data["contacted"])
+    due = contacted.astype("datetime64[M]") + np.round(lag).astype(np.int64).astype("timedelta64[M]")
+    offset = np.clip((due - this_month).astype(np.int64), 0, None)
+    in_horizon = open_rows & (offset < horizon_months)
+
+    monthly = np.bincount(offset[in_horizon], weights=expected[in_horizon], minlength=horizon_months)
+    months = this_month + np.arange(horizon_months).astype("timedelta64[M]")
+
+    by_initiative = []
+    initiative_ids, position = np.unique(data["initiative_id"], return_inverse=True)
+    totals = np.bincount(position, weights=expected, minlength=initiative_ids.size)
+    in_window = np.bincount(position, weights=np.where(in_horizon, expected, 0.0), minlength=initiative_ids.size)
+    unweighted = np.bincount(position, weights=np.where(open_rows, value, 0.0), minlength=initiative_ids.size)
+    open_counts = np.bincount(position, weights=open_rows, minlength=initiative_ids.size)
+    booked = np.bincount(position, weights=data["revenue"], minlength=initiative_ids.size)
+    for i, initiative_id in enumerate(initiative_ids):
+        by_initiative.append({
+            "initiative_id": int(initiative_id),
+            "initiative_name": data["initiative_name"][position == i][0],
+            "open_interests": int(open_counts[i]),
+            "unweighted_pipeline": round(float(unweighted[i]), 2),
+            "expected_revenue": round(float(totals[i]), 2),
+            "expected_revenue_in_horizon": round(float(in_window[i]), 2),
+            "booked_revenue": round(float(booked[i]), 2),
+        })
+    by_initiative.sort(key=lambda row: row["expected_revenue"], reverse=True)
+
+    return {
+        "total_expected_revenue": round(float(expected.sum()), 2),
+        "expected_revenue_in_horizon": round(float(monthly.sum()), 2),
+        "open_interests": int(open_rows.sum()),
+        "by_initiative": by_initiative,
+        "by_month": [
+            {"month": str(month), "expected_revenue": round(float(amount), 2)}
+            for month, amount in zip(months, monthly)
+        ],
+    }
+
+
+def get_pipeline_forecast(
+    db: Session,
+    weights: Optional[Dict[str, float]] = None,
+    timing: Optional[Dict[str, float]] = None,
+    use_history: bool = True,
+    horizon_months: int = DEFAULT_HORIZON_MONTHS,
+    today: Optional[date] = None
+) -> Dict:
+    """Calibrated, probability-weighted revenue forecast for the R&D pipeline"""
+    today = today or date.today()
+    weights = weights or dict(LEVEL_WEIGHTS)
+    timing = timing or dict(TIMELINE_MONTHS)
+    key = (tuple(sorted(weights.items())), tuple(sorted(timing.items())), use_history, horizon_months, today)
+    version = get_data_version(db)
+
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    data = load_pipeline(db)
+    calibration = calibrate(data, weights, timing, today)
+    if not use_history:
+        # Priors only, but keep the observed order value for rows without a volume
+        empty = {name: column[:0] for name, column in data.items()}
+        calibration = {**calibrate(empty, weights, timing, today),
+                       "fallback_order_value": calibration["fallback_order_value"]}
+
+    result = {
+        "as_of": today,
+        "horizon_months": horizon_months,
+        **forecast(data, calibration, today, horizon_months),
+        "calibration": calibration,
+    }
+    with _cache_lock:
+        if len(_cache) >= CACHE_SIZE:
+            _cache.clear()
+        _cache[key] = (version, result)
+    return result
@@ -0,0 +1,191 @@
+"""
+Decision-guidance rules for the R&D portfolio
+
+Rules are data: each one names the conditions it needs on the portfolio
+frame (one row per initiative, built from its maintained RDROI row), the
+message it raises, and an optional group. Within a group only the first
+matching rule fires, which is how the ROI, stage and sample guidance pick
+a single message each. Every rule is evaluated as a boolean column over all
+initiatives at once.
+
+Results are persisted in rd_recommendations along with a fingerprint of the
+rule set and each initiative's inputs. A refresh loads the frame, hashes
+it, and evaluates and writes only the initiatives whose fingerprint moved.
+"""
+import hashlib
+import json
+import operator
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.models.rd_initiative import RDInitiative, RDROI, RDRecommendation
+
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+SEVERITIES = ("warning", "attention", "positive")
+
+RULES = [
+    {"id": "high_cost_negative_roi", "group": "roi", "severity": "warning", "icon": "⚠️",
+     "title": "High-cost, negative ROI", "action": "Consider go/no-go decision",
+     "when": [("roi", "<", 0), ("expenses", ">", 5000)]},
+    {"id": "exceptional_roi", "group": "roi", "severity": "positive", "icon": "✅",
+     "title": "Exceptional ROI", "action": "Scale up investment",
+     "when": [("roi", ">", 100)]},
+    {"id": "strong_roi", "group": "roi", "severity": "positive", "icon": "✅",
+     "title": "Strong performance", "action": "Continue current strategy",
+     "when": [("roi", ">", 25)]},
+    {"id": "high_feasibility_cost", "group": "stage", "severity": "warning", "icon": "⚠️",
+     "title": "High feasibility costs", "action": "Make launch decision soon",
+     "when": [("stage", "==", "feasibility"), ("expenses", ">", 3000)]},
+    {"id": "launched_low_revenue", "group": "stage", "severity": "attention", "icon": "📢",
+     "title": "Launched but low revenue", "action": "Increase marketing efforts",
+     "when": [("stage", "==", "launched"), ("revenue", "<", 10000)]},
+    {"id": "low_sample_conversion", "group": "samples", "severity": "warning", "icon": "⚠️",
+     "title": "Low sample conversion", "action": "Review product-market fit",
+     "when": [("samples", ">", 5), ("conversion_rate", "<", 20)]},
+    {"id": "strong_conversion", "group": "samples", "severity": "positive", "icon": "✅",
+     "title": "Strong conversion rate", "action": "Send more samples",
+     "when": [("samples", ">", 0), ("conversion_rate", ">", 50)]},
+    {"id": "high_cost_per_sample", "group": None, "severity": "attention", "icon": "💰",
+     "title": "High cost per sample", "action": "Optimize sample production",
+     "when": [("cost_per_sample", ">", 500)]},
+]
+
+INPUT_COLUMNS = ["stage", "expenses", "revenue", "roi", "samples", "conversion_rate"]
+
+# Changes whenever a rule is edited, so every initiative is re-evaluated
+RULESET_HASH = hashlib.sha1(json.dumps(RULES, sort_keys=True).encode()).hexdigest()[:16]
+
+_refresh_lock = threading.Lock()
+
+
+def load_portfolio(db: Session) -> pd.DataFrame:
+    """One row per initiative with the inputs the rules read"""
+    rows = db.query(
+        RDInitiative.id,
+        RDInitiative.stage,
+        RDROI.total_investment,
+        RDROI.total_revenue,
+        RDROI.roi_percentage,
+        RDROI.samples_sent_count,
+        RDROI.conversion_rate
+    ).outerjoin(RDROI, RDROI.initiative_id == RDInitiative.id).all()
+
+    frame = pd.DataFrame(rows, columns=["initiative_id"] + INPUT_COLUMNS)
+    numeric = INPUT_COLUMNS[1:]
+    frame[numeric] = frame[numeric].apply(pd.to_numeric).fillna(0.0).astype(float)
+    frame["stage"] = frame["stage"].fillna("")
+    return frame
+
+
+def with_derived(frame: pd.DataFrame) -> pd.DataFrame:
+    frame = frame.copy()
+    samples = frame["samples"].where(frame["samples"] > 0)
+    frame["cost_per_sample"] = frame["expenses"] / samples
+    return frame
+
+
+def fingerprint(frame: pd.DataFrame) -> pd.Series:
+    """Rule set + input hash per initiative"""
+    hashes = pd.util.hash_pandas_object(frame[INPUT_COLUMNS], index=False)
+    return hashes.map(lambda h: f"{RULESET_HASH}:{h:016x}")
+
+
+def evaluate(frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Which initiatives each rule fires for, as boolean columns in rule order"""
+    frame = with_derived(frame)
+    claimed: Dict[str, np.ndarray] = {}
+    fired = {}
+    for rule in RULES:
+        hit = np.ones(len(frame), dtype=bool)
+        for column, op, value in rule["when"]:
+            # NaN comparisons are False, so rules on undefined inputs (e.g. no samples) don't fire
+            hit &= OPERATORS[op](frame[column], value).to_numpy()
+        group = rule["group"]
+        if group:
+            taken = claimed.get(group, np.zeros(len(frame), dtype=bool))
+            hit &= ~taken
+            claimed[group] = taken | hit
+        fired[rule["id"]] = hit
+    return fired
+
+
+def _messages(fired: Dict[str, np.ndarray], position: int) -> List[Dict]:
+    return [
+        {key: rule[key] for key in ("id", "severity", "icon", "title", "action")}
+        for rule in RULES if fired[rule["id"]][position]
+    ]
+
+
+def refresh_recommendations(db: Session) -> int:
+    """Re-evaluate initiatives whose inputs or rules changed; returns how many were written"""
+    with _refresh_lock:
+        frame = load_portfolio(db)
+        if frame.empty:
+            return 0
+        frame["inputs_hash"] = fingerprint(frame).to_numpy()
+
+        stored = dict(db.query(RDRecommendation.initiative_id, RDRecommendation.inputs_hash).all())
+        changed = frame[frame["inputs_hash"] != frame["initiative_id"].map(stored)].reset_index(drop=True)
+        if changed.empty:
+            return 0
+
+        fired = evaluate(changed)
+        ids = changed["initiative_id"].tolist()
+        existing = {
+            row.initiative_id: row
+            for row in db.query(RDRecommendation).filter(RDRecommendation.initiative_id.in_(ids)).all()
+        }
+        for position, record in enumerate(changed.to_dict("records")):
+            row = existing.get(record["initiative_id"])
+            if row is None:
+                row = RDRecommendation(initiative_id=record["initiative_id"])
+                db.add(row)
+            row.inputs_hash = record["inputs_hash"]
+            row.inputs = {column: record[column] for column in INPUT_COLUMNS}
+            row.recommendations = _messages(fired, position)
+        db.commit()
+        return len(ids)
+
+
+def get_recommendations(
+    db: Session,
+    initiative_id: Optional[int] = None,
+    severity: Optional[str] = None
+) -> Dict:
+    """Persisted guidance per initiative, brought up to date first"""
+    refreshed = refresh_recommendations(db)
+
+    query = db.query(RDRecommendation, RDInitiative.name, RDInitiative.stage).join(
+        RDInitiative, RDInitiative.id == RDRecommendation.initiative_id
+    )
+    if initiative_id is not None:
+        query = query.filter(RDRecommendation.initiative_id == initiative_id)
+
+    results = []
+    for row, name, stage in query.order_by(RDRecommendation.initiative_id).all():
+        recommendations = row.recommendations or []
+        if severity:
+            recommendations = [r for r in recommendations if r["severity"] == severity]
+            if not recommendations:
+                continue
+        results.append({
+            "initiative_id": row.initiative_id,
+            "initiative_name": name,
+            "stage": stage,
+            "inputs": row.inputs,
+            "recommendations": recommendations,
+            "evaluated_at": row.evaluated_at,
+        })
+    return {"reevaluated": refreshed, "count": len(results), "initiatives": results}
@@ -0,0 +1,136 @@
+"""
+Cross-initiative follow-up queue
+
+Due dates live in four tables: customer interest follow-ups, sample
+follow-ups, contact next actions and milestone targets. The queue is one
+UNION ALL over their open items (each branch a range scan on a partial
+index covering only open rows), joined once to the initiative for its
+name, owner fallback and active flag, and ordered by (due date, kind, id)
+with keyset pagination.
+
+An owner filter is applied inside each branch: items with an owner of
+their own match on the owner index, and items without one match through
+their initiative's lead owner.
+"""
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, literal, select, text, tuple_, union_all
+from sqlalchemy.orm import Session
+
+from app.models.rd_initiative import (
+    RDInitiative, RDCustomerInterest, RDSample, RDContact, RDMilestone,
+    OPEN_CUSTOMER_FOLLOW_UP, OPEN_SAMPLE_FOLLOW_UP, OPEN_NEXT_ACTION, OPEN_MILESTONE,
+)
+from app.services.keyset import InvalidCursor, decode_cursor, encode_cursor
+
+DEFAULT_HORIZON_DAYS = 7
+
+KINDS = ("customer_follow_up", "milestone", "next_action", "sample_follow_up")
+
+
+def _branches(due_before: date, due_from: Optional[date], kinds: Optional[List[str]], owner: Optional[str]):
+    """One SELECT per source over its open items due on or before `due_before`"""
+    owner_key = owner.strip().lower() if owner else None
+    led_initiatives = select(RDInitiative.id).where(func.lower(RDInitiative.lead_owner) == owner_key)
+    sources = [
+        ("customer_follow_up", RDCustomerInterest, RDCustomerInterest.next_follow_up_date, OPEN_CUSTOMER_FOLLOW_UP,
+         RDCustomerInterest.customer_name, RDCustomerInterest.contact_person, RDCustomerInterest.interest_level,
+         None),
+        ("sample_follow_up", RDSample, RDSample.follow_up_date, OPEN_SAMPLE_FOLLOW_UP,
+         func.coalesce(RDSample.recipient_company, RDSample.recipient_name), RDSample.sample_type,
+         RDSample.feedback_received, None),
+        ("next_action", RDContact, RDContact.next_action_date, OPEN_NEXT_ACTION,
+         func.coalesce(RDContact.subject, RDContact.contact_type), RDContact.next_action, RDContact.outcome,
+         func.coalesce(RDContact.next_action_owner, RDContact.utak_contact)),
+        ("milestone", RDMilestone, RDMilestone.target_date, OPEN_MILESTONE,
+         RDMilestone.milestone_name, RDMilestone.milestone_type, RDMilestone.status, RDMilestone.owner),
+    ]
+    for kind, model, due, open_predicate, title, detail, status, owner in sources:
+        if kinds and kind not in kinds:
+            continue
+        conditions = [text(open_predicate), due <= due_before]
+        if due_from is not None:
+            conditions.append(due >= due_from)
+        branch = select(
+            literal(kind).label("kind"),
+            model.id.label("item_id"),
+            model.initiative_id.label("initiative_id"),
+            due.label("due_date"),
+            title.label("title"),
+            detail.label("detail"),
+            status.label("status"),
+            (owner if owner is not None else literal(None)).label("owner"),
+        ).where(*conditions)
+
+        if owner_key is None:
+            yield branch
+            continue
+        if owner is not None:
+            yield branch.where(func.lower(owner) == owner_key)
+            branch = branch.where(owner.is_(None))
+        yield branch.where(model.initiative_id.in_(led_initiatives))
+
+
+def get_queue(
+    db: Session,
+    owner: Optional[str] = None,
+    due_before: Optional[date] = None,
+    kinds: Optional[List[str]] = None,
+    include_inactive: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    today: Optional[date] = None
+) -> Dict:
+    """Due and overdue open items across all initiatives, earliest first"""
+    today = today or date.today()
+    due_before = due_before or today + timedelta(days=DEFAULT_HORIZON_DAYS)
+    after = decode_cursor(cursor, 3)
+    try:
+        after_date = date.fromisoformat(after[0]) if after else None
+    except (TypeError, ValueError):
+        raise InvalidCursor("Invalid cursor")
+
+    items = union_all(*_branches(due_before, after_date, kinds, owner)).subquery("items")
+
+    item_owner = func.coalesce(items.c.owner, RDInitiative.lead_owner)
+    query = select(
+        items.c.kind, items.c.item_id, items.c.initiative_id, RDInitiative.name,
+        items.c.due_date, items.c.title, items.c.detail, items.c.status, item_owner
+    ).join(RDInitiative, RDInitiative.id == items.c.initiative_id)
+
+    if not include_inactive:
+        query = query.where(RDInitiative.is_active == "active")
+    if after:
+        query = query.where(
+            tuple_(items.c.due_date, items.c.kind, items.c.item_id) > tuple_(after_date, after[1], after[2])
+        )
+    query = query.order_by(items.c.due_date, items.c.kind, items.c.item_id).limit(limit + 1)
+
+    rows = db.execute(query).all()
+    page = rows[:limit]
+    results = [
+        {
+            "kind": kind,
+            "item_id": item_id,
+            "initiative_id": initiative_id,
+            "initiative_name": initiative_name,
+            "due_date": due,
+            "title": title,
+            "detail": detail,
+            "status": status,
+            "owner": item_owner_value,
+            "overdue": due < today,
+            "days_overdue": max((today - due).days, 0),
+        }
+        for kind, item_id, initiative_id, initiative_name, due, title, detail, status, item_owner_value in page
+    ]
+
+    last = page[-1] if page else None
+    return {
+        "due_before": due_before,
+        "count": len(results),
+        "overdue_count": sum(1 for r in results if r["overdue"]),
+        "next_cursor": encode_cursor(last.due_date, last.kind, last.item_id) if len(rows) > limit else None,
+        "items": results,
+    }
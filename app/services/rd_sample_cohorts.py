@@ -0,0 +1,167 @@
+"""
+Sample-to-order conversion cohorts
+
+Shipped samples are grouped into cohorts by ship month, sample type and/or
+initiative. For each cohort this reports:
+
+- a conversion curve: share of samples that had converted N days after
+  shipping, for each N in CURVE_DAYS. Only samples shipped at least N days
+  ago count toward the N-day point, so recent cohorts aren't understated.
+- median days from ship to order among converted samples
+- revenue per sample dollar: converted order value over sample + shipping cost
+
+Everything comes from one query over rd_samples and is aggregated with a
+single pandas groupby.
+"""
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import String, select, type_coerce
+from sqlalchemy.orm import Session
+
+from app.models.rd_initiative import RDInitiative, RDSample
+
+CURVE_DAYS = (7, 14, 30, 60, 90, 180, 365)
+
+# group_by dimension -> frame column(s)
+DIMENSIONS = {
+    "month": ["ship_month"],
+    "sample_type": ["sample_type"],
+    "initiative": ["initiative_id", "initiative_name"],
+}
+
+
+def load_samples(
+    db: Session,
+    initiative_id: Optional[int] = None,
+    sample_type: Optional[str] = None,
+    shipped_from: Optional[date] = None,
+    shipped_to: Optional[date] = None
+) -> pd.DataFrame:
+    """Shipped samples with their outcome columns"""
+    # Dates come back raw and are parsed column-wise below, not row by row by the Date type
+    query = select(
+        RDSample.initiative_id,
+        RDInitiative.name,
+        RDSample.sample_type,
+        type_coerce(RDSample.ship_date, String),
+        RDSample.feedback_received,
+        RDSample.converted_to_order,
+        RDSample.order_value,
+        type_coerce(RDSample.order_date, String),
+        RDSample.sample_cost,
+        RDSample.shipping_cost,
+    ).join(RDInitiative, RDInitiative.id == RDSample.initiative_id).where(RDSample.ship_date.isnot(None))
+    if initiative_id is not None:
+        query = query.where(RDSample.initiative_id == initiative_id)
+    if sample_type:
+        query = query.where(RDSample.sample_type == sample_type)
+    if shipped_from:
+        query = query.where(RDSample.ship_date >= shipped_from)
+    if shipped_to:
+        query = query.where(RDSample.ship_date <= shipped_to)
+
+    return pd.DataFrame(db.connection().execute(query).all(), columns=[
+        "initiative_id", "initiative_name", "sample_type", "ship_date", "feedback_received",
+        "converted_to_order", "order_value", "order_date", "sample_cost", "shipping_cost",
+    ])
+
+
+def prepare(frame: pd.DataFrame, today: date) -> pd.DataFrame:
+    """Add the per-sample outcome columns the cohort aggregation sums"""
+    shipped = pd.to_datetime(frame["ship_date"])
+    ordered = pd.to_datetime(frame["order_date"])
+    converted = (frame["converted_to_order"] == "yes").to_numpy()
+
+    age = (pd.Timestamp(today) - shipped).dt.days.to_numpy()
+    days_to_order = (ordered - shipped).dt.days.clip(lower=0).to_numpy(dtype=float)
+    # Converted without an order date: counts as converted, but not on the curve or in the median
+    days_to_order = np.where(converted, days_to_order, np.nan)
+
+    prepared = pd.DataFrame({
+        "ship_month": shipped.dt.to_period("M").astype(str).to_numpy(),
+        "sample_type": frame["sample_type"].to_numpy(),
+        "initiative_id": frame["initiative_id"].to_numpy(),
+        "initiative_name": frame["initiative_name"].to_numpy(),
+        "samples": 1,
+        "converted": converted.astype(int),
+        "feedback": (frame["feedback_received"] == "yes").to_numpy().astype(int),
+        "days_to_order": days_to_order,
+        "revenue": np.where(converted, frame["order_value"].fillna(0.0).to_numpy(dtype=float), 0.0),
+        "cost": (frame["sample_cost"].fillna(0.0) + frame["shipping_cost"].fillna(0.0)).to_numpy(dtype=float),
+    })
+    for days in CURVE_DAYS:
+        eligible = age >= days
+        prepared[f"eligible_{days}"] = eligible.astype(int)
+        prepared[f"hit_{days}"] = (eligible & (days_to_order <= days)).astype(int)
+    return prepared
+
+
+def summarize(groups: pd.DataFrame) -> List[Dict]:
+    """Cohort rows from summed/median columns"""
+    rows = []
+    for record in groups.to_dict("records"):
+        samples = record["samples"]
+        cost = record["cost"]
+        curve = []
+        for days in CURVE_DAYS:
+            eligible = record[f"eligible_{days}"]
+            curve.append({
+                "days": days,
+                "eligible": int(eligible),
+                "conversion_rate": round(record[f"hit_{days}"] / eligible * 100, 1) if eligible else None,
+            })
+        median = record["median_days_to_order"]
+        rows.append({
+            **{key: record[key] for key in record if key in ("ship_month", "sample_type", "initiative_id", "initiative_name")},
+            "samples": int(samples),
+            "converted": int(record["converted"]),
+            "conversion_rate": round(record["converted"] / samples * 100, 1) if samples else None,
+            "feedback_rate": round(record["feedback"] / samples * 100, 1) if samples else None,
+            "median_days_to_order": None if pd.isna(median) else float(median),
+            "revenue": round(float(record["revenue"]), 2),
+            "sample_cost": round(float(cost), 2),
+            "revenue_per_sample_dollar": round(float(record["revenue"] / cost), 2) if cost else None,
+            "curve": curve,
+        })
+    return rows
+
+
+def get_sample_cohorts(
+    db: Session,
+    group_by: Optional[List[str]] = None,
+    initiative_id: Optional[int] = None,
+    sample_type: Optional[str] = None,
+    shipped_from: Optional[date] = None,
+    shipped_to: Optional[date] = None,
+    today: Optional[date] = None
+) -> Dict:
+    """Conversion curves, time to order and return on sample spend per cohort"""
+    today = today or date.today()
+    # Repeating a dimension would group by the same columns twice
+    group_by = list(dict.fromkeys(group_by or ["month"]))
+    keys = [column for dimension in group_by for column in DIMENSIONS[dimension]]
+
+    prepared = prepare(load_samples(db, initiative_id, sample_type, shipped_from, shipped_to), today)
+    summed = [c for c in prepared.columns if c not in DIMENSIONS["month"] + DIMENSIONS["sample_type"]
+              + DIMENSIONS["initiative"] + ["days_to_order"]]
+
+    if prepared.empty:
+        cohorts = []
+    else:
+        grouped = prepared.groupby(keys, sort=True)
+        groups = grouped[summed].sum()
+        groups["median_days_to_order"] = grouped["days_to_order"].median()
+        cohorts = summarize(groups.reset_index())
+
+    totals = prepared[summed].sum().to_dict() if not prepared.empty else {c: 0 for c in summed}
+    totals["median_days_to_order"] = prepared["days_to_order"].median() if not prepared.empty else np.nan
+    return {
+        "as_of": today,
+        "group_by": group_by,
+        "curve_days": list(CURVE_DAYS),
+        "overall": summarize(pd.DataFrame([totals]))[0],
+        "cohorts": cohorts,
+    }
@@ -0,0 +1,268 @@
+"""
+Full-text search across R&D free text
+
+Notes, contacts, customer interest, feasibility reviews and samples are
+indexed into one inverted index, rd_search_index, with a document per
+source row (a short title plus its free-text fields):
+
+- SQLite: an FTS5 virtual table (porter stemming), ranked with bm25()
+- PostgreSQL: a table with a generated tsvector column and a GIN index,
+  ranked with ts_rank_cd() and highlighted with ts_headline()
+
+Mapper events keep the index in sync inside the same flush as the write
+that changed the row, so the index commits or rolls back with it.
+rebuild_search_index() repopulates it from scratch.
+
+On any other database search is turned off: startup logs a warning, writes
+skip the index and search() raises SearchUnavailableError.
+"""
+import logging
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.models.rd_initiative import RDInitiative, RDNote, RDContact, RDCustomerInterest, RDFeasibility, RDSample
+
+INDEX_TABLE = "rd_search_index"
+
+logger = logging.getLogger(__name__)
+
+HIGHLIGHT_START, HIGHLIGHT_END = "**", "**"
+SNIPPET_WORDS = 16
+
+# source name -> (model, title builder, searchable text fields)
+SOURCES = {
+    "note": (RDNote, lambda r: r.note_category or "Note", ["note_text"]),
+    "contact": (RDContact, lambda r: r.subject or r.contact_type, ["subject", "notes", "next_action"]),
+    "customer_interest": (RDCustomerInterest, lambda r: r.customer_name, ["notes"]),
+    "feasibility": (RDFeasibility, lambda r: "Feasibility review", ["feasibility_notes"]),
+    "sample": (RDSample, lambda r: r.recipient_company or r.recipient_name, ["feedback_notes"]),
+}
+SOURCE_CODES = {name: code for code, name in enumerate(SOURCES)}
+
+
+def _doc_id(source: str, source_id: int) -> int:
+    """Stable document key, so a source row maps to exactly one index row"""
+    return source_id * len(SOURCES) + SOURCE_CODES[source]
+
+
+class SearchUnavailableError(RuntimeError):
+    """Raised when the database has no full-text search backend"""
+
+
+def _dialect(bind) -> str:
+    return bind.dialect.name
+
+
+def _supported(bind) -> bool:
+    return _dialect(bind) in ("sqlite", "postgresql")
+
+
+# ==================== SCHEMA ====================
+
+def ensure_search_index(engine: Engine):
+    """Create the index table for the current dialect if it doesn't exist"""
+    if not _supported(engine):
+        logger.warning("Full-text search is not supported on %s; R&D search is disabled", _dialect(engine))
+        return
+    with engine.begin() as conn:
+        if _dialect(conn) == "sqlite":
+            conn.execute(text(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {INDEX_TABLE} USING fts5(
+                    title, body,
+                    source UNINDEXED, source_id UNINDEXED, initiative_id UNINDEXED,
+                    tokenize = 'porter unicode61'
+                )
+            """))
+        elif _dialect(conn) == "postgresql":
+            conn.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS {INDEX_TABLE} (
+                    doc_id BIGINT PRIMARY KEY,
+                    source VARCHAR(32) NOT NULL,
+                    source_id INTEGER NOT NULL,
+                    initiative_id INTEGER NOT NULL,
+                    title TEXT,
+                    body TEXT,
+                    document TSVECTOR GENERATED ALWAYS AS (
+                        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                        setweight(to_tsvector('english', coalesce(body, '')), 'B')
+                    ) STORED
+                )
+            """))
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{INDEX_TABLE}_document ON {INDEX_TABLE} USING GIN (document)"
+            ))
+
+
+# ==================== SYNC ====================
+
+def _document(source: str, row) -> Optional[Dict]:
+    _, title, fields = SOURCES[source]
+    body = "\n".join(getattr(row, f) for f in fields if getattr(row, f))
+    if not body and source == "feasibility":
+        return None
+    return {
+        "doc_id": _doc_id(source, row.id),
+        "source": source,
+        "source_id": row.id,
+        "initiative_id": row.initiative_id,
+        "title": title(row) or "",
+        "body": body,
+    }
+
+
+def _remove(conn: Connection, source: str, source_id: int):
+    key = "rowid" if _dialect(conn) == "sqlite" else "doc_id"
+    conn.execute(text(f"DELETE FROM {INDEX_TABLE} WHERE {key} = :doc_id"), {"doc_id": _doc_id(source, source_id)})
+
+
+def _write(conn: Connection, documents):
+    """Insert one document (dict) or many (list of dicts)"""
+    key = "rowid" if _dialect(conn) == "sqlite" else "doc_id"
+    conn.execute(text(f"""
+        INSERT INTO {INDEX_TABLE} ({key}, source, source_id, initiative_id, title, body)
+        VALUES (:doc_id, :source, :source_id, :initiative_id, :title, :body)
+    """), documents)
+
+
+def _listen(source: str):
+    model, _, fields = SOURCES[source]
+    watched = set(fields) | {"initiative_id", "note_category", "contact_type", "customer_name",
+                             "recipient_company", "recipient_name"}
+
+    @event.listens_for(model, "after_insert")
+    def index_row(mapper, conn, row):
+        if not _supported(conn):
+            return
+        document = _document(source, row)
+        if document:
+            _write(conn, document)
+
+    @event.listens_for(model, "after_update")
+    def reindex_row(mapper, conn, row):
+        if not _supported(conn):
+            return
+        state = inspect(row)
+        if not any(state.attrs[f].history.has_changes() for f in watched if f in state.attrs):
+            return
+        _remove(conn, source, row.id)
+        document = _document(source, row)
+        if document:
+            _write(conn, document)
+
+    @event.listens_for(model, "after_delete")
+    def unindex_row(mapper, conn, row):
+        if _supported(conn):
+            _remove(conn, source, row.id)
+
+
+for _source in SOURCES:
+    _listen(_source)
+
+
+@event.listens_for(RDInitiative, "after_delete")
+def unindex_initiative(mapper, conn, row):
+    # Child rows go by ON DELETE CASCADE without loading, so their own after_delete never fires
+    if _supported(conn):
+        conn.execute(text(f"DELETE FROM {INDEX_TABLE} WHERE initiative_id = :initiative_id"), {"initiative_id": row.id})
+
+
+def rebuild_search_index(db: Session) -> Dict[str, int]:
+    """Repopulate the index from every source table; returns documents per source"""
+    if not _supported(db.get_bind()):
+        return {}
+    conn = db.connection()
+    conn.execute(text(f"DELETE FROM {INDEX_TABLE}"))
+    counts = {}
+    for source, (model, _, _) in SOURCES.items():
+        documents = [d for d in (_document(source, row) for row in db.query(model).yield_per(1000)) if d]
+        if documents:
+            _write(conn, documents)
+        counts[source] = len(documents)
+    db.commit()
+    return counts
+
+
+# ==================== SEARCH ====================
+
+def _fts5_query(q: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix"""
+    terms = re.findall(r"\w+", q)
+    if not terms:
+        return ""
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search(
+    db: Session,
+    q: str,
+    initiative_id: Optional[int] = None,
+    sources: Optional[List[str]] = None,
+    limit: int = 20
+) -> List[Dict]:
+    """Ranked hits (best first) with highlighted snippets"""
+    dialect = _dialect(db.get_bind())
+    # FTS5 functions and MATCH need the real table name, not an alias
+    s = INDEX_TABLE if dialect == "sqlite" else "s"
+
+    params = {"limit": limit, "initiative_id": initiative_id}
+    filters = []
+    if initiative_id is not None:
+        filters.append(f"{s}.initiative_id = :initiative_id")
+    if sources:
+        names = ", ".join(f":source_{i}" for i in range(len(sources)))
+        filters.append(f"{s}.source IN ({names})")
+        params.update({f"source_{i}": source for i, source in enumerate(sources)})
+    extra = "".join(f" AND {f}" for f in filters)
+
+    if dialect == "sqlite":
+        params["q"] = _fts5_query(q)
+        if not params["q"]:
+            return []
+        sql = f"""
+            SELECT {s}.source, {s}.source_id, {s}.initiative_id, i.name, {s}.title,
+                   snippet({s}, -1, :start, :end, '…', {SNIPPET_WORDS}),
+                   -bm25({s}, 2.0, 1.0) AS score
+            FROM {s}
+            JOIN rd_initiatives i ON i.id = {s}.initiative_id
+            WHERE {s} MATCH :q{extra}
+            ORDER BY bm25({s}, 2.0, 1.0)
+            LIMIT :limit
+        """
+    elif dialect == "postgresql":
+        params["q"] = q
+        sql = f"""
+            SELECT s.source, s.source_id, s.initiative_id, i.name, s.title,
+                   ts_headline('english', coalesce(s.body, ''), query,
+                               'StartSel=' || :start || ', StopSel=' || :end ||
+                               ', MaxWords={SNIPPET_WORDS}, MinWords=5'),
+                   ts_rank_cd(s.document, query) AS score
+            FROM {INDEX_TABLE} s
+            JOIN rd_initiatives i ON i.id = s.initiative_id,
+                 websearch_to_tsquery('english', :q) query
+            WHERE s.document @@ query{extra}
+            ORDER BY score DESC
+            LIMIT :limit
+        """
+    else:
+        raise SearchUnavailableError(f"Full-text search is not supported on {dialect}")
+
+    params.update(start=HIGHLIGHT_START, end=HIGHLIGHT_END)
+    rows = db.execute(text(sql), params).all()
+    return [
+        {
+            "source": source,
+            "source_id": source_id,
+            "initiative_id": initiative,
+            "initiative_name": name,
+            "title": title,
+            "snippet": snippet,
+            "score": round(float(score), 6),
+        }
+        for source, source_id, initiative, name, title, snippet, score in rows
+    ]
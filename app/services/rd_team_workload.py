@@ -0,0 +1,168 @@
+"""
+R&D team workload across initiatives
+
+One statement joins every team assignment to its initiative and to open
+milestone counts, which are grouped once by (initiative, owner) and rolled
+up per initiative. Each cell of the person x initiative matrix therefore
+carries the person's role weight, the initiative's open/overdue/due-soon
+milestones and the ones the person owns. People and initiatives are then
+summed from the cells with pandas; the returned matrix is sparse (one cell
+per person and initiative, people keyed by their lower-cased trimmed name)
+with initiative-level counts listed once per initiative.
+"""
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+import pandas as pd
+from sqlalchemy import Integer, case, cast, func, select, text
+from sqlalchemy.orm import Session
+
+from app.models.rd_initiative import RDInitiative, RDInitiativeTeam, RDMilestone, OPEN_MILESTONE
+
+# Share of a person's attention an assignment takes, by role
+ROLE_WEIGHTS = {
+    "lead": 1.0,
+    "support": 0.5,
+    "reviewer": 0.25,
+    "stakeholder": 0.1,
+}
+DEFAULT_ROLE_WEIGHT = 0.5
+DEFAULT_DUE_WITHIN_DAYS = 14
+
+CELL_COLUMNS = [
+    "person_name", "person_key", "department", "role", "weight",
+    "initiative_id", "initiative_name", "stage", "priority",
+    "open_milestones", "overdue", "due_soon", "owned_open", "owned_overdue",
+]
+COUNT_COLUMNS = ["open_milestones", "overdue", "due_soon", "owned_open", "owned_overdue"]
+MATRIX_COLUMNS = ["person_key", "person_name", "initiative_id", "department", "role", "weight", "owned_open", "owned_overdue"]
+
+
+def _person_key(column):
+    return func.lower(func.trim(column))
+
+
+def load_cells(
+    db: Session,
+    today: date,
+    due_within_days: int,
+    department: Optional[str] = None,
+    person: Optional[str] = None,
+    include_inactive: bool = False
+) -> pd.DataFrame:
+    """One row per assignment with its role weight and due-item counts"""
+    due_soon_by = today + timedelta(days=due_within_days)
+    owner_key = _person_key(RDMilestone.owner)
+    by_owner = select(
+        RDMilestone.initiative_id.label("initiative_id"),
+        owner_key.label("owner_key"),
+        func.count().label("open_milestones"),
+        func.sum(cast(RDMilestone.target_date < today, Integer)).label("overdue"),
+        func.sum(cast(RDMilestone.target_date.between(today, due_soon_by), Integer)).label("due_soon"),
+    ).where(text(OPEN_MILESTONE)).group_by(RDMilestone.initiative_id, owner_key).cte("open_by_owner")
+
+    by_initiative = select(
+        by_owner.c.initiative_id,
+        func.sum(by_owner.c.open_milestones).label("open_milestones"),
+        func.sum(by_owner.c.overdue).label("overdue"),
+        func.sum(by_owner.c.due_soon).label("due_soon"),
+    ).group_by(by_owner.c.initiative_id).subquery("open_by_initiative")
+
+    person_key = _person_key(RDInitiativeTeam.person_name)
+    role_key = func.lower(func.trim(RDInitiativeTeam.role))
+    weight = case(
+        *[(role_key == role, value) for role, value in ROLE_WEIGHTS.items()],
+        else_=DEFAULT_ROLE_WEIGHT
+    )
+    query = select(
+        RDInitiativeTeam.person_name,
+        person_key,
+        RDInitiativeTeam.department,
+        RDInitiativeTeam.role,
+        weight,
+        RDInitiative.id,
+        RDInitiative.name,
+        RDInitiative.stage,
+        RDInitiative.priority,
+        func.coalesce(by_initiative.c.open_milestones, 0),
+        func.coalesce(by_initiative.c.overdue, 0),
+        func.coalesce(by_initiative.c.due_soon, 0),
+        func.coalesce(by_owner.c.open_milestones, 0),
+        func.coalesce(by_owner.c.overdue, 0),
+    ).join(
+        RDInitiative, RDInitiative.id == RDInitiativeTeam.initiative_id
+    ).outerjoin(
+        by_initiative, by_initiative.c.initiative_id == RDInitiativeTeam.initiative_id
+    ).outerjoin(
+        by_owner,
+        (by_owner.c.initiative_id == RDInitiativeTeam.initiative_id) & (by_owner.c.owner_key == person_key)
+    )
+    if department:
+        query = query.where(RDInitiativeTeam.department == department)
+    if person:
+        query = query.where(person_key == person.strip().lower())
+    if not include_inactive:
+        query = query.where(RDInitiative.is_active == "active")
+
+    cells = pd.DataFrame(db.execute(query).all(), columns=CELL_COLUMNS)
+    cells[COUNT_COLUMNS] = cells[COUNT_COLUMNS].fillna(0).astype(int)
+    cells["weight"] = cells["weight"].astype(float)
+    return cells
+
+
+def get_workload(
+    db: Session,
+    department: Optional[str] = None,
+    person: Optional[str] = None,
+    due_within_days: int = DEFAULT_DUE_WITHIN_DAYS,
+    include_inactive: bool = False,
+    today: Optional[date] = None
+) -> Dict:
+    """Person x initiative allocation matrix with per-person and per-initiative totals"""
+    today = today or date.today()
+    cells = load_cells(db, today, due_within_days, department, person, include_inactive)
+    result = {"as_of": today, "due_within_days": due_within_days, "people": [], "initiatives": [], "matrix": []}
+    if cells.empty:
+        return result
+
+    # Someone on the same initiative under two departments counts once, at their heaviest role
+    assignments = cells.sort_values("weight", ascending=False).drop_duplicates(["person_key", "initiative_id"])
+    assignments = assignments.assign(lead=(assignments["weight"] >= ROLE_WEIGHTS["lead"]).astype(int))
+    people = assignments.groupby("person_key").agg(
+        person_name=("person_name", "first"),
+        initiatives=("initiative_id", "size"),
+        weighted_load=("weight", "sum"),
+        lead_roles=("lead", "sum"),
+        open_milestones=("open_milestones", "sum"),
+        overdue=("overdue", "sum"),
+        due_soon=("due_soon", "sum"),
+        owned_open=("owned_open", "sum"),
+        owned_overdue=("owned_overdue", "sum"),
+    )
+    people["departments"] = cells.groupby("person_key")["department"].unique().map(sorted)
+    people = people.sort_values(["weighted_load", "owned_overdue"], ascending=False)
+
+    initiatives = assignments.groupby("initiative_id").agg(
+        initiative_name=("initiative_name", "first"),
+        stage=("stage", "first"),
+        priority=("priority", "first"),
+        team_size=("person_key", "size"),
+        weighted_staffing=("weight", "sum"),
+        open_milestones=("open_milestones", "first"),
+        overdue=("overdue", "first"),
+        due_soon=("due_soon", "first"),
+    ).sort_values("weighted_staffing")
+
+    result["people"] = [
+        {**row, "weighted_load": round(row["weighted_load"], 2)}
+        for row in people.reset_index().to_dict("records")
+    ]
+    result["initiatives"] = [
+        {**row, "weighted_staffing": round(row["weighted_staffing"], 2)}
+        for row in initiatives.reset_index().to_dict("records")
+    ]
+    # Initiative-level counts live in "initiatives"; cells carry only what is specific to the person,
+    # under the same display name as their entry in "people"
+    matrix = assignments.assign(person_name=assignments["person_key"].map(people["person_name"]))
+    result["matrix"] = matrix[MATRIX_COLUMNS].sort_values(["person_key", "initiative_id"]).to_dict("records")
+    return result
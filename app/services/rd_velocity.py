@@ -0,0 +1,163 @@
+"""
+R&D pipeline velocity from the stage transition history
+
+Every stage change is a row in rd_stage_transitions, so each row opens a
+stay in its to_stage that lasts until the initiative's next transition
+(or until now, for the current stage). From one sorted frame of all
+transitions this computes, column-wise:
+
+- time in stage: distribution of completed stays per stage, plus how many
+  initiatives are sitting in each stage now and for how long
+- conversion: share of initiatives reaching each pipeline stage that went
+  on to reach a later one, and where initiatives leave each stage for
+- throughput: transitions into each stage per calendar quarter
+
+Results are memoized by the transition table's (count, max id), so they
+are recomputed only after the next transition.
+"""
+import threading
+from datetime import date
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.rd_initiative import RDStageTransition
+
+PIPELINE = ["feasibility", "validation", "development", "launch_prep", "launched"]
+PERCENTILES = (25, 50, 75, 90)
+
+_cache: Dict[date, Tuple[Tuple, Dict]] = {}
+_cache_lock = threading.Lock()
+
+
+def get_data_version(db: Session) -> Tuple:
+    return tuple(db.query(func.count(RDStageTransition.id), func.max(RDStageTransition.id)).one())
+
+
+def load_transitions(db: Session) -> pd.DataFrame:
+    """Every transition, ordered within each initiative"""
+    rows = db.query(
+        RDStageTransition.initiative_id,
+        RDStageTransition.from_stage,
+        RDStageTransition.to_stage,
+        RDStageTransition.transitioned_at
+    ).order_by(
+        RDStageTransition.initiative_id, RDStageTransition.transitioned_at, RDStageTransition.id
+    ).all()
+    frame = pd.DataFrame(rows, columns=["initiative_id", "from_stage", "to_stage", "at"])
+    frame["at"] = pd.to_datetime(frame["at"], utc=True)
+    return frame
+
+
+def _stays(transitions: pd.DataFrame, now: pd.Timestamp) -> pd.DataFrame:
+    """One row per stay in a stage, with its length in days"""
+    initiative = transitions["initiative_id"].to_numpy()
+    at = transitions["at"]
+    same_initiative = np.append(initiative[1:] == initiative[:-1], False)
+    ended = at.shift(-1).where(same_initiative)
+
+    stays = transitions[["initiative_id", "to_stage", "at"]].rename(columns={"to_stage": "stage"})
+    stays["completed"] = ended.notna().to_numpy()
+    stays["days"] = (ended.fillna(now) - at).dt.total_seconds().to_numpy() / 86400
+    return stays
+
+
+def time_in_stage(stays: pd.DataFrame) -> Dict[str, Dict]:
+    done = stays[stays["completed"]]
+    current = stays[~stays["completed"]]
+    q = np.array(PERCENTILES) / 100
+
+    completed_stats = done.groupby("stage")["days"].agg(["count", "mean"])
+    quantiles = done.groupby("stage")["days"].quantile(q).unstack() if len(done) else pd.DataFrame()
+    current_stats = current.groupby("stage")["days"].agg(["count", "median"])
+
+    result = {}
+    seen = set(stays["stage"])
+    for stage in [s for s in PIPELINE if s in seen] + sorted(seen - set(PIPELINE)):
+        entry = {"completed_stays": 0, "mean_days": None, **{f"p{p}_days": None for p in PERCENTILES},
+                 "current_count": 0, "current_median_days": None}
+        if stage in completed_stats.index:
+            entry["completed_stays"] = int(completed_stats.at[stage, "count"])
+            entry["mean_days"] = round(float(completed_stats.at[stage, "mean"]), 1)
+            for p, value in zip(PERCENTILES, quantiles.loc[stage].to_numpy()):
+                entry[f"p{p}_days"] = round(float(value), 1)
+        if stage in current_stats.index:
+            entry["current_count"] = int(current_stats.at[stage, "count"])
+            entry["current_median_days"] = round(float(current_stats.at[stage, "median"]), 1)
+        result[stage] = entry
+    return result
+
+
+def conversion(transitions: pd.DataFrame) -> Dict:
+    """Funnel conversion between pipeline stages and exit destinations per stage"""
+    rank = transitions["to_stage"].map({s: i for i, s in enumerate(PIPELINE)})
+    furthest = rank.groupby(transitions["initiative_id"]).max().dropna().astype(int).to_numpy()
+
+    # Initiatives can skip stages, so "reached" means got at least this far
+    reached = np.array([(furthest >= i).sum() for i in range(len(PIPELINE))])
+    funnel = []
+    for i, stage in enumerate(PIPELINE):
+        entry = {"stage": stage, "reached": int(reached[i])}
+        if i + 1 < len(PIPELINE):
+            entry["advanced"] = int(reached[i + 1])
+            entry["conversion_rate"] = round(float(reached[i + 1] / reached[i] * 100), 1) if reached[i] else None
+        funnel.append(entry)
+
+    moves = transitions.dropna(subset=["from_stage"])
+    exits = (
+        moves.groupby(["from_stage", "to_stage"]).size().unstack(fill_value=0)
+        if len(moves) else pd.DataFrame()
+    )
+    return {
+        "funnel": funnel,
+        "exits": {
+            stage: {to: int(n) for to, n in row.items() if n}
+            for stage, row in exits.iterrows()
+        },
+    }
+
+
+def throughput(transitions: pd.DataFrame) -> Dict[str, Dict[str, int]]:
+    """Transitions into each stage per quarter (initial stages excluded)"""
+    moves = transitions.dropna(subset=["from_stage"])
+    if moves.empty:
+        return {}
+    quarter = moves["at"].dt.tz_localize(None).dt.to_period("Q").astype(str)
+    counts = moves.groupby([quarter, moves["to_stage"]]).size().unstack(fill_value=0).sort_index()
+    return {q: {stage: int(n) for stage, n in row.items() if n} for q, row in counts.iterrows()}
+
+
+def compute_velocity(db: Session) -> Dict:
+    transitions = load_transitions(db)
+    now = pd.Timestamp.now(tz="UTC")
+    if transitions.empty:
+        return {"initiatives": 0, "transitions": 0, "time_in_stage": {},
+                "conversion": {"funnel": [], "exits": {}}, "throughput_by_quarter": {}}
+
+    stays = _stays(transitions, now)
+    return {
+        "initiatives": int(transitions["initiative_id"].nunique()),
+        "transitions": int(transitions["from_stage"].notna().sum()),
+        "time_in_stage": time_in_stage(stays),
+        "conversion": conversion(transitions),
+        "throughput_by_quarter": throughput(transitions),
+    }
+
+
+def get_velocity(db: Session) -> Dict:
+    """Portfolio velocity analytics, recomputed only after a new transition (or a new day)"""
+    key = date.today()
+    version = get_data_version(db)
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    result = compute_velocity(db)
+    with _cache_lock:
+        _cache.clear()
+        _cache[key] = (version, result)
+    return result
@@ -0,0 +1,195 @@
+"""
+Unified marketing + R&D spend ledger keyed by cost center
+
+Marketing spend reaches a cost center through actual_expenses ->
+budget_items.cost_center_id; R&D spend only carries the center's code as
+typed text in rd_expenses.cost_center. The spend_ledger view unions both
+onto cost_centers.id, matching R&D rows on upper(trim(cost_center)) =
+upper(code) so the expression index on rd_expenses serves the lookup. R&D
+rows whose code matches no cost center are left out.
+
+On PostgreSQL the view is materialized, with a unique index so it can be
+refreshed CONCURRENTLY (readers are never blocked). Reads refresh it first
+when the source tables' data version has moved since the last refresh. The
+version is a handful of index lookups rather than scans: the newest
+coalesce(updated_at, created_at) and the newest delta-sync tombstone of
+each expense table, plus the (small) cost center table's count and last
+change. A transaction still open during a refresh can commit rows stamped
+before the newest change, so a refresh that close to a change is repeated
+once the delta-sync watermark lag has passed. On SQLite it is a plain view
+and always current.
+"""
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import Date, Float, Integer, String, column, extract, func, literal_column, select, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models.budget import BudgetItem
+from app.models.cost_center import CostCenter
+from app.models.expense import ActualExpense
+from app.models.rd_initiative import RDExpense, COST_CENTER_KEY
+from app.models.sync import CHANGED_AT, DeletedRecord
+from app.services.delta_sync import WATERMARK_LAG_SECONDS
+
+LEDGER_VIEW = "spend_ledger"
+SOURCES = ("marketing", "rd")
+
+# Delta-synced tables the ledger reads: changes show in their changed-at index, deletes as tombstones
+VERSIONED_TABLES = (ActualExpense, BudgetItem, RDExpense)
+
+LEDGER_SQL = f"""
+    SELECT 'marketing' AS source, e.id AS expense_id, b.cost_center_id AS cost_center_id,
+           e.budget_item_id AS budget_item_id, CAST(NULL AS INTEGER) AS initiative_id,
+           b.category AS category, e.expense_date AS expense_date, e.amount AS amount
+    FROM actual_expenses e
+    JOIN budget_items b ON b.id = e.budget_item_id
+    UNION ALL
+    SELECT 'rd', r.id, c.id,
+           CAST(NULL AS INTEGER), r.initiative_id,
+           r.expense_category, r.expense_date, r.amount
+    FROM cost_centers c
+    JOIN rd_expenses r ON {COST_CENTER_KEY} = upper(c.code)
+"""
+
+ledger = table(
+    LEDGER_VIEW,
+    column("source", String),
+    column("expense_id", Integer),
+    column("cost_center_id", Integer),
+    column("budget_item_id", Integer),
+    column("initiative_id", Integer),
+    column("category", String),
+    column("expense_date", Date),
+    column("amount", Float),
+)
+
+_refreshed_version: Optional[Tuple] = None
+_recheck_after: Optional[datetime] = None
+_refresh_lock = threading.Lock()
+
+
+def _dialect(bind) -> str:
+    return bind.dialect.name
+
+
+# ==================== SCHEMA ====================
+
+def ensure_spend_ledger(engine: Engine):
+    """Create the ledger view for the current dialect if it doesn't exist"""
+    with engine.begin() as conn:
+        if _dialect(conn) == "sqlite":
+            conn.execute(text(f"CREATE VIEW IF NOT EXISTS {LEDGER_VIEW} AS {LEDGER_SQL}"))
+        elif _dialect(conn) == "postgresql":
+            conn.execute(text(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {LEDGER_VIEW} AS {LEDGER_SQL}"))
+            # REFRESH ... CONCURRENTLY needs a unique index over every row
+            conn.execute(text(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{LEDGER_VIEW}_source_expense ON {LEDGER_VIEW} (source, expense_id)"
+            ))
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{LEDGER_VIEW}_cost_center_date ON {LEDGER_VIEW} (cost_center_id, expense_date)"
+            ))
+
+
+def get_data_version(db: Session) -> Tuple:
+    """Last change, last delete of every table the ledger reads, in one statement of index lookups"""
+    changed_at = literal_column(CHANGED_AT)
+    tombstones = DeletedRecord.__table__
+    lookups = [select(func.max(changed_at)).select_from(model) for model in VERSIONED_TABLES]
+    lookups += [
+        select(func.max(tombstones.c.deleted_at)).where(tombstones.c.table_name == model.__tablename__)
+        for model in VERSIONED_TABLES
+    ]
+    # Cost centers aren't delta-synced (no tombstones), but there are only a few
+    lookups += [select(func.count(CostCenter.id)), select(func.max(changed_at)).select_from(CostCenter)]
+    return tuple(db.execute(select(*[lookup.scalar_subquery() for lookup in lookups])).one())
+
+
+def refresh_spend_ledger(db: Session, force: bool = False) -> bool:
+    """Refresh the materialized ledger if its sources changed; returns whether it ran"""
+    global _refreshed_version, _recheck_after
+    if _dialect(db.get_bind()) != "postgresql":
+        return False
+    with _refresh_lock:
+        version = get_data_version(db)
+        if not force and version == _refreshed_version and (
+            _recheck_after is None or _db_now(db) < _recheck_after
+        ):
+            return False
+        db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {LEDGER_VIEW}"))
+        db.commit()
+
+        lag = timedelta(seconds=WATERMARK_LAG_SECONDS)
+        refreshed_at = _db_now(db)
+        newest = max((value for value in version if isinstance(value, datetime)), default=None)
+        _recheck_after = refreshed_at + lag if newest is not None and refreshed_at - newest < lag else None
+        _refreshed_version = version
+        return True
+
+
+def _db_now(db: Session) -> datetime:
+    # The database clock, which stamped the changes the version tracks
+    return db.execute(select(func.now())).scalar()
+
+
+# ==================== REPORTING ====================
+
+def get_cost_center_spend(
+    db: Session,
+    cost_center: CostCenter,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> Dict:
+    """Marketing and R&D spend for one cost center by source, month and category"""
+    refresh_spend_ledger(db)
+
+    year, month = extract("year", ledger.c.expense_date), extract("month", ledger.c.expense_date)
+    query = select(
+        ledger.c.source,
+        ledger.c.category,
+        year,
+        month,
+        func.sum(ledger.c.amount),
+        func.count(),
+    ).where(ledger.c.cost_center_id == cost_center.id)
+    if start_date:
+        query = query.where(ledger.c.expense_date >= start_date)
+    if end_date:
+        query = query.where(ledger.c.expense_date <= end_date)
+    rows = db.execute(query.group_by(ledger.c.source, ledger.c.category, year, month)).all()
+
+    by_source = {source: {"amount": 0.0, "expenses": 0} for source in SOURCES}
+    by_month: Dict[str, Dict] = {}
+    by_category: Dict[Tuple, Dict] = {}
+    for source, category, row_year, row_month, amount, count in rows:
+        by_source[source]["amount"] += amount
+        by_source[source]["expenses"] += count
+        key = f"{int(row_year)}-{int(row_month):02d}"
+        entry = by_month.setdefault(key, {"month": key, **{name: 0.0 for name in SOURCES}, "total": 0.0})
+        entry[source] += amount
+        entry["total"] += amount
+        group = by_category.setdefault(
+            (source, category), {"source": source, "category": category, "amount": 0.0, "expenses": 0}
+        )
+        group["amount"] += amount
+        group["expenses"] += count
+
+    def rounded(entry: Dict) -> Dict:
+        return {k: round(v, 2) if isinstance(v, float) else v for k, v in entry.items()}
+
+    return {
+        "cost_center_id": cost_center.id,
+        "code": cost_center.code,
+        "name": cost_center.name,
+        "start_date": start_date,
+        "end_date": end_date,
+        "total": round(sum(s["amount"] for s in by_source.values()), 2),
+        "expenses": sum(s["expenses"] for s in by_source.values()),
+        "by_source": {source: rounded(totals) for source, totals in by_source.items()},
+        "by_month": [rounded(by_month[key]) for key in sorted(by_month)],
+        "by_category": sorted(
+            (rounded(group) for group in by_category.values()), key=lambda g: g["amount"], reverse=True
+        ),
+    }
@@ -0,0 +1,220 @@
+"""
+Multi-dimensional spend pivot over actual expenses
+
+A request names row dimensions, column dimensions and a measure. It is
+compiled into one aggregate over actual_expenses joined to budget_items,
+campaigns and cost_centers that returns every cell of the pivot together
+with its subtotals:
+ROLLUP(rows) x ROLLUP(cols), so each row prefix is crossed with each
+column prefix down to the grand total. GROUPING() tells a subtotal apart
+from a dimension whose value is simply missing. Expenses are first summed
+to the finest cell (one CTE scan of the join), and the subtotals roll up
+those cell sums rather than re-reading every expense.
+
+PostgreSQL runs this as GROUP BY ROLLUP(...), ROLLUP(...). SQLite has no
+grouping sets, so there the same sets are written out as a UNION ALL of
+plain GROUP BYs, each carrying the GROUPING() bitmask as a literal. The
+database does all the summing; the result is only reshaped into a grid.
+"""
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, cast, extract, func, literal, null, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.budget import BudgetItem
+from app.models.campaign import Campaign
+from app.models.cost_center import CostCenter
+from app.models.expense import ActualExpense
+
+UNSPECIFIED = "Unspecified"
+MAX_DIMENSIONS = 4
+
+_year = cast(extract("year", ActualExpense.expense_date), Integer)
+_month = cast(extract("month", ActualExpense.expense_date), Integer)
+
+# name -> SQL expression; periods are integer keys (2026, 20261, 202601) so they sort and group cheaply
+DIMENSIONS = {
+    "campaign": Campaign.name,
+    "category": BudgetItem.category,
+    "budget_item": BudgetItem.name,
+    "cost_center": CostCenter.name,
+    "department": CostCenter.department,
+    "vendor": func.coalesce(ActualExpense.vendor, UNSPECIFIED),
+    "payment_method": func.coalesce(ActualExpense.payment_method, UNSPECIFIED),
+    "year": _year,
+    "quarter": _year * 10 + (_month + 2) // 3,
+    "month": _year * 100 + _month,
+}
+
+# name -> aggregate over the per-cell sums (total amount, expense count)
+MEASURES = {
+    "amount": lambda cells: func.sum(cells.c.total),
+    "count": lambda cells: func.sum(cells.c.expenses),
+    "average": lambda cells: func.sum(cells.c.total) / func.sum(cells.c.expenses),
+}
+
+# Period keys back to readable labels
+LABELS = {
+    "year": str,
+    "quarter": lambda key: f"{key // 10}-Q{key % 10}",
+    "month": lambda key: f"{key // 100}-{key % 100:02d}",
+}
+
+
+def validate(rows: List[str], cols: List[str], measure: str):
+    """Raise ValueError for a pivot that can't be built"""
+    if not rows:
+        raise ValueError("At least one row dimension is required")
+    unknown = [name for name in rows + cols if name not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimension: {', '.join(unknown)}. Use any of: {', '.join(DIMENSIONS)}")
+    if len(set(rows + cols)) != len(rows + cols):
+        raise ValueError("A dimension can appear only once across rows and cols")
+    if len(rows + cols) > MAX_DIMENSIONS:
+        raise ValueError(f"At most {MAX_DIMENSIONS} dimensions in total")
+    if measure not in MEASURES:
+        raise ValueError(f"Unknown measure: {measure}. Use one of: {', '.join(MEASURES)}")
+
+
+def _cells(
+    names: List[str],
+    start_date: Optional[date],
+    end_date: Optional[date],
+    campaign_id: Optional[int]
+):
+    """Filtered expenses summed per combination of every requested dimension"""
+    dimensions = [DIMENSIONS[name] for name in names]
+    query = select(
+        *[expression.label(name) for expression, name in zip(dimensions, names)],
+        func.sum(ActualExpense.amount).label("total"),
+        func.count(ActualExpense.id).label("expenses"),
+    ).select_from(ActualExpense).join(
+        BudgetItem, BudgetItem.id == ActualExpense.budget_item_id
+    ).join(
+        Campaign, Campaign.id == BudgetItem.campaign_id
+    ).join(
+        CostCenter, CostCenter.id == BudgetItem.cost_center_id
+    )
+    if start_date:
+        query = query.where(ActualExpense.expense_date >= start_date)
+    if end_date:
+        query = query.where(ActualExpense.expense_date <= end_date)
+    if campaign_id is not None:
+        query = query.where(BudgetItem.campaign_id == campaign_id)
+    return query.group_by(*dimensions).cte("pivot_cells")
+
+
+def build_query(
+    dialect: str,
+    rows: List[str],
+    cols: List[str],
+    measure: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    campaign_id: Optional[int] = None
+):
+    """One statement returning every pivot cell and subtotal with its GROUPING() mask"""
+    names = rows + cols
+    cells = _cells(names, start_date, end_date, campaign_id)
+    value = MEASURES[measure](cells).label("value")
+    expenses = func.sum(cells.c.expenses).label("expenses")
+
+    if dialect == "postgresql":
+        rollups = [func.rollup(*[cells.c[name] for name in group]) for group in (rows, cols) if group]
+        return select(
+            *[cells.c[name] for name in names],
+            func.grouping(*[cells.c[name] for name in names]).label("grouping_id"),
+            value,
+            expenses,
+        ).group_by(*rollups)
+
+    # Same sets as ROLLUP(rows) x ROLLUP(cols): every row prefix with every column prefix
+    branches = []
+    for row_depth in range(len(rows), -1, -1):
+        for col_depth in range(len(cols), -1, -1):
+            kept = set(rows[:row_depth] + cols[:col_depth])
+            # Bit per dimension, leftmost most significant, set when rolled up (as GROUPING() numbers them)
+            mask = sum(1 << (len(names) - 1 - i) for i, name in enumerate(names) if name not in kept)
+            branches.append(select(
+                *[(cells.c[name] if name in kept else null()).label(name) for name in names],
+                literal(mask).label("grouping_id"),
+                value,
+                expenses,
+            ).group_by(*[cells.c[name] for name in names if name in kept]))
+    return union_all(*branches)
+
+
+def _label(name: str, key):
+    if key is None:
+        return None
+    return LABELS[name](key) if name in LABELS else key
+
+
+def _round(value) -> Optional[float]:
+    if value is None:
+        return None
+    # Float sums differ in the last bits between databases (summing order); drop that
+    # noise first so half-cent averages round the same way on SQLite and PostgreSQL
+    return round(round(float(value), 6), 2)
+
+
+def _order(keys: Tuple) -> Tuple:
+    # Subtotals (None) after the values they roll up
+    return tuple((key is None, key if key is not None else 0) for key in keys)
+
+
+def get_spend_pivot(
+    db: Session,
+    rows: List[str],
+    cols: Optional[List[str]] = None,
+    measure: str = "amount",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    campaign_id: Optional[int] = None
+) -> Dict:
+    """Spend pivot grid with row and column subtotals, aggregated in one query"""
+    cols = cols or []
+    validate(rows, cols, measure)
+    names = rows + cols
+    query = build_query(db.get_bind().dialect.name, rows, cols, measure, start_date, end_date, campaign_id)
+
+    n_rows = len(rows)
+    cells: Dict[Tuple, Dict[Tuple, float]] = {}
+    column_keys = set()
+    total_expenses = 0
+    for record in db.execute(query).all():
+        # Rolled-up dimensions come back NULL; the mask decides which NULLs are subtotals
+        rolled_up = [record.grouping_id & (1 << (len(names) - 1 - i)) for i in range(len(names))]
+        keys = tuple(
+            None if rolled else (UNSPECIFIED if key is None else key)
+            for rolled, key in zip(rolled_up, record[:len(names)])
+        )
+        row_key, col_key = keys[:n_rows], keys[n_rows:]
+        cells.setdefault(row_key, {})[col_key] = record.value
+        column_keys.add(col_key)
+        if all(key is None for key in keys):
+            # SUM of counts is numeric on PostgreSQL
+            total_expenses = int(record.expenses)
+
+    columns = sorted(column_keys, key=_order)
+    data = []
+    for row_key in sorted(cells, key=_order):
+        values = cells[row_key]
+        data.append({
+            "keys": [_label(name, key) for name, key in zip(rows, row_key)],
+            "level": sum(key is None for key in row_key),
+            "values": [_round(values.get(c)) for c in columns],
+        })
+
+    return {
+        "rows": rows,
+        "cols": cols,
+        "measure": measure,
+        "expenses": total_expenses,
+        "columns": [
+            {"keys": [_label(name, key) for name, key in zip(cols, col_key)], "level": sum(key is None for key in col_key)}
+            for col_key in columns
+        ],
+        "data": data,
+    }
@@ -0,0 +1,209 @@
+"""
+Benchmark for deleting an initiative or campaign with many children
+Seeds a scratch SQLite database with one large R&D initiative (rows spread
+across its child tables) and one campaign with budget items and expenses,
+then deletes each twice: the way the ORM did it before (load every child
+collection and delete row by row) and the current single DELETE that
+leaves the children to ON DELETE CASCADE. Reports latency, statements
+sent and peak Python memory.
+
+Usage: python scripts/benchmark_cascade_delete.py [rows]
+The scratch database lives in a temp directory and is removed afterwards.
+"""
+import sys
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.campaign import Campaign
+from app.models.cost_center import CostCenter
+from app.models.budget import BudgetItem
+from app.models.expense import ActualExpense
+from app.models.roi import ROIMetric
+from app.models.rd_initiative import (
+    RDInitiative, RDNote, RDContact, RDCustomerInterest, RDSample, RDExpense, RDRevenue, RDMilestone
+)
+from app.crud import campaign, rd_initiative
+
+INITIATIVE_ID = 1
+CAMPAIGN_ID = 1
+YEAR = 2026
+
+INITIATIVE_CHILDREN = [
+    "notes", "contacts", "customer_interests", "samples", "expenses", "revenue", "milestones",
+    "team_members", "stage_transitions",
+]
+
+
+# ==================== PREVIOUS IMPLEMENTATIONS ====================
+
+def legacy_delete_initiative(db, initiative_id):
+    """ORM cascade: every child collection is loaded and each row deleted on its own"""
+    initiative = db.query(RDInitiative).filter(RDInitiative.id == initiative_id).first()
+    for name in INITIATIVE_CHILDREN:
+        for child in getattr(initiative, name):
+            db.delete(child)
+    for child in (initiative.feasibility, initiative.roi_data, initiative.recommendation):
+        if child is not None:
+            db.delete(child)
+    # Children first, as the unit of work ordered them before the database cascaded
+    db.flush()
+    db.delete(initiative)
+    db.commit()
+    return True
+
+
+def legacy_delete_campaign(db, campaign_id):
+    db_campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    for item in db_campaign.budget_items:
+        for expense in item.actual_expenses:
+            db.delete(expense)
+        db.delete(item)
+    db.flush()
+    db.delete(db_campaign)
+    db.commit()
+    return True
+
+
+# ==================== SEEDING ====================
+
+def seed(db, rows: int):
+    random.seed(42)
+    start = date(YEAR, 1, 1)
+
+    def day():
+        return start + timedelta(days=random.randint(0, 364))
+
+    db.add(CostCenter(id=1, name="Benchmark", code="BENCH"))
+    db.add(Campaign(id=CAMPAIGN_ID, name="Benchmark Campaign", total_budget=1_000_000))
+    db.add(RDInitiative(id=INITIATIVE_ID, name="Benchmark Initiative", initiative_type="new_product"))
+    db.flush()
+
+    # Roughly the shape of a long-running initiative: notes and expenses dominate
+    share = max(rows // 8, 1)
+    db.bulk_insert_mappings(RDNote, [
+        {"initiative_id": INITIATIVE_ID, "note_text": f"Note {i}", "author": "bench"} for i in range(share * 2)
+    ])
+    db.bulk_insert_mappings(RDContact, [
+        {"initiative_id": INITIATIVE_ID, "contact_date": day(), "contact_type": "call",
+         "customer_name": f"Customer {i % 200}"}
+        for i in range(share)
+    ])
+    db.bulk_insert_mappings(RDCustomerInterest, [
+        {"id": i, "initiative_id": INITIATIVE_ID, "customer_name": f"Customer {i}"} for i in range(1, share + 1)
+    ])
+    db.bulk_insert_mappings(RDSample, [
+        {"initiative_id": INITIATIVE_ID, "sample_type": "trial_batch", "recipient_name": "Bench",
+         "ship_date": day()} for _ in range(share)
+    ])
+    db.bulk_insert_mappings(RDExpense, [
+        {"initiative_id": INITIATIVE_ID, "expense_category": "Samples", "amount": random.uniform(10, 500),
+         "expense_date": day()}
+        for _ in range(share * 2)
+    ])
+    db.bulk_insert_mappings(RDRevenue, [
+        {"initiative_id": INITIATIVE_ID, "customer_name": f"Customer {i}", "customer_interest_id": i,
+         "order_value": random.uniform(100, 10000), "order_date": day()}
+        for i in range(1, share + 1)
+    ])
+    db.bulk_insert_mappings(RDMilestone, [
+        {"initiative_id": INITIATIVE_ID, "milestone_name": f"Milestone {i}", "milestone_type": "custom",
+         "target_date": day()}
+        for i in range(share)
+    ])
+
+    item_count = max(rows // 10, 1)
+    db.bulk_insert_mappings(BudgetItem, [
+        {"id": i, "campaign_id": CAMPAIGN_ID, "cost_center_id": 1, "name": f"Item {i}",
+         "category": "Digital Ads", "total_budget": random.uniform(500, 5000)}
+        for i in range(1, item_count + 1)
+    ])
+    db.bulk_insert_mappings(ActualExpense, [
+        {"budget_item_id": random.randint(1, item_count), "amount": random.uniform(10, 500), "expense_date": day()}
+        for _ in range(rows)
+    ])
+    db.bulk_insert_mappings(ROIMetric, [
+        {"campaign_id": CAMPAIGN_ID, "calculation_date": day(), "period_start": start, "period_end": day(),
+         "total_cost": random.uniform(100, 1000), "revenue_attributed": random.uniform(0, 3000)}
+        for _ in range(rows // 10)
+    ])
+    db.commit()
+
+
+# ==================== MEASUREMENT ====================
+
+def measure(engine, session_factory, fn, *args):
+    """Run fn in a fresh session; return (seconds, statements, peak MiB)"""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        # A batched executemany still runs once per parameter set
+        statements.append(len(parameters) if executemany else 1)
+
+    db = session_factory()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        tracemalloc.start()
+        started = time.perf_counter()
+        fn(db, *args)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, sum(statements), peak / (1024 * 1024)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+        db.close()
+
+
+def run(rows: int, deletes):
+    """Seed a fresh database and time each (fn, id) delete in it"""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'benchmark.db')}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+
+        db = Session()
+        seed(db, rows)
+        db.close()
+
+        for fn, target in deletes:
+            results.append(measure(engine, Session, fn, target))
+        engine.dispose()
+    return results
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    print("=" * 72)
+    print(f"Cascade Delete Benchmark ({rows:,} child rows per parent)")
+    print("=" * 72)
+
+    print("Seeding...")
+    # Each approach gets its own freshly seeded database so both delete the same rows
+    before = run(rows, [(legacy_delete_initiative, INITIATIVE_ID), (legacy_delete_campaign, CAMPAIGN_ID)])
+    after = run(rows, [(rd_initiative.delete_initiative, INITIATIVE_ID), (campaign.delete_campaign, CAMPAIGN_ID)])
+    print()
+
+    print(f"{'delete':<32} {'before':>26} {'after':>26}")
+    for name, old, new in zip(["rd_initiative.delete_initiative", "campaign.delete_campaign"], before, after):
+        old_s, old_n, old_mb = old
+        new_s, new_n, new_mb = new
+        print(f"{name:<32} {old_s * 1000:>8.1f}ms {old_n:>6} stmt {old_mb:>5.1f}MiB"
+              f" {new_s * 1000:>8.1f}ms {new_n:>6} stmt {new_mb:>5.1f}MiB")
+
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
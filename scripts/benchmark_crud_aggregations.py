@@ -0,0 +1,199 @@
+"""
+Benchmark for the CRUD summary helpers that aggregate in SQL
+Seeds a scratch SQLite database with ~100k rows per table, then compares the
+previous load-everything-and-sum-in-Python implementations against the
+current func.sum/func.count queries on latency and peak Python memory.
+
+Usage: python scripts/benchmark_crud_aggregations.py [rows]
+The scratch database lives in a temp directory and is removed afterwards.
+"""
+import sys
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, extract
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.campaign import Campaign
+from app.models.cost_center import CostCenter
+from app.models.budget import BudgetItem
+from app.models.expense import ActualExpense
+from app.models.roi import ROIMetric
+from app.models.marketing_calendar import MarketingCalendar, MarketingActivity
+from app.models.rd_initiative import RDInitiative, RDExpense, RDRevenue
+from app.crud import budget, campaign, expense, marketing_calendar, rd_expense, rd_revenue, roi
+
+CAMPAIGN_ID = 1
+INITIATIVE_ID = 1
+CALENDAR_ID = 1
+YEAR = 2026
+
+
+# ==================== PREVIOUS IMPLEMENTATIONS ====================
+
+def legacy_total_expenses(db, initiative_id):
+    expenses = db.query(RDExpense).filter(RDExpense.initiative_id == initiative_id).all()
+    return sum(exp.amount for exp in expenses)
+
+
+def legacy_total_revenue(db, initiative_id):
+    records = db.query(RDRevenue).filter(RDRevenue.initiative_id == initiative_id).all()
+    return sum(rev.order_value for rev in records)
+
+
+def legacy_campaign_roi_summary(db, campaign_id):
+    metrics = db.query(ROIMetric).filter(ROIMetric.campaign_id == campaign_id).all()
+    total_cost = sum(m.total_cost for m in metrics)
+    total_revenue = sum(m.revenue_attributed for m in metrics)
+    return {"total_cost": total_cost, "total_revenue": total_revenue, "metric_count": len(metrics)}
+
+
+def legacy_budget_summary_by_campaign(db, campaign_id):
+    items = db.query(BudgetItem).filter(BudgetItem.campaign_id == campaign_id).all()
+    categories = {}
+    for item in items:
+        entry = categories.setdefault(item.category, {"count": 0, "total_budget": 0.0})
+        entry["count"] += 1
+        entry["total_budget"] += item.total_budget
+    return {"total_budget": sum(i.total_budget for i in items), "item_count": len(items), "categories": categories}
+
+
+def legacy_campaign_spending_summary(db, campaign_id, year):
+    items = db.query(BudgetItem).filter(BudgetItem.campaign_id == campaign_id).all()
+    ids = [bi.id for bi in items]
+    expenses = db.query(ActualExpense).filter(
+        ActualExpense.budget_item_id.in_(ids),
+        extract('year', ActualExpense.expense_date) == year
+    ).all()
+    return {
+        "total_budgeted": sum(bi.total_budget for bi in items),
+        "total_actual": sum(e.amount for e in expenses),
+        "expense_count": len(expenses)
+    }
+
+
+def legacy_calendar_completion_stats(db, calendar_id):
+    activities = db.query(MarketingActivity).filter(MarketingActivity.calendar_id == calendar_id).all()
+    return {"total_activities": len(activities), "completed_activities": sum(1 for a in activities if a.is_completed)}
+
+
+# ==================== SEEDING ====================
+
+def seed(db, rows: int):
+    random.seed(42)
+    start = date(YEAR, 1, 1)
+
+    def day():
+        return start + timedelta(days=random.randint(0, 364))
+
+    db.add(Campaign(id=CAMPAIGN_ID, name="Benchmark Campaign", total_budget=1_000_000))
+    db.add(CostCenter(id=1, name="Benchmark", code="BENCH"))
+    db.add(MarketingCalendar(id=CALENDAR_ID, year=YEAR, month=1))
+    db.add(RDInitiative(id=INITIATIVE_ID, name="Benchmark Initiative"))
+    db.flush()
+
+    # ~1 expense per budget item is typical; keep IN-list sizes realistic for SQLite's variable limit
+    item_count = min(rows // 10, 30_000)
+    db.bulk_insert_mappings(BudgetItem, [
+        {"id": i, "campaign_id": CAMPAIGN_ID, "cost_center_id": 1, "name": f"Item {i}",
+         "category": random.choice(["Digital Ads", "Events", "Content", "Print"]),
+         "total_budget": random.uniform(500, 5000)}
+        for i in range(1, item_count + 1)
+    ])
+    db.bulk_insert_mappings(ActualExpense, [
+        {"budget_item_id": random.randint(1, item_count), "amount": random.uniform(10, 500), "expense_date": day()}
+        for _ in range(rows)
+    ])
+    db.bulk_insert_mappings(ROIMetric, [
+        {"campaign_id": CAMPAIGN_ID, "calculation_date": day(), "period_start": start, "period_end": day(),
+         "total_cost": random.uniform(100, 1000), "revenue_attributed": random.uniform(0, 3000)}
+        for _ in range(rows)
+    ])
+    db.bulk_insert_mappings(MarketingActivity, [
+        {"calendar_id": CALENDAR_ID, "week_number": random.randint(1, 4), "activity_name": f"Activity {i}",
+         "day_of_week": "monday", "is_completed": random.random() < 0.4}
+        for i in range(rows)
+    ])
+    db.bulk_insert_mappings(RDExpense, [
+        {"initiative_id": INITIATIVE_ID, "expense_category": "Samples", "amount": random.uniform(10, 500),
+         "expense_date": day()}
+        for _ in range(rows)
+    ])
+    db.bulk_insert_mappings(RDRevenue, [
+        {"initiative_id": INITIATIVE_ID, "customer_name": f"Customer {i % 500}",
+         "order_value": random.uniform(100, 10000), "order_date": day()}
+        for i in range(rows)
+    ])
+    db.commit()
+
+
+# ==================== MEASUREMENT ====================
+
+def measure(session_factory, fn, *args):
+    """Run fn in a fresh session; return (result, seconds, peak MiB)"""
+    db = session_factory()
+    try:
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = fn(db, *args)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return result, elapsed, peak / (1024 * 1024)
+    finally:
+        db.close()
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    print("=" * 72)
+    print(f"CRUD Aggregation Benchmark ({rows:,} rows per table)")
+    print("=" * 72)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'benchmark.db')}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+
+        print("Seeding...")
+        db = Session()
+        seed(db, rows)
+        db.close()
+        print()
+
+        cases = [
+            ("rd_expense.get_total_expenses", legacy_total_expenses, rd_expense.get_total_expenses, (INITIATIVE_ID,)),
+            ("rd_revenue.get_total_revenue", legacy_total_revenue, rd_revenue.get_total_revenue, (INITIATIVE_ID,)),
+            ("roi.get_campaign_roi_summary", legacy_campaign_roi_summary, roi.get_campaign_roi_summary, (CAMPAIGN_ID,)),
+            ("budget.get_budget_summary_by_campaign", legacy_budget_summary_by_campaign,
+             budget.get_budget_summary_by_campaign, (CAMPAIGN_ID,)),
+            ("expense.get_campaign_spending_summary", legacy_campaign_spending_summary,
+             expense.get_campaign_spending_summary, (CAMPAIGN_ID, YEAR)),
+            ("marketing_calendar.get_calendar_completion_stats", legacy_calendar_completion_stats,
+             marketing_calendar.get_calendar_completion_stats, (CALENDAR_ID,)),
+        ]
+
+        print(f"{'helper':<50} {'before':>16} {'after':>16}")
+        for name, legacy, current, args in cases:
+            _, old_s, old_mb = measure(Session, legacy, *args)
+            _, new_s, new_mb = measure(Session, current, *args)
+            print(f"{name:<50} {old_s * 1000:>7.1f}ms {old_mb:>5.1f}MiB {new_s * 1000:>7.1f}ms {new_mb:>5.1f}MiB")
+
+        _, new_s, new_mb = measure(Session, campaign.get_budget_allocation, CAMPAIGN_ID)
+        print(f"{'campaign.get_budget_allocation':<50} {'':>16} {new_s * 1000:>7.1f}ms {new_mb:>5.1f}MiB")
+
+        engine.dispose()
+
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
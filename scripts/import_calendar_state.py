@@ -0,0 +1,142 @@
+"""
+One-shot importer for the legacy calendar_state.json completion flags
+Run this once to fold the old file-based checkbox state into marketing_activities
+
+The legacy file maps keys like "2_Week 1_0" (month, week label, position in
+the week) to a completed flag. Completion now lives only in
+MarketingActivity.is_completed, so after this import the file can be deleted.
+
+Usage:
+    python scripts/import_calendar_state.py [path/to/calendar_state.json] [year]
+"""
+import sys
+import os
+import json
+
+# Add parent directory to path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine, Base
+from app.models.marketing_calendar import MarketingCalendar, MarketingActivity
+from sqlalchemy.orm import Session
+
+DEFAULT_STATE_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "calendar_state.json"
+)
+
+
+def parse_state_key(key: str):
+    """Split a legacy key like "2_Week 1_0" into (month, week_number, position)"""
+    month, week_label, position = key.split("_")
+    return int(month), int(week_label.split()[1]), int(position)
+
+
+def import_calendar_state(db: Session, state: dict, year: int = 2026):
+    """Reconcile legacy completion flags into marketing_activities"""
+    updated = 0
+    unchanged = 0
+    missing = []
+
+    # Load each month's activities once, grouped by week in display order
+    weeks_by_month = {}
+
+    for key, completed in state.items():
+        try:
+            month, week_number, position = parse_state_key(key)
+        except (ValueError, IndexError):
+            print(f"  Skipping malformed key: {key!r}")
+            missing.append(key)
+            continue
+
+        if month not in weeks_by_month:
+            activities = db.query(MarketingActivity).join(
+                MarketingCalendar, MarketingActivity.calendar_id == MarketingCalendar.id
+            ).filter(
+                MarketingCalendar.year == year,
+                MarketingCalendar.month == month
+            ).order_by(
+                MarketingActivity.week_number,
+                MarketingActivity.order_in_week,
+                MarketingActivity.id
+            ).all()
+
+            weeks = {}
+            for activity in activities:
+                weeks.setdefault(activity.week_number, []).append(activity)
+            weeks_by_month[month] = weeks
+
+        week_activities = weeks_by_month[month].get(week_number, [])
+        if position >= len(week_activities):
+            missing.append(key)
+            continue
+
+        activity = week_activities[position]
+        if bool(activity.is_completed) == bool(completed):
+            unchanged += 1
+            continue
+
+        activity.is_completed = bool(completed)
+        updated += 1
+
+    db.commit()
+
+    print(f"  Updated {updated} activities")
+    print(f"  {unchanged} already matched")
+    if missing:
+        print(f"  {len(missing)} keys had no matching activity: {', '.join(missing)}")
+
+    return updated, unchanged, missing
+
+
+def main():
+    """Main import function"""
+    state_file = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_STATE_FILE
+    year = int(sys.argv[2]) if len(sys.argv) > 2 else 2026
+
+    print("=" * 60)
+    print("Calendar Completion State Import")
+    print("=" * 60)
+    print()
+
+    if not os.path.exists(state_file):
+        print(f"No state file found at {state_file}, nothing to import.")
+        return
+
+    with open(state_file) as f:
+        state = json.load(f)
+    print(f"Found {len(state)} completion flags in {state_file}")
+    print()
+
+    print("Ensuring database tables exist...")
+    Base.metadata.create_all(bind=engine)
+    print("✓ Tables ready")
+    print()
+
+    db = SessionLocal()
+
+    try:
+        updated, unchanged, missing = import_calendar_state(db, state, year=year)
+
+        print()
+        print("=" * 60)
+        print("✓ Import successful!")
+        print(f"  {updated} activities updated, {unchanged} unchanged, {len(missing)} unmatched")
+        print("  calendar_state.json is no longer read and can be deleted.")
+        print("=" * 60)
+
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print("✗ Import failed!")
+        print(f"Error: {str(e)}")
+        print("=" * 60)
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
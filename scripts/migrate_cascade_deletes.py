@@ -0,0 +1,163 @@
+"""
+Migration script to add ON DELETE rules to existing foreign keys
+Children of rd_initiatives, campaigns and budget_items are now removed by
+the database (ON DELETE CASCADE, and SET NULL for orders linked to a
+customer interest row) instead of being loaded and deleted one by one by
+the ORM. New databases get the rules from create_all; this brings older
+tables in line and adds the indexes on the child key columns that the
+cascades look rows up by.
+
+PostgreSQL: each stale constraint is dropped and re-added with its rule.
+SQLite can't alter a constraint, so affected tables are rebuilt: renamed
+aside, recreated from the models and copied back, with foreign key
+enforcement off for the duration and checked afterwards.
+Safe to run repeatedly; tables that already match are left alone.
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
+
+from app.database import SessionLocal, engine, Base
+from app.models.campaign import Campaign
+from app.models.budget import BudgetItem
+from app.models.expense import ActualExpense
+from app.models.roi import ROIMetric
+from app.models.cost_center import CostCenter
+from app.models.rd_initiative import RDInitiative, RDCustomerInterest, RDRevenue
+
+
+def stale_foreign_keys(connection):
+    """(table, model constraint, reflected name) for every FK whose ON DELETE rule differs"""
+    inspector = inspect(connection)
+    existing = set(inspector.get_table_names())
+    stale = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        reflected = inspector.get_foreign_keys(table.name)
+        for constraint in table.foreign_key_constraints:
+            if not constraint.ondelete:
+                continue
+            columns = [column.name for column in constraint.columns]
+            match = next(
+                (fk for fk in reflected
+                 if fk["constrained_columns"] == columns and fk["referred_table"] == constraint.referred_table.name),
+                None
+            )
+            current = ((match or {}).get("options") or {}).get("ondelete") or ""
+            if current.upper() != constraint.ondelete.upper():
+                stale.append((table, constraint, match["name"] if match else None))
+    return stale
+
+
+def alter_postgres(connection, stale):
+    for table, constraint, name in stale:
+        name = name or f"{table.name}_{constraint.column_keys[0]}_fkey"
+        columns = ", ".join(column.name for column in constraint.columns)
+        referred = ", ".join(element.column.name for element in constraint.elements)
+        connection.execute(text(f"""
+            ALTER TABLE {table.name}
+                DROP CONSTRAINT IF EXISTS {name},
+                ADD CONSTRAINT {name} FOREIGN KEY ({columns})
+                    REFERENCES {constraint.referred_table.name} ({referred}) ON DELETE {constraint.ondelete}
+        """))
+        print(f"  ✓ {table.name}.{columns} → ON DELETE {constraint.ondelete}")
+
+
+def rebuild_sqlite(connection, stale):
+    # Keep other tables' references pointing at the original name while it is renamed aside
+    connection.execute(text("PRAGMA legacy_alter_table=ON"))
+    inspector = inspect(connection)
+    for table in {table: None for table, _, _ in stale}:
+        old = f"{table.name}__old"
+        old_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        # From sqlite_master rather than the inspector, which skips expression indexes
+        indexes = connection.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table AND sql IS NOT NULL"
+        ), {"table": table.name}).scalars().all()
+        for index in indexes:
+            connection.execute(text(f"DROP INDEX IF EXISTS {index}"))
+        connection.execute(text(f"ALTER TABLE {table.name} RENAME TO {old}"))
+        table.create(bind=connection)
+        columns = ", ".join(column.name for column in table.columns if column.name in old_columns)
+        connection.execute(text(f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {old}"))
+        connection.execute(text(f"DROP TABLE {old}"))
+        print(f"  ✓ {table.name} rebuilt")
+    connection.execute(text("PRAGMA legacy_alter_table=OFF"))
+
+    violations = connection.execute(text("PRAGMA foreign_key_check")).all()
+    if violations:
+        raise RuntimeError(f"{len(violations)} rows reference missing parents, e.g. {violations[0]}")
+
+
+def ensure_indexes(connection):
+    """Create any missing index on tables that cascade, including their foreign key columns"""
+    for table in Base.metadata.sorted_tables:
+        if any(constraint.ondelete for constraint in table.foreign_key_constraints):
+            for index in table.indexes:
+                # IF NOT EXISTS rather than checkfirst: expression indexes can't be reflected
+                connection.execute(CreateIndex(index, if_not_exists=True))
+
+
+def main():
+    """Main migration function"""
+    print("=" * 60)
+    print("Cascade Delete Migration")
+    print("=" * 60)
+    print()
+
+    print("Ensuring database tables exist...")
+    Base.metadata.create_all(bind=engine)
+    print("✓ Tables ready")
+    print()
+
+    # One connection for the whole run so the SQLite pragmas hold across the commit
+    connection = engine.connect()
+    db = SessionLocal(bind=connection)
+    sqlite = engine.dialect.name == "sqlite"
+
+    try:
+        if sqlite:
+            # Must be set before any write opens a transaction
+            connection.execute(text("PRAGMA foreign_keys=OFF"))
+
+        stale = stale_foreign_keys(connection)
+        if not stale:
+            print("✓ All foreign keys already carry their ON DELETE rules")
+        elif sqlite:
+            rebuild_sqlite(connection, stale)
+        else:
+            alter_postgres(connection, stale)
+        ensure_indexes(connection)
+        print("✓ Foreign key indexes in place")
+
+        db.commit()
+        connection.commit()
+
+        print()
+        print("=" * 60)
+        print("✓ Migration successful!")
+        print("=" * 60)
+
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print("✗ Migration failed!")
+        print(f"Error: {str(e)}")
+        print("=" * 60)
+        db.rollback()
+        raise
+
+    finally:
+        if sqlite:
+            connection.execute(text("PRAGMA foreign_keys=ON"))
+        db.close()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Migration script for delta-sync collection endpoints
+Creates the deleted_records tombstone table and the changed-at index
+(coalesce(updated_at, created_at), id) on every synced table that
+?updated_since= queries filter and order on, then purges tombstones past
+the retention window.
+Safe to run repeatedly.
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.schema import CreateIndex
+
+from app.database import SessionLocal, engine, Base
+from app.models.sync import DeletedRecord
+from app.services.delta_sync import SYNCED, TOMBSTONE_RETENTION_DAYS, purge_tombstones
+
+CHANGED_AT_INDEXES = [
+    index for model in SYNCED.values() for index in model.__table__.indexes
+    if index.name.endswith("_changed_at")
+]
+
+
+def main():
+    """Main migration function"""
+    print("=" * 60)
+    print("Delta Sync Migration")
+    print("=" * 60)
+    print()
+
+    print("Ensuring database tables exist...")
+    Base.metadata.create_all(bind=engine)
+    print(f"✓ Tables ready (including {DeletedRecord.__tablename__})")
+    print()
+
+    db = SessionLocal()
+
+    try:
+        connection = db.connection()
+        for index in CHANGED_AT_INDEXES:
+            # IF NOT EXISTS rather than checkfirst: expression indexes can't be reflected
+            connection.execute(CreateIndex(index, if_not_exists=True))
+            print(f"  ✓ {index.name} in place")
+        db.commit()
+
+        purged = purge_tombstones(db)
+        print(f"  ✓ Purged {purged} tombstones older than {TOMBSTONE_RETENTION_DAYS} days")
+
+        print()
+        print("=" * 60)
+        print("✓ Migration successful!")
+        print("=" * 60)
+
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print("✗ Migration failed!")
+        print(f"Error: {str(e)}")
+        print("=" * 60)
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Migration script to enforce one KPI snapshot per metric, date and type
+Removes duplicate data points (keeping the most recent row) and adds the
+unique index that POST /api/kpi/snapshots/bulk upserts against.
+Safe to run repeatedly.
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database import SessionLocal, engine, Base
+from app.models.kpi import KPIMetric, KPISnapshot
+
+
+def remove_duplicate_snapshots(db) -> int:
+    """Delete all but the newest snapshot for each (metric, date, type)"""
+    result = db.execute(text("""
+        DELETE FROM kpi_snapshots
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM kpi_snapshots
+            GROUP BY metric_id, snapshot_date, snapshot_type
+        )
+    """))
+    return result.rowcount
+
+
+def create_unique_index(db):
+    db.execute(text("""
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_kpi_snapshots_metric_date_type
+        ON kpi_snapshots (metric_id, snapshot_date, snapshot_type)
+    """))
+
+
+def main():
+    """Main migration function"""
+    print("=" * 60)
+    print("KPI Snapshot Unique Key Migration")
+    print("=" * 60)
+    print()
+
+    print("Ensuring database tables exist...")
+    Base.metadata.create_all(bind=engine)
+    print("✓ Tables ready")
+    print()
+
+    db = SessionLocal()
+
+    try:
+        removed = remove_duplicate_snapshots(db)
+        print(f"  ✓ Removed {removed} duplicate snapshots")
+
+        create_unique_index(db)
+        print("  ✓ Unique index on (metric_id, snapshot_date, snapshot_type) in place")
+
+        db.commit()
+
+        print()
+        print("=" * 60)
+        print("✓ Migration successful!")
+        print("=" * 60)
+
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print("✗ Migration failed!")
+        print(f"Error: {str(e)}")
+        print("=" * 60)
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
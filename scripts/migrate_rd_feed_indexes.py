@@ -0,0 +1,64 @@
+"""
+Migration script to add the R&D activity feed indexes
+Creates (initiative_id, date, id) indexes on notes, contacts, milestones,
+samples, expenses and revenue on existing tables; new databases get them
+from create_all. Safe to run repeatedly.
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine, Base
+from app.models.rd_initiative import RDNote, RDContact, RDMilestone, RDSample, RDExpense, RDRevenue
+
+FEED_INDEXES = [
+    index
+    for model in (RDNote, RDContact, RDMilestone, RDSample, RDExpense, RDRevenue)
+    for index in model.__table__.indexes
+    if index.name.startswith("ix_rd_") and "_initiative_" in index.name
+]
+
+
+def main():
+    """Main migration function"""
+    print("=" * 60)
+    print("R&D Activity Feed Index Migration")
+    print("=" * 60)
+    print()
+
+    print("Ensuring database tables exist...")
+    Base.metadata.create_all(bind=engine)
+    print("✓ Tables ready")
+    print()
+
+    db = SessionLocal()
+
+    try:
+        connection = db.connection()
+        for index in FEED_INDEXES:
+            index.create(bind=connection, checkfirst=True)
+            print(f"  ✓ {index.name} in place")
+
+        db.commit()
+
+        print()
+        print("=" * 60)
+        print("✓ Migration successful!")
+        print("=" * 60)
+
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print("✗ Migration failed!")
+        print(f"Error: {str(e)}")
+        print("=" * 60)
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Migration script to add the R&D interest level history table
+Creates rd_interest_level_transitions and seeds one opening transition (into
+the current level, dated from first_contact_date or created_at) for every
+customer interest row that has no history yet. Rows already at "ordered"
+get no level-at-conversion this way; the pipeline forecast leaves them out
+of the open levels' observed rates. Safe to run repeatedly.
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timezone
+
+from sqlalchemy import func
+
+from app.database import SessionLocal, engine, Base
+from app.models.rd_initiative import RDCustomerInterest, RDInterestLevelTransition
+
+
+def main():
+    """Main migration function"""
+    print("=" * 60)
+    print("R&D Interest Level History Migration")
+    print("=" * 60)
+    print()
+
+    print("Ensuring database tables exist...")
+    Base.metadata.create_all(bind=engine)
+    print("✓ Tables ready")
+    print()
+
+    db = SessionLocal()
+
+    try:
+        has_history = db.query(RDInterestLevelTransition.id).filter(
+            RDInterestLevelTransition.customer_interest_id == RDCustomerInterest.id
+        ).exists()
+        missing = db.query(RDCustomerInterest).filter(~has_history).all()
+
+        for interest in missing:
+            started = interest.created_at
+            if interest.first_contact_date:
+                started = datetime.combine(interest.first_contact_date, datetime.min.time(), tzinfo=timezone.utc)
+            db.add(RDInterestLevelTransition(
+                customer_interest_id=interest.id,
+                from_level=None,
+                to_level=interest.interest_level or "interested",
+                transitioned_at=started if started is not None else func.now()
+            ))
+
+        db.commit()
+        print(f"  ✓ Seeded level history for {len(missing)} customer interest rows")
+
+        print()
+        print("=" * 60)
+        print("✓ Migration successful!")
+        print("=" * 60)
+
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print("✗ Migration failed!")
+        print(f"Error: {str(e)}")
+        print("=" * 60)
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
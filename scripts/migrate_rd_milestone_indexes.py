@@ -0,0 +1,59 @@
+"""
+Migration script to add the R&D milestone status index
+Creates the (status, target_date) index used by the milestone analytics
+and overdue scans on existing tables; new databases get it from
+create_all. Safe to run repeatedly.
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine, Base
+from app.models.rd_initiative import RDMilestone
+
+MILESTONE_INDEXES = [index for index in RDMilestone.__table__.indexes if index.name == "ix_rd_milestones_status_target"]
+
+
+def main():
+    """Main migration function"""
+    print("=" * 60)
+    print("R&D Milestone Index Migration")
+    print("=" * 60)
+    print()
+
+    print("Ensuring database tables exist...")
+    Base.metadata.create_all(bind=engine)
+    print("✓ Tables ready")
+    print()
+
+    db = SessionLocal()
+
+    try:
+        connection = db.connection()
+        for index in MILESTONE_INDEXES:
+            index.create(bind=connection, checkfirst=True)
+            print(f"  ✓ {index.name} in place")
+
+        db.commit()
+
+        print()
+        print("=" * 60)
+        print("✓ Migration successful!")
+        print("=" * 60)
+
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print("✗ Migration failed!")
+        print(f"Error: {str(e)}")
+        print("=" * 60)
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
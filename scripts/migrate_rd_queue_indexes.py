@@ -0,0 +1,69 @@
+"""
+Migration script to add the R&D follow-up queue indexes
+Creates partial indexes over open follow-up dates (customer interest, samples,
+contact next actions, milestones) and over the lower-cased owners of open
+contact next actions and milestones on existing tables; new databases get
+them from create_all. Safe to run repeatedly.
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.schema import CreateIndex
+
+from app.database import SessionLocal, engine, Base
+from app.models.rd_initiative import RDCustomerInterest, RDSample, RDContact, RDMilestone
+
+QUEUE_INDEXES = [
+    index
+    for model in (RDCustomerInterest, RDSample, RDContact, RDMilestone)
+    for index in model.__table__.indexes
+    if index.name.endswith(("_open_follow_up", "_open_next_action", "_open_next_action_owner",
+                            "_open_target", "_open_owner"))
+]
+
+
+def main():
+    """Main migration function"""
+    print("=" * 60)
+    print("R&D Follow-Up Queue Index Migration")
+    print("=" * 60)
+    print()
+
+    print("Ensuring database tables exist...")
+    Base.metadata.create_all(bind=engine)
+    print("✓ Tables ready")
+    print()
+
+    db = SessionLocal()
+
+    try:
+        connection = db.connection()
+        for index in QUEUE_INDEXES:
+            # IF NOT EXISTS rather than checkfirst: expression indexes can't be reflected
+            connection.execute(CreateIndex(index, if_not_exists=True))
+            print(f"  ✓ {index.name} in place")
+
+        db.commit()
+
+        print()
+        print("=" * 60)
+        print("✓ Migration successful!")
+        print("=" * 60)
+
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print("✗ Migration failed!")
+        print(f"Error: {str(e)}")
+        print("=" * 60)
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Migration script to add persisted R&D portfolio recommendations
+Creates rd_recommendations and evaluates the decision-guidance rules for
+every initiative. Later API reads only re-evaluate initiatives whose ROI
+inputs changed. Safe to run repeatedly.
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine, Base
+from app.models.rd_initiative import RDRecommendation
+from app.services.rd_portfolio_rules import refresh_recommendations
+
+
+def main():
+    """Main migration function"""
+    print("=" * 60)
+    print("R&D Portfolio Recommendations Migration")
+    print("=" * 60)
+    print()
+
+    print("Ensuring database tables exist...")
+    Base.metadata.create_all(bind=engine)
+    print("✓ Tables ready")
+    print()
+
+    db = SessionLocal()
+
+    try:
+        evaluated = refresh_recommendations(db)
+        print(f"  ✓ Evaluated guidance for {evaluated} initiatives")
+
+        print()
+        print("=" * 60)
+        print("✓ Migration successful!")
+        print("=" * 60)
+
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print("✗ Migration failed!")
+        print(f"Error: {str(e)}")
+        print("=" * 60)
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
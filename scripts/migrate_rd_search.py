@@ -0,0 +1,57 @@
+"""
+Migration script to build the R&D full-text search index
+Creates rd_search_index (an FTS5 table on SQLite, a tsvector + GIN table on
+PostgreSQL) and repopulates it from notes, contacts, customer interest,
+feasibility reviews and samples. Writes keep it in sync afterwards.
+Safe to run repeatedly.
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine, Base
+from app.models.rd_initiative import RDNote, RDContact, RDCustomerInterest, RDFeasibility, RDSample
+from app.services.rd_search import ensure_search_index, rebuild_search_index
+
+
+def main():
+    """Main migration function"""
+    print("=" * 60)
+    print("R&D Full-Text Search Index Migration")
+    print("=" * 60)
+    print()
+
+    print("Ensuring database tables exist...")
+    Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+    print("✓ Tables ready")
+    print()
+
+    db = SessionLocal()
+
+    try:
+        counts = rebuild_search_index(db)
+        for source, count in counts.items():
+            print(f"  ✓ Indexed {count} {source} documents")
+
+        print()
+        print("=" * 60)
+        print("✓ Migration successful!")
+        print("=" * 60)
+
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print("✗ Migration failed!")
+        print(f"Error: {str(e)}")
+        print("=" * 60)
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
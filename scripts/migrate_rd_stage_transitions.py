@@ -0,0 +1,72 @@
+"""
+Migration script to add the R&D stage history table
+Creates rd_stage_transitions and seeds one opening transition (into the
+current stage, dated from start_date or created_at) for every initiative
+that has no history yet. Safe to run repeatedly.
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timezone
+
+from sqlalchemy import func
+
+from app.database import SessionLocal, engine, Base
+from app.models.rd_initiative import RDInitiative, RDStageTransition
+
+
+def main():
+    """Main migration function"""
+    print("=" * 60)
+    print("R&D Stage History Migration")
+    print("=" * 60)
+    print()
+
+    print("Ensuring database tables exist...")
+    Base.metadata.create_all(bind=engine)
+    print("✓ Tables ready")
+    print()
+
+    db = SessionLocal()
+
+    try:
+        missing = db.query(RDInitiative).filter(
+            ~RDInitiative.stage_transitions.any()
+        ).all()
+
+        for initiative in missing:
+            started = initiative.created_at
+            if initiative.start_date:
+                started = datetime.combine(initiative.start_date, datetime.min.time(), tzinfo=timezone.utc)
+            db.add(RDStageTransition(
+                initiative_id=initiative.id,
+                from_stage=None,
+                to_stage=initiative.stage or "feasibility",
+                transitioned_at=started if started is not None else func.now()
+            ))
+
+        db.commit()
+        print(f"  ✓ Seeded stage history for {len(missing)} initiatives")
+
+        print()
+        print("=" * 60)
+        print("✓ Migration successful!")
+        print("=" * 60)
+
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print("✗ Migration failed!")
+        print(f"Error: {str(e)}")
+        print("=" * 60)
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Migration script to add the R&D team indexes
+Creates the person key (lower(trim(person_name))) and department indexes on
+rd_initiative_team used by the team workload endpoint on existing tables;
+new databases get them from create_all. Safe to run repeatedly.
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.schema import CreateIndex
+
+from app.database import SessionLocal, engine, Base
+from app.models.rd_initiative import RDInitiativeTeam
+
+TEAM_INDEXES = list(RDInitiativeTeam.__table__.indexes)
+
+
+def main():
+    """Main migration function"""
+    print("=" * 60)
+    print("R&D Team Index Migration")
+    print("=" * 60)
+    print()
+
+    print("Ensuring database tables exist...")
+    Base.metadata.create_all(bind=engine)
+    print("✓ Tables ready")
+    print()
+
+    db = SessionLocal()
+
+    try:
+        connection = db.connection()
+        for index in TEAM_INDEXES:
+            # IF NOT EXISTS rather than checkfirst: expression indexes can't be reflected
+            connection.execute(CreateIndex(index, if_not_exists=True))
+            print(f"  ✓ {index.name} in place")
+
+        db.commit()
+
+        print()
+        print("=" * 60)
+        print("✓ Migration successful!")
+        print("=" * 60)
+
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print("✗ Migration failed!")
+        print(f"Error: {str(e)}")
+        print("=" * 60)
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Migration script to create the unified spend ledger
+Adds the indexes the ledger's cost center lookups use (the upper(trim())
+code expression on rd_expenses and budget_items.cost_center_id), then
+creates the spend_ledger view: a materialized view with its indexes on
+PostgreSQL, refreshed here once, or a plain view on SQLite.
+Safe to run repeatedly.
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.schema import CreateIndex
+
+from app.database import SessionLocal, engine, Base
+from app.models.budget import BudgetItem
+from app.models.cost_center import CostCenter
+from app.models.expense import ActualExpense
+from app.models.rd_initiative import RDExpense
+from app.services.spend_ledger import LEDGER_VIEW, ensure_spend_ledger, refresh_spend_ledger
+
+LEDGER_INDEXES = [
+    index for index in list(RDExpense.__table__.indexes) + list(BudgetItem.__table__.indexes)
+    if index.name in ("ix_rd_expenses_cost_center_key", "ix_budget_items_cost_center_id")
+]
+
+
+def main():
+    """Main migration function"""
+    print("=" * 60)
+    print("Spend Ledger Migration")
+    print("=" * 60)
+    print()
+
+    print("Ensuring database tables exist...")
+    Base.metadata.create_all(bind=engine)
+    print("✓ Tables ready")
+    print()
+
+    db = SessionLocal()
+
+    try:
+        connection = db.connection()
+        for index in LEDGER_INDEXES:
+            # IF NOT EXISTS rather than checkfirst: expression indexes can't be reflected
+            connection.execute(CreateIndex(index, if_not_exists=True))
+            print(f"  ✓ {index.name} in place")
+        db.commit()
+
+        ensure_spend_ledger(engine)
+        print(f"  ✓ {LEDGER_VIEW} view in place")
+        if refresh_spend_ledger(db, force=True):
+            print(f"  ✓ {LEDGER_VIEW} refreshed")
+
+        print()
+        print("=" * 60)
+        print("✓ Migration successful!")
+        print("=" * 60)
+
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print("✗ Migration failed!")
+        print(f"Error: {str(e)}")
+        print("=" * 60)
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
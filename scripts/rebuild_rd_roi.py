@@ -0,0 +1,75 @@
+"""
+Rebuild the R&D ROI summary table from scratch
+Recomputes every initiative's RDROI row from rd_expenses, rd_revenue and
+rd_samples and reports any drift from the incrementally maintained values.
+Also backfills rows for initiatives that predate incremental maintenance.
+
+Usage: python scripts/rebuild_rd_roi.py [--dry-run] [--initiative ID]
+Safe to run repeatedly.
+"""
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine, Base
+from app.models.rd_initiative import RDROI
+from app.crud.rd_roi import rebuild_roi
+
+
+def main():
+    """Main rebuild function"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Report drift without fixing it")
+    parser.add_argument("--initiative", type=int, default=None, help="Only rebuild this initiative")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("R&D ROI Summary Rebuild" + (" (dry run)" if args.dry_run else ""))
+    print("=" * 60)
+    print()
+
+    print("Ensuring database tables exist...")
+    Base.metadata.create_all(bind=engine)
+    print("✓ Tables ready")
+    print()
+
+    db = SessionLocal()
+
+    try:
+        drift = rebuild_roi(db, initiative_id=args.initiative, dry_run=args.dry_run)
+
+        for entry in drift:
+            if entry["missing_row"]:
+                print(f"  • Initiative {entry['initiative_id']}: no ROI row")
+                continue
+            fields = ", ".join(
+                f"{name} {values['stored']} → {values['expected']}"
+                for name, values in entry["fields"].items()
+            )
+            print(f"  • Initiative {entry['initiative_id']}: {fields}")
+
+        print(f"  ✓ {db.query(RDROI).count()} ROI rows checked, {len(drift)} drifted"
+              + ("" if args.dry_run else " and corrected"))
+
+        print()
+        print("=" * 60)
+        print("✓ Rebuild successful!")
+        print("=" * 60)
+
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print("✗ Rebuild failed!")
+        print(f"Error: {str(e)}")
+        print("=" * 60)
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy import text
 from app.database import SessionLocal, engine, Base
+from app.services.rd_search import ensure_search_index
+from app.services.spend_ledger import ensure_spend_ledger
 
 # Import all R&D models so Base.metadata knows about them
 from app.models.rd_initiative import (
@@ -23,10 +25,15 @@ from app.models.rd_initiative import (
     RDExpense,
     RDRevenue,
     RDNote,
+    RDStageTransition,
+    RDRecommendation,
 )
 
 # Drop order matters — child tables (with FKs) must be dropped before parents
 TABLES_TO_DROP = [
+    "rd_search_index",
+    "rd_recommendations",
+    "rd_stage_transitions",
     "rd_notes",
     "rd_revenue",
     "rd_expenses",
@@ -69,6 +76,9 @@ def reset_rd_tables():
 
         print("Creating tables with new schema...")
         Base.metadata.create_all(bind=engine)
+        ensure_search_index(engine)
+        # Dropping rd_expenses CASCADE takes the spend ledger view with it
+        ensure_spend_ledger(engine)
         print("✓ All tables created")
         print()
 
@@ -86,6 +96,9 @@ def reset_rd_tables():
             "rd_expenses",
             "rd_revenue",
             "rd_notes",
+            "rd_search_index",
+            "rd_stage_transitions",
+            "rd_recommendations",
         ]
         for table in expected_tables:
             result = db.execute(
@@ -0,0 +1,89 @@
+"""
+Change-aware section cache for Streamlit pages
+
+Instead of refetching every endpoint on each rerun, a page section asks the
+API's cheap /api/events/changes feed whether any of the entities it depends
+on changed since it was last fetched, and only refetches when they did.
+Collections that support ?updated_since= are instead kept as a local copy
+that each rerun patches with the rows changed and deleted since last time.
+"""
+import streamlit as st
+import requests
+
+# Watermark for a first sync: every row has changed since then
+EPOCH = "1970-01-01T00:00:00"
+
+
+def get_changes(api_url: str, since: int):
+    """Fetch the change summary after a version, or None if the API is unreachable"""
+    try:
+        response = requests.get(f"{api_url}/api/events/changes", params={"since": since}, timeout=5)
+        if response.status_code == 200:
+            return response.json()
+    except Exception:
+        pass
+    return None
+
+
+def cached_section(key: str, entities: set, fetch, api_url: str):
+    """
+    Return a section's data, refetching only if its entities changed
+
+    Args:
+        key: Unique cache key for the section (include any parameters, e.g. month)
+        entities: Entity names the section depends on, e.g. {"kpi_snapshot"}
+        fetch: Zero-argument callable that loads the section's data
+        api_url: FastAPI base URL
+    """
+    cache = st.session_state.setdefault("_live_sections", {})
+    entry = cache.get(key)
+    changes = get_changes(api_url, entry["version"] if entry else 0)
+
+    if entry is not None and changes is not None and not changes["reset"]:
+        if not set(entities) & set(changes["entities"]):
+            return entry["data"]
+
+    # The version is read before fetching, so anything written in between
+    # simply triggers one more refetch on the next rerun
+    data = fetch()
+    if changes is not None:
+        cache[key] = {"version": changes["version"], "data": data}
+    else:
+        cache.pop(key, None)
+    return data
+
+
+
+def synced_collection(key: str, endpoint: str, api_url: str) -> list:
+    """
+    Return a collection's rows, downloading only what changed since the last rerun
+
+    Args:
+        key: Unique cache key for the collection
+        endpoint: Collection path accepting updated_since/include_deleted, e.g. "/api/campaigns/"
+        api_url: FastAPI base URL
+    """
+    cache = st.session_state.setdefault("_synced_collections", {})
+    entry = cache.get(key)
+
+    for _ in range(2):
+        params = {"updated_since": entry["watermark"], "include_deleted": "true"} if entry else {"updated_since": EPOCH}
+        try:
+            response = requests.get(f"{api_url}{endpoint}", params=params, timeout=10)
+            response.raise_for_status()
+            delta = response.json()
+        except Exception:
+            return sorted(entry["rows"].values(), key=lambda row: row["id"]) if entry else []
+        if not delta["reset"]:
+            break
+        # Too far behind for the server's tombstones: start over with a full copy
+        entry = None
+
+    rows = dict(entry["rows"]) if entry else {}
+    # Deletes first, so an id that was deleted and reused ends up as the new row
+    for record_id in delta["deleted"]:
+        rows.pop(record_id, None)
+    for row in delta["items"]:
+        rows[row["id"]] = row
+    cache[key] = {"watermark": delta["watermark"], "rows": rows}
+    return sorted(rows.values(), key=lambda row: row["id"])
@@ -0,0 +1,27 @@
+"""
+DataFrames from the API's tabular endpoints
+
+Asks for an Arrow IPC stream and decodes it straight into a DataFrame, so
+columns arrive typed (floats, dates, timestamps) with no JSON parsing or
+per-row dicts. Falls back to JSON if the API answers with it.
+"""
+import pandas as pd
+import pyarrow as pa
+import requests
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+
+def get_frame(api_url: str, endpoint: str, params: dict = None) -> pd.DataFrame:
+    """GET a tabular endpoint as a DataFrame (empty if the request fails)"""
+    try:
+        response = requests.get(
+            f"{api_url}{endpoint}", params=params, headers={"Accept": ARROW_STREAM}, timeout=30
+        )
+        if response.status_code != 200:
+            return pd.DataFrame()
+        if response.headers.get("content-type", "").startswith(ARROW_STREAM):
+            return pa.ipc.open_stream(response.content).read_pandas()
+        return pd.DataFrame(response.json())
+    except Exception:
+        return pd.DataFrame()
@@ -1,12 +1,16 @@
 import streamlit as st
 import requests
 import pandas as pd
+import numpy as np
 from datetime import date, datetime
 import plotly.express as px
 import plotly.graph_objects as go
 from calendar import month_name
 import os
 
+from components.live_updates import synced_collection
+from components.tabular import get_frame
+
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
 
 st.set_page_config(page_title="Marketing Budget Management", page_icon="💼", layout="wide")
@@ -16,7 +20,7 @@ st.title("💼 Marketing Budget Management System")
 page = st.sidebar.selectbox(
     "Navigate to:",
     ["Getting Started", "Dashboard", "Marketing Plan 2026", "KPI Dashboard", "Budget Structure", "Budget Items", "Expenses", 
-     "Budget vs Actual", "ROI Tracking", "Cost Centers"]
+     "Budget vs Actual", "Spend Pivot", "ROI Tracking", "Cost Centers"]
 )
 
 # API Helper Functions
@@ -26,6 +30,10 @@ def api_get(endpoint):
         return response.json() if response.status_code == 200 else []
     except: return []
 
+def get_campaigns():
+    """All campaigns, patched in place from the API's delta feed"""
+    return synced_collection("campaigns", "/api/campaigns/", API_BASE_URL)
+
 def api_post(endpoint, data):
     try:
         response = requests.post(f"{API_BASE_URL}{endpoint}", json=data)
@@ -184,47 +192,71 @@ if page == "Getting Started":
 elif page == "Dashboard":
     st.header("Dashboard Overview")
     
-    campaigns = api_get("/api/campaigns/")
-    budget_items = api_get("/api/budgets/with-relations")
-    expenses = api_get("/api/expenses/with-details")
+    campaigns = get_campaigns()
+    budget_items = get_frame(API_BASE_URL, "/api/budgets/with-relations")
+    expenses = get_frame(API_BASE_URL, "/api/expenses/with-details")
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         st.metric("Campaigns", len(campaigns))
     with col2:
-        total_budget = sum(b.get('total_budget', 0) for b in budget_items)
+        total_budget = budget_items['total_budget'].sum() if not budget_items.empty else 0
         st.metric("Total Budget", f"${total_budget:,.0f}")
     with col3:
-        total_spent = sum(e.get('amount', 0) for e in expenses)
+        total_spent = expenses['amount'].sum() if not expenses.empty else 0
         st.metric("Total Spent", f"${total_spent:,.0f}")
     with col4:
         variance = total_spent - total_budget
         st.metric("Variance", f"${variance:,.0f}", 
                  delta=f"{(variance/total_budget*100):.1f}%" if total_budget > 0 else "0%")
     
-    if budget_items:
+    if not budget_items.empty:
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Budget by Category")
-            cat_budget = {}
-            for item in budget_items:
-                cat = item.get('category', 'Other')
-                cat_budget[cat] = cat_budget.get(cat, 0) + item.get('total_budget', 0)
+            cat_budget = budget_items.fillna({'category': 'Other'}).groupby('category')['total_budget'].sum()
             
-            fig = px.pie(values=list(cat_budget.values()), names=list(cat_budget.keys()))
+            fig = px.pie(values=cat_budget.values, names=cat_budget.index)
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
             st.subheader("Spending by Category")
-            cat_actual = {}
-            for exp in expenses:
-                cat = exp.get('category', 'Other')
-                cat_actual[cat] = cat_actual.get(cat, 0) + exp.get('amount', 0)
+            if not expenses.empty:
+                cat_actual = expenses.fillna({'category': 'Other'}).groupby('category')['amount'].sum()
+                fig = px.pie(values=cat_actual.values, names=cat_actual.index)
+                st.plotly_chart(fig, use_container_width=True)
+        
+        st.subheader(f"{date.today().year} Year-End Forecast")
+        forecast = api_get(f"/api/forecast/{date.today().year}?include_items=false")
+        if forecast:
+            totals = forecast['totals']
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Monthly Run-Rate", f"${totals['run_rate']:,.0f}")
+            with col2:
+                st.metric("Straight-Line Projection", f"${totals['projected_straight_line']:,.0f}")
+            with col3:
+                st.metric("Seasonality-Adjusted Projection", f"${totals['projected_year_end']:,.0f}")
+            with col4:
+                st.metric("Projected Over/Under", f"${totals['projected_variance']:,.0f}",
+                         delta=f"{totals['projected_variance_pct']:.1f}%", delta_color="inverse")
             
-            fig = px.pie(values=list(cat_actual.values()), names=list(cat_actual.keys()))
+            months = [month_name[m][:3] for m in range(1, 13)]
+            fig = go.Figure()
+            fig.add_trace(go.Bar(x=months, y=forecast['monthly']['plan'], name='Plan'))
+            fig.add_trace(go.Bar(x=months, y=forecast['monthly']['actual'], name='Actual'))
+            fig.update_layout(barmode='group', height=350)
             st.plotly_chart(fig, use_container_width=True)
+            
+            if forecast['campaigns']:
+                df = pd.DataFrame(forecast['campaigns'])[[
+                    'campaign_name', 'total_budget', 'actual_to_date',
+                    'projected_year_end', 'projected_variance', 'status'
+                ]]
+                df.columns = ['Campaign', 'Budget', 'Spent to Date', 'Projected', 'Over/Under', 'Status']
+                st.dataframe(df, use_container_width=True, hide_index=True)
 
 # Marketing Plan 2026 Page   
 elif page == "Marketing Plan 2026":
@@ -242,7 +274,7 @@ elif page == "Budget Structure":
     
     tab1, tab2, tab3 = st.tabs(["📊 Card View", "📋 List View", "➕ Create New"])
     
-    campaigns = api_get("/api/campaigns/")
+    campaigns = get_campaigns()
     
     # ========================================
     # TAB 1: CARD VIEW - Hierarchical Display
@@ -977,7 +1009,7 @@ elif page == "Budget Items":
             st.info("No budget items found")
     
     with tab2:
-        campaigns = api_get("/api/campaigns/")
+        campaigns = get_campaigns()
         cost_centers = api_get("/api/cost-centers/active")
         
         if campaigns and cost_centers:
@@ -1141,75 +1173,115 @@ elif page == "Budget vs Actual":
         selected_month = st.selectbox("Month", range(1, 13), 
                                      format_func=lambda x: month_name[x])
     
-    budget_items = api_get("/api/budgets/with-relations")
+    # One row per budget item, computed by the API in a single query
+    report = get_frame(API_BASE_URL, "/api/expenses/variance", {"year": selected_year, "month": selected_month})
     
-    if budget_items:
-        variance_data = []
+    if not report.empty:
+        df = report[['budget_item_name', 'campaign_name', 'category', 'budgeted', 'actual', 'variance', 'variance_percentage']]
+        df.columns = ['Budget Item', 'Campaign', 'Category', 'Budgeted', 'Actual', 'Variance', 'Variance %']
+        df = df.fillna({'Campaign': 'N/A'})
+        df = df.assign(Status=np.select([df['Variance'] > 0, df['Variance'] < 0], ["Over", "Under"], "On Track"))
         
-        for item in budget_items:
-            monthly_budget = 0.0
-            if item.get('monthly_budget') and str(selected_month) in item['monthly_budget']:
-                monthly_budget = float(item['monthly_budget'][str(selected_month)])
-            
-            expenses = api_get(f"/api/expenses/month/{selected_year}/{selected_month}")
-            item_expenses = [e for e in expenses if e.get('budget_item_id') == item['id']]
-            actual = sum(e.get('amount', 0) for e in item_expenses)
-            
-            variance = actual - monthly_budget
-            variance_pct = (variance / monthly_budget * 100) if monthly_budget > 0 else 0
-            
-            variance_data.append({
-                "Budget Item": item['name'],
-                "Campaign": item.get('campaign_name', 'N/A'),
-                "Category": item['category'],
-                "Budgeted": monthly_budget,
-                "Actual": actual,
-                "Variance": variance,
-                "Variance %": variance_pct,
-                "Status": "Over" if variance > 0 else "Under" if variance < 0 else "On Track"
-            })
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Total Budgeted", f"${df['Budgeted'].sum():,.0f}")
+        with col2:
+            st.metric("Total Actual", f"${df['Actual'].sum():,.0f}")
+        with col3:
+            total_var = df['Variance'].sum()
+            st.metric("Total Variance", f"${total_var:,.0f}")
+        with col4:
+            over_budget = len(df[df['Variance'] > 0])
+            st.metric("Items Over Budget", over_budget)
+        
+        st.subheader("Variance by Budget Item")
+        fig = px.bar(df, x='Budget Item', y='Variance', color='Status',
+                    color_discrete_map={"Over": "#ff4b4b", "Under": "#00cc00", "On Track": "#0068c9"})
+        st.plotly_chart(fig, use_container_width=True)
+        
+        st.subheader("Detailed Variance Report")
+        # Formatting is applied at render time; the columns stay numeric
+        styled = df.style.format({
+            'Budgeted': "${:,.2f}", 'Actual': "${:,.2f}", 'Variance': "${:,.2f}", 'Variance %': "{:.1f}%"
+        })
+        st.dataframe(styled, use_container_width=True)
+
+# Spend Pivot Page
+elif page == "Spend Pivot":
+    st.header("Spend Pivot")
+    st.caption("Actual spend sliced by any dimensions; totals and subtotals are computed by the database")
+    
+    dimensions = {
+        "campaign": "Campaign", "category": "Category", "budget_item": "Budget Item",
+        "cost_center": "Cost Center", "department": "Department", "vendor": "Vendor",
+        "payment_method": "Payment Method", "year": "Year", "quarter": "Quarter", "month": "Month"
+    }
+    measures = {"amount": "Total Spend", "count": "Expense Count", "average": "Average Expense"}
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        pivot_rows = st.multiselect("Rows", list(dimensions), default=["campaign", "category"],
+                                    format_func=lambda d: dimensions[d])
+    with col2:
+        pivot_cols = st.multiselect("Columns", [d for d in dimensions if d not in pivot_rows], default=["quarter"],
+                                    format_func=lambda d: dimensions[d])
+    with col3:
+        measure = st.selectbox("Measure", list(measures), format_func=lambda m: measures[m])
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        start_date = st.date_input("From", value=date(date.today().year, 1, 1))
+    with col2:
+        end_date = st.date_input("To", value=date.today())
+    
+    if not pivot_rows:
+        st.info("Choose at least one row dimension")
+    else:
+        params = "&".join([f"rows={d}" for d in pivot_rows] + [f"cols={d}" for d in pivot_cols])
+        pivot = api_get(f"/api/analytics/pivot?{params}&measure={measure}&start_date={start_date}&end_date={end_date}")
         
-        if variance_data:
-            df = pd.DataFrame(variance_data)
+        if not pivot or not pivot.get('data'):
+            st.info("No expenses match this selection")
+        else:
+            # Subtotal keys come back as null; label them and keep the server's ordering
+            def labels(keys):
+                return tuple("Total" if k is None else str(k) for k in keys)
             
-            col1, col2, col3, col4 = st.columns(4)
+            if pivot_cols:
+                columns = pd.MultiIndex.from_tuples([labels(c['keys']) for c in pivot['columns']],
+                                                    names=[dimensions[d] for d in pivot_cols])
+            else:
+                columns = [measures[measure]]
+            index = pd.MultiIndex.from_tuples([labels(r['keys']) for r in pivot['data']],
+                                              names=[dimensions[d] for d in pivot_rows])
+            df = pd.DataFrame([r['values'] for r in pivot['data']], index=index, columns=columns)
+            
+            grand_total = pivot['data'][-1]['values'][-1]
+            col1, col2 = st.columns(2)
             with col1:
-                st.metric("Total Budgeted", f"${df['Budgeted'].sum():,.0f}")
+                st.metric(measures[measure], f"{grand_total:,.0f}" if measure == "count" else f"${grand_total:,.2f}")
             with col2:
-                st.metric("Total Actual", f"${df['Actual'].sum():,.0f}")
-            with col3:
-                total_var = df['Variance'].sum()
-                st.metric("Total Variance", f"${total_var:,.0f}")
-            with col4:
-                over_budget = len(df[df['Variance'] > 0])
-                st.metric("Items Over Budget", over_budget)
-            
-            st.subheader("Variance by Budget Item")
-            fig = px.bar(df, x='Budget Item', y='Variance', color='Status',
-                        color_discrete_map={"Over": "#ff4b4b", "Under": "#00cc00", "On Track": "#0068c9"})
-            st.plotly_chart(fig, use_container_width=True)
+                st.metric("Expenses", f"{pivot['expenses']:,}")
             
-            st.subheader("Detailed Variance Report")
-            for col in ['Budgeted', 'Actual', 'Variance']:
-                df[col] = df[col].apply(lambda x: f"${x:,.2f}")
-            df['Variance %'] = df['Variance %'].apply(lambda x: f"{x:.1f}%")
-            
-            st.dataframe(df, use_container_width=True)
+            number_format = "{:,.0f}" if measure == "count" else "${:,.2f}"
+            subtotal = [r['level'] > 0 for r in pivot['data']]
+            styled = df.style.format(number_format, na_rep="").apply(
+                lambda column: ["font-weight: bold" if is_subtotal else "" for is_subtotal in subtotal]
+            )
+            st.dataframe(styled, use_container_width=True)
 
 # ROI Tracking Page
 elif page == "ROI Tracking":
     st.header("ROI Tracking & Campaign Performance")
     
-    tab1, tab2 = st.tabs(["View & Manage ROI", "Record New ROI"])
+    tab1, tab2, tab3 = st.tabs(["View & Manage ROI", "Record New ROI", "Import Attribution"])
     
     with tab1:
-        roi_metrics = api_get("/api/roi/with-campaign")
+        df = get_frame(API_BASE_URL, "/api/roi/with-campaign")
         
-        if roi_metrics:
+        if not df.empty:
             st.subheader("ROI Performance Summary")
             
-            df = pd.DataFrame(roi_metrics)
-            
             col1, col2, col3, col4 = st.columns(4)
             with col1:
                 total_cost = df['total_cost'].sum()
@@ -1232,38 +1304,38 @@ elif page == "ROI Tracking":
             st.plotly_chart(fig, use_container_width=True)
             
             st.subheader("ROI Metrics Details")
-            for roi in roi_metrics:
+            for roi in df.itertuples(index=False):
                 col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
                 
                 with col1:
-                    st.write(f"**{roi.get('campaign_name', 'N/A')}** - ROI: {roi.get('roi_percentage', 0):.1f}%")
-                    st.caption(f"Cost: ${roi['total_cost']:,.0f} | Revenue: ${roi['revenue_attributed']:,.0f} | {roi['period_start']} to {roi['period_end']}")
+                    st.write(f"**{roi.campaign_name}** - ROI: {roi.roi_percentage:.1f}%")
+                    st.caption(f"Cost: ${roi.total_cost:,.0f} | Revenue: ${roi.revenue_attributed:,.0f} | {roi.period_start} to {roi.period_end}")
                 
                 with col2:
                     st.write("")
                 
                 with col3:
-                    if st.button("Edit", key=f"edit_roi_{roi['id']}"):
-                        st.session_state[f'editing_roi_{roi["id"]}'] = True
+                    if st.button("Edit", key=f"edit_roi_{roi.id}"):
+                        st.session_state[f'editing_roi_{roi.id}'] = True
                 
                 with col4:
-                    if st.button("Delete", key=f"del_roi_{roi['id']}"):
-                        if api_delete(f"/api/roi/{roi['id']}"):
+                    if st.button("Delete", key=f"del_roi_{roi.id}"):
+                        if api_delete(f"/api/roi/{roi.id}"):
                             st.success("Deleted!")
                             st.rerun()
                         else:
                             st.error("Delete failed")
                 
-                if st.session_state.get(f'editing_roi_{roi["id"]}'):
-                    with st.form(key=f"edit_form_roi_{roi['id']}"):
-                        st.subheader(f"Edit ROI: {roi.get('campaign_name', 'N/A')}")
+                if st.session_state.get(f'editing_roi_{roi.id}'):
+                    with st.form(key=f"edit_form_roi_{roi.id}"):
+                        st.subheader(f"Edit ROI: {roi.campaign_name}")
                         
                         col1, col2 = st.columns(2)
                         with col1:
-                            new_cost = st.number_input("Total Cost ($)", value=float(roi['total_cost']), format="%.2f")
-                            new_revenue = st.number_input("Revenue ($)", value=float(roi['revenue_attributed']), format="%.2f")
+                            new_cost = st.number_input("Total Cost ($)", value=float(roi.total_cost), format="%.2f")
+                            new_revenue = st.number_input("Revenue ($)", value=float(roi.revenue_attributed), format="%.2f")
                         with col2:
-                            new_notes = st.text_area("Notes", value=roi.get('attribution_notes', ''))
+                            new_notes = st.text_area("Notes", value=roi.attribution_notes or '')
                         
                         col_save, col_cancel = st.columns(2)
                         with col_save:
@@ -1273,16 +1345,16 @@ elif page == "ROI Tracking":
                                     "revenue_attributed": float(new_revenue),
                                     "attribution_notes": new_notes
                                 }
-                                if api_put(f"/api/roi/{roi['id']}", update_data):
+                                if api_put(f"/api/roi/{roi.id}", update_data):
                                     st.success("Updated!")
-                                    del st.session_state[f'editing_roi_{roi["id"]}']
+                                    del st.session_state[f'editing_roi_{roi.id}']
                                     st.rerun()
                                 else:
                                     st.error("Update failed")
                         
                         with col_cancel:
                             if st.form_submit_button("Cancel"):
-                                del st.session_state[f'editing_roi_{roi["id"]}']
+                                del st.session_state[f'editing_roi_{roi.id}']
                                 st.rerun()
                     
                     st.markdown("---")
@@ -1290,7 +1362,7 @@ elif page == "ROI Tracking":
             st.info("No ROI metrics recorded yet")
     
     with tab2:
-        campaigns = api_get("/api/campaigns/")
+        campaigns = get_campaigns()
         
         if campaigns:
             with st.form("record_roi"):
@@ -1352,6 +1424,54 @@ elif page == "ROI Tracking":
                             st.error("Failed to record ROI")
         else:
             st.warning("Create campaigns first")
+    
+    with tab3:
+        st.subheader("Multi-Touch Attribution Import")
+        st.caption("Upload a touchpoint export (CSV) with deal_id, campaign_id, touch_date, deal_amount "
+                   "and optionally close_date. HubSpot export headers (Deal ID, Campaign ID, Amount, Close Date) work too.")
+        
+        with st.form("import_attribution"):
+            upload = st.file_uploader("Touchpoint file", type=["csv"])
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                use_period = st.checkbox("Limit to close dates in a period")
+                period_start = st.date_input("Period Start", value=date(date.today().year, 1, 1))
+                period_end = st.date_input("Period End", value=date.today())
+            with col2:
+                methods = st.multiselect("Attribution Methods",
+                                         ["first_touch", "last_touch", "linear", "time_decay", "position_based"],
+                                         default=["first_touch", "last_touch", "linear", "time_decay", "position_based"])
+            with col3:
+                half_life = st.number_input("Time-Decay Half-Life (days)", 1.0, 365.0, 7.0)
+                stored_method = st.selectbox("Store as ROI Metric",
+                                             ["last_touch", "first_touch", "linear", "time_decay", "position_based"],
+                                             help="Only this method's revenue is saved; the others are shown for comparison")
+            
+            if st.form_submit_button("Run Attribution"):
+                if not upload:
+                    st.error("Choose a file to import")
+                elif not methods:
+                    st.error("Select at least one attribution method")
+                else:
+                    params = {"methods": methods, "half_life_days": half_life, "stored_method": stored_method}
+                    if use_period:
+                        params.update(period_start=period_start.isoformat(), period_end=period_end.isoformat())
+                    try:
+                        response = requests.post(f"{API_BASE_URL}/api/roi/attribution/import", params=params,
+                                                 files={"file": (upload.name, upload.getvalue(), "text/csv")})
+                        if response.status_code == 200:
+                            result = response.json()
+                            st.success(f"Attributed {result['deals']:,} deals across {result['campaigns']} campaigns "
+                                       f"({result['touchpoints']:,} touchpoints, {result['metrics_written']} {result['stored_method']} ROI rows)")
+                            campaign_names = {c['id']: c['name'] for c in get_campaigns()}
+                            df = pd.DataFrame.from_dict(result['revenue_by_campaign'], orient='index')
+                            df.index = [campaign_names.get(int(i), i) for i in df.index]
+                            st.dataframe(df.style.format("${:,.0f}"), use_container_width=True)
+                        else:
+                            st.error(response.json().get('detail', 'Import failed'))
+                    except Exception as e:
+                        st.error(f"Import failed: {e}")
 
 # Cost Centers Page
 elif page == "Cost Centers":
@@ -1376,9 +1496,13 @@ elif page == "Cost Centers":
                 
                 with col3:
                     if st.button("Delete", key=f"del_cc_{cc['id']}"):
-                        budget_items = api_get(f"/api/budgets/cost-center/{cc['id']}")
-                        if budget_items:
-                            st.error(f"Cannot delete: Has {len(budget_items)} budget items")
+                        usage = api_get(f"/api/cost-centers/{cc['id']}/usage")
+                        if not usage:
+                            st.error("Could not check whether the cost center is in use")
+                        elif usage['budget_items']:
+                            st.error("Cannot delete: Has budget items")
+                        elif usage['rd_expenses']:
+                            st.error("Cannot delete: R&D expenses are coded to it")
                         elif api_delete(f"/api/cost-centers/{cc['id']}"):
                             st.success("Cost center deactivated!")
                             st.rerun()
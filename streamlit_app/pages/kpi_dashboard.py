@@ -5,6 +5,9 @@ from datetime import date, datetime, timedelta
 import plotly.graph_objects as go
 import os
 
+from components.live_updates import cached_section
+from components.tabular import get_frame
+
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
 
 def api_get(endpoint):
@@ -98,7 +101,10 @@ def show():
     tab1, tab2, tab3 = st.tabs(["📈 Dashboard", "📝 Log Data", "⚙️ Manage Metrics"])
     
     # Get all dashboard data
-    dashboard_data = api_get("/api/kpi/dashboard/summary")
+    dashboard_data = cached_section(
+        "kpi_dashboard_summary", {"kpi_metric", "kpi_snapshot"},
+        lambda: api_get("/api/kpi/dashboard/summary"), API_BASE_URL
+    )
     
    # ==========================================
     # TAB 1: DASHBOARD VIEW
@@ -149,12 +155,10 @@ def show():
                         alerts.append("🟡 Email open rate below 15% - Review subject lines and send times")
                 
                 if metric['name'] == 'Website Traffic' and current_value:
-                    # Check if we have at least 3 months of data to detect decline
-                    monthly_hist = item['monthly_history']
-                    if len(monthly_hist) >= 3:
-                        recent_values = [h['actual_value'] for h in monthly_hist[:3]]
-                        if all(recent_values[i] > recent_values[i+1] for i in range(len(recent_values)-1)):
-                            alerts.append("🟢 Traffic declining for 2-3 months - Review SEO and content")
+                    # Monthly series (weekly data resampled where months weren't logged)
+                    analytics = api_get(f"/api/kpi/metrics/{metric['id']}/analytics")
+                    if analytics and analytics['monthly']['declining_periods'] >= 2:
+                        alerts.append("🟢 Traffic declining for 2-3 months - Review SEO and content")
             
             if alerts:
                 for alert in alerts:
@@ -366,10 +370,9 @@ def show():
             st.markdown("#### Recent Entries")
             
             if selected_metric:
-                recent_snapshots = api_get(f"/api/kpi/snapshots/metric/{selected_metric['id']}?limit=10")
+                df = get_frame(API_BASE_URL, f"/api/kpi/snapshots/metric/{selected_metric['id']}", {"limit": 10})
                 
-                if recent_snapshots:
-                    df = pd.DataFrame(recent_snapshots)
+                if not df.empty:
                     df['snapshot_date'] = pd.to_datetime(df['snapshot_date']).dt.strftime('%Y-%m-%d')
                     df = df[['snapshot_date', 'snapshot_type', 'actual_value', 'notes']]
                     df.columns = ['Date', 'Type', 'Value', 'Notes']
@@ -4,6 +4,8 @@ import calendar
 import requests
 import os
 
+from components.live_updates import cached_section
+
 # API base URL - use Render API URL in production, localhost in development
 API_URL = os.getenv("API_URL", "https://marketing-budget-api.onrender.com")
 
@@ -615,7 +617,10 @@ def show():
         st.markdown("#### Year Overview - Major Milestones")
         
         # Fetch all calendars for the year
-        all_calendars = get_all_calendars(2026)
+        all_calendars = cached_section(
+            "calendars_2026", {"marketing_calendar"},
+            lambda: get_all_calendars(2026), API_URL
+        )
         
         if all_calendars:
             # Group by quarter
@@ -673,7 +678,10 @@ def show():
             st.session_state.selected_month = selected_month
         
         # Fetch calendar data for selected month
-        calendar_data = get_calendar_with_activities(2026, selected_month)
+        calendar_data = cached_section(
+            f"calendar_2026_{selected_month}", {"marketing_calendar", "marketing_activity"},
+            lambda: get_calendar_with_activities(2026, selected_month), API_URL
+        )
         
         if not calendar_data:
             st.warning(f"No calendar data found for {month_names[selected_month-1]} 2026")
@@ -3,6 +3,7 @@ import requests
 from datetime import date, datetime
 import pandas as pd
 import os
+from urllib.parse import urlencode
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -54,6 +55,19 @@ def api_get(endpoint):
         return None
 
 
+def api_get_optional(endpoint):
+    """Make GET request to API, returning None when the record doesn't exist"""
+    try:
+        response = requests.get(f"{API_BASE_URL}{endpoint}")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        st.error(f"API Error: {str(e)}")
+        return None
+
+
 def api_post(endpoint, data):
     """Make POST request to API"""
     try:
@@ -255,7 +269,8 @@ if st.session_state['view_mode'] == 'detail' and st.session_state['selected_init
             "🎯 Customers", 
             "🧪 Samples", 
             "💰 Financials",
-            "📅 Milestones"
+            "📅 Milestones",
+            "🕒 Activity"
         ])
         
         # TAB: Overview
@@ -572,12 +587,11 @@ if st.session_state['view_mode'] == 'detail' and st.session_state['selected_init
             expenses = api_get(f"/api/rd/expenses/initiative/{initiative_id}")
             revenue = api_get(f"/api/rd/revenue/initiative/{initiative_id}")
             
-            # Get totals
-            total_exp_data = api_get(f"/api/rd/expenses/initiative/{initiative_id}/total")
-            total_rev_data = api_get(f"/api/rd/revenue/initiative/{initiative_id}/total")
+            # Get totals (maintained ROI row; none yet means nothing recorded)
+            roi_data = api_get_optional(f"/api/rd/roi/initiative/{initiative_id}")
             
-            total_expenses = total_exp_data.get('total_expenses', 0) if total_exp_data else 0
-            total_revenue = total_rev_data.get('total_revenue', 0) if total_rev_data else 0
+            total_expenses = roi_data.get('total_investment', 0) if roi_data else 0
+            total_revenue = roi_data.get('total_revenue', 0) if roi_data else 0
             net_profit = total_revenue - total_expenses
             roi = ((net_profit / total_expenses) * 100) if total_expenses > 0 else 0
             
@@ -769,6 +783,50 @@ if st.session_state['view_mode'] == 'detail' and st.session_state['selected_init
                                 st.success("Milestone added!")
                                 st.rerun()
 
+        # TAB: Activity feed (newest first, 50 events per page)
+        with detail_tabs[7]:
+            st.write("")  # Spacing
+            
+            feed_key = f"feed_{initiative_id}"
+            if feed_key not in st.session_state:
+                first_page = api_get(f"/api/rd/initiatives/{initiative_id}/feed?limit=50") or {}
+                st.session_state[feed_key] = {
+                    'events': first_page.get('events', []),
+                    'cursor': first_page.get('next_cursor')
+                }
+            feed = st.session_state[feed_key]
+            
+            kind_icons = {
+                'note': '📝', 'contact': '📞', 'milestone': '📅',
+                'sample': '🧪', 'expense': '💸', 'revenue': '💰'
+            }
+            
+            if feed['events']:
+                for event in feed['events']:
+                    icon = kind_icons.get(event['kind'], '•')
+                    line = f"{icon} **{event['event_date']}** · {format_display_value(event['kind'])} · {event['title'] or ''}"
+                    if event.get('amount'):
+                        line += f" · ${event['amount']:,.2f}"
+                    if event.get('actor'):
+                        line += f" · _{event['actor']}_"
+                    st.markdown(line)
+                    if event.get('detail'):
+                        st.caption(event['detail'])
+                
+                col1, col2 = st.columns([1, 4])
+                with col1:
+                    if feed['cursor'] and st.button("Load more", key=f"feed_more_{initiative_id}"):
+                        more = api_get(f"/api/rd/initiatives/{initiative_id}/feed?limit=50&cursor={feed['cursor']}") or {}
+                        feed['events'].extend(more.get('events', []))
+                        feed['cursor'] = more.get('next_cursor')
+                        st.rerun()
+                with col2:
+                    if st.button("🔄 Refresh", key=f"feed_refresh_{initiative_id}"):
+                        del st.session_state[feed_key]
+                        st.rerun()
+            else:
+                st.info("No activity recorded yet")
+
 # ===================
 # LIST VIEW MODE
 # ===================
@@ -776,6 +834,31 @@ else:
     # Reset view mode when in list mode
     st.session_state['view_mode'] = 'list'
     
+    # Full-text search across notes, contacts, customer interest, feasibility and samples
+    search_query = st.text_input(
+        "🔎 Search R&D notes",
+        placeholder="Search notes, contacts, customer interest, feasibility and sample feedback..."
+    )
+    if search_query.strip():
+        hits = api_get(f"/api/rd/search?{urlencode({'q': search_query, 'limit': 20})}")
+        if hits and hits['results']:
+            st.caption(f"{hits['count']} matches in {hits['took_ms']:.0f} ms")
+            for i, hit in enumerate(hits['results']):
+                col1, col2 = st.columns([5, 1])
+                with col1:
+                    st.markdown(
+                        f"**{hit['initiative_name']}** · {format_display_value(hit['source'])} · {hit['title']}  \n"
+                        f"{hit['snippet']}"
+                    )
+                with col2:
+                    if st.button("Open", key=f"search_hit_{i}"):
+                        st.session_state['selected_initiative'] = hit['initiative_id']
+                        st.session_state['view_mode'] = 'detail'
+                        st.rerun()
+        elif hits is not None:
+            st.info("No matches found")
+        st.divider()
+    
     # Main content tabs
     tab1, tab2, tab3, tab4 = st.tabs(["📊 Overview", "➕ New Initiative", "💸 Expenses & Revenue", "📈 ROI Analysis"])
     
@@ -1094,19 +1177,22 @@ else:
             
             # Collect all data first
             initiative_data = []
+            roi_rows = {r['initiative_id']: r for r in (api_get("/api/rd/roi") or [])}
+            guidance = {
+                r['initiative_id']: r['recommendations']
+                for r in (api_get("/api/rd/portfolio/recommendations") or {}).get('initiatives', [])
+            }
             for init in initiatives:
-                exp_data = api_get(f"/api/rd/expenses/initiative/{init['id']}/total")
-                rev_data = api_get(f"/api/rd/revenue/initiative/{init['id']}/total")
-                samples = api_get(f"/api/rd/samples/initiative/{init['id']}")
+                roi_row = roi_rows.get(init['id'], {})
                 
-                expenses = exp_data.get('total_expenses', 0) if exp_data else 0
-                revenue = rev_data.get('total_revenue', 0) if rev_data else 0
+                expenses = roi_row.get('total_investment', 0)
+                revenue = roi_row.get('total_revenue', 0)
                 net = revenue - expenses
-                roi = ((net / expenses) * 100) if expenses > 0 else 0
+                roi = roi_row.get('roi_percentage') or 0
                 
-                sample_count = len(samples) if samples else 0
-                converted = len([s for s in samples if s['converted_to_order'] == 'yes']) if samples else 0
-                conversion_rate = (converted / sample_count * 100) if sample_count > 0 else 0
+                sample_count = roi_row.get('samples_sent_count', 0)
+                converted = roi_row.get('samples_converted_count', 0)
+                conversion_rate = roi_row.get('conversion_rate') or 0
                 
                 initiative_data.append({
                     'name': init['name'],
@@ -1261,33 +1347,10 @@ else:
                         # Decision guidance
                         st.write("**📊 Decision Guidance:**")
                         
-                        recommendations = []
-                        
-                        # ROI-based
-                        if data['roi'] < 0 and data['expenses'] > 5000:
-                            recommendations.append("⚠️ **High-cost, negative ROI** - Consider go/no-go decision")
-                        elif data['roi'] > 100:
-                            recommendations.append("✅ **Exceptional ROI** - Scale up investment")
-                        elif data['roi'] > 25:
-                            recommendations.append("✅ **Strong performance** - Continue current strategy")
-                        
-                        # Stage-based
-                        if data['stage'] == 'feasibility' and data['expenses'] > 3000:
-                            recommendations.append("⚠️ **High feasibility costs** - Make launch decision soon")
-                        elif data['stage'] == 'launched' and data['revenue'] < 10000:
-                            recommendations.append("📢 **Launched but low revenue** - Increase marketing efforts")
-                        
-                        # Sample conversion
-                        if data['samples'] > 5 and data['conversion_rate'] < 20:
-                            recommendations.append("⚠️ **Low sample conversion** - Review product-market fit")
-                        elif data['samples'] > 0 and data['conversion_rate'] > 50:
-                            recommendations.append("✅ **Strong conversion rate** - Send more samples")
-                        
-                        # Cost efficiency
-                        if data['samples'] > 0:
-                            cost_per_sample = data['expenses'] / data['samples']
-                            if cost_per_sample > 500:
-                                recommendations.append("💰 **High cost per sample** - Optimize sample production")
+                        recommendations = [
+                            f"{rec['icon']} **{rec['title']}** - {rec['action']}"
+                            for rec in guidance.get(data['id'], [])
+                        ]
                         
                         if recommendations:
                             for rec in recommendations: